@@ -1,7 +1,16 @@
 import sqlite3
+import sys
 import hashlib
 import secrets
 import json
+import re
+import html
+import bisect
+import unicodedata
+import difflib
+import threading
+import zlib
+from collections import OrderedDict
 
 DB_PATH = "database/student_app.db"
 
@@ -24,7 +33,234 @@ def verify_password(stored_hash, stored_salt, password):
 # Connection helper
 # -----------------
 def get_connection():
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    # used by the LIKE fallback of search_notes
+    conn.create_function("notes_plain", 1, notes_plain, **_UDF_FLAGS)
+    if DB_PATH not in _FTS_STATE:
+        _ensure_notes_fts(conn)
+    if DB_PATH not in _REV_READY:
+        _ensure_note_revisions(conn)
+    if DB_PATH not in _GPA_READY:
+        _ensure_gpa_schema(conn)
+    return conn
+
+# -----------------
+# Notes full-text search (FTS5)
+# -----------------
+# DB_PATH -> True (FTS5 index ready) / False (FTS5 unavailable, LIKE fallback)
+_FTS_STATE = {}
+# create_function(deterministic=...) needs Python 3.8
+_UDF_FLAGS = {"deterministic": True} if sys.version_info >= (3, 8) else {}
+
+_HTML_DROP_RE  = re.compile(r"<(head|style|script)\b[^>]*>.*?</\1\s*>", re.I | re.S)
+_HTML_BREAK_RE = re.compile(r"<(br|/p|/div|/li|/h[1-6]|/tr)\b[^>]*>", re.I)
+_HTML_TAG_RE   = re.compile(r"<[^>]+>")
+_WS_RE         = re.compile(r"\s+")
+_TOKEN_RE      = re.compile(r"\w+", re.UNICODE)
+
+def notes_plain(content):
+    """Return the searchable plain text of a note body (HTML tags/entities stripped)."""
+    if not content:
+        return ""
+    text = str(content)
+    if "<" in text:
+        text = _HTML_DROP_RE.sub(" ", text)
+        text = _HTML_BREAK_RE.sub("\n", text)
+        text = _HTML_TAG_RE.sub(" ", text)
+    text = html.unescape(text)
+    return _WS_RE.sub(" ", text).strip()
+
+_NOTES_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        title, body,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    # notes written without index_notes (other SQLite clients, init_db); the
+    # triggers need no Python, so any client can run them
+    "CREATE TABLE IF NOT EXISTS notes_fts_dirty (note_id INTEGER PRIMARY KEY)",
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_dirty_ai AFTER INSERT ON notes BEGIN
+        INSERT OR IGNORE INTO notes_fts_dirty(note_id) VALUES (new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_dirty_au AFTER UPDATE OF title, content ON notes BEGIN
+        INSERT OR IGNORE INTO notes_fts_dirty(note_id) VALUES (new.id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN
+        DELETE FROM notes_fts WHERE rowid = old.id;
+        DELETE FROM notes_fts_dirty WHERE note_id = old.id;
+    END
+    """,
+]
+
+def _ensure_notes_fts(conn):
+    """
+    Create the notes_fts index and its dirty queue once per DB, backfilling
+    existing notes. Notes queued later are indexed by _sync_notes_fts.
+    """
+    try:
+        cur = conn.cursor()
+        cur.execute("""SELECT name FROM sqlite_master WHERE type='table'
+                       AND name IN ('notes', 'notes_fts', 'notes_fts_dirty')""")
+        names = {r[0] for r in cur.fetchall()}
+        if "notes" not in names:
+            return  # schema not initialized yet; try again on the next connection
+        for stmt in _NOTES_FTS_SCHEMA:
+            cur.execute(stmt)
+        if not {"notes_fts", "notes_fts_dirty"} <= names:
+            # new index, or one from before the queue (outside edits went unseen)
+            _rebuild_notes_fts(cur)
+        conn.commit()
+        _FTS_STATE[DB_PATH] = True
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: search falls back to LIKE
+        print(f"Notes full-text search unavailable: {e}")
+        _FTS_STATE[DB_PATH] = False
+
+def _fts_rows(rows):
+    return ((note_id, title or "", notes_plain(content)) for note_id, title, content in rows)
+
+def _rebuild_notes_fts(cur):
+    cur.execute("DELETE FROM notes_fts")
+    cur.execute("DELETE FROM notes_fts_dirty")
+    rows = cur.execute("SELECT id, title, content FROM notes").fetchall()
+    cur.executemany("INSERT INTO notes_fts(rowid, title, body) VALUES (?, ?, ?)", _fts_rows(rows))
+
+def index_notes(cursor, note_ids):
+    """
+    (Re)index the given notes in notes_fts, inside the caller's transaction.
+    Every insert / title or content update of notes in the app calls it, so
+    the index is current at once; it also takes the notes off the dirty queue.
+    """
+    ids = list(note_ids)
+    if not ids or not _FTS_STATE.get(DB_PATH):
+        return
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        marks = ",".join("?" * len(chunk))
+        cursor.execute(f"DELETE FROM notes_fts WHERE rowid IN ({marks})", chunk)
+        cursor.execute(f"DELETE FROM notes_fts_dirty WHERE note_id IN ({marks})", chunk)
+        cursor.execute(f"SELECT id, title, content FROM notes WHERE id IN ({marks})", chunk)
+        cursor.executemany("INSERT INTO notes_fts(rowid, title, body) VALUES (?, ?, ?)",
+                           _fts_rows(cursor.fetchall()))
+
+def _sync_notes_fts(conn):
+    """Index the notes queued by the dirty triggers (written outside the app). Called before a search."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT note_id FROM notes_fts_dirty")
+        ids = [r[0] for r in cur.fetchall()]
+        if ids:
+            index_notes(cur, ids)
+            conn.commit()
+    except sqlite3.OperationalError as e:
+        conn.rollback()   # e.g. locked by a writer: the queue is kept for the next search
+        print(f"Notes full-text index not synced: {e}")
+
+def rebuild_notes_fts():
+    """Re-index every note (e.g. after editing the DB outside the app)."""
+    try:
+        conn = get_connection()
+        if _FTS_STATE.get(DB_PATH):
+            _rebuild_notes_fts(conn.cursor())
+            conn.commit()
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Database error in rebuild_notes_fts: {e}")
+
+def _fold(word):
+    """Lower-case and strip diacritics, like the unicode61 tokenizer does."""
+    word = unicodedata.normalize("NFKD", word.lower())
+    return "".join(ch for ch in word if not unicodedata.combining(ch))
+
+def query_tokens(text):
+    """Folded search words of a typed query."""
+    return [_fold(t) for t in _TOKEN_RE.findall(text or "")]
+
+def search_terms(text):
+    """Sorted unique folded words of a document, for in-memory prefix matching."""
+    return tuple(sorted({_fold(t) for t in _TOKEN_RE.findall(text or "")}))
+
+def terms_match(terms, tokens):
+    """True if every token is a prefix of some term (same rule as fts_query)."""
+    for tok in tokens:
+        i = bisect.bisect_left(terms, tok)
+        if i >= len(terms) or not terms[i].startswith(tok):
+            return False
+    return True
+
+# bumped on every note/folder write so in-memory result caches can drop stale entries
+_NOTES_GEN = 0
+# callables taking one change event dict (see mark_notes_changed)
+_NOTES_LISTENERS = []
+
+def add_notes_listener(callback):
+    """Call callback(event) after every note/folder write (on the writing thread)."""
+    if callback not in _NOTES_LISTENERS:
+        _NOTES_LISTENERS.append(callback)
+
+def remove_notes_listener(callback):
+    if callback in _NOTES_LISTENERS:
+        _NOTES_LISTENERS.remove(callback)
+
+def mark_notes_changed(kind=None, action=None, ids=(), user_id=None, fields=None, **info):
+    """
+    Record that notes or folders changed (call after committing raw SQL writes)
+    and tell the listeners what changed:
+      kind    "note" | "folder" | None (unknown: reload everything)
+      action  "create" | "update" | "delete" | "move"
+      ids     affected note/folder ids
+      fields  changed note columns for updates, e.g. ("title", "content"); None = unknown
+    Extra keyword info (e.g. title=...) is passed through in the event.
+    """
+    global _NOTES_GEN
+    _NOTES_GEN += 1
+    event = dict(info, kind=kind, action=action, ids=tuple(ids or ()),
+                 user_id=user_id, fields=tuple(fields) if fields is not None else None,
+                 generation=_NOTES_GEN)
+    for callback in list(_NOTES_LISTENERS):
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"Notes listener error: {e}")
+
+def notes_generation():
+    return _NOTES_GEN
+
+# callables taking one GPA change event dict (see mark_gpa_changed)
+_GPA_LISTENERS = []
+
+def add_gpa_listener(callback):
+    """Call callback(event) after every committed GPA history write (on the writing thread)."""
+    if callback not in _GPA_LISTENERS:
+        _GPA_LISTENERS.append(callback)
+
+def remove_gpa_listener(callback):
+    if callback in _GPA_LISTENERS:
+        _GPA_LISTENERS.remove(callback)
+
+def mark_gpa_changed(ids_by_student):
+    """Tell the listeners which history ids were added: event {'ids': {student_id: (id, ...)}}."""
+    event = {"ids": {sid: tuple(ids) for sid, ids in ids_by_student.items()}}
+    for callback in list(_GPA_LISTENERS):
+        try:
+            callback(event)
+        except Exception as e:
+            print(f"GPA listener error: {e}")
+
+def fts_query(text):
+    """
+    Turn free text typed by the user into a safe FTS5 MATCH expression:
+    every word must match as a prefix ("data stru" -> "data"* AND "stru"*).
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    return " AND ".join('"{}"*'.format(t.replace('"', '""')) for t in tokens)
 
 # -----------------
 # USERS
@@ -322,6 +558,23 @@ def check_student_exists(student_id):
     conn.close()
     return result is not None
 
+def existing_student_ids(student_ids):
+    """Return the subset of student_ids that are registered users (chunked IN queries)."""
+    ids = list(dict.fromkeys(s for s in student_ids if s))
+    found = set()
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            cursor.execute(f"SELECT student_id FROM users WHERE student_id IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(row[0] for row in cursor.fetchall())
+        conn.close()
+        return found
+    except sqlite3.Error as e:
+        print(f"Database error in existing_student_ids: {e}")
+        return set()
+
 def get_student_name(student_id):
     """Get student name from database"""
     try:
@@ -407,9 +660,293 @@ def get_rooms_by_location(location_id):
 # -----------------
 # GPA HISTORY
 # -----------------
+_GPA_SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS idx_gpa_courses_history ON gpa_courses(gpa_history_id)",
+    "CREATE INDEX IF NOT EXISTS idx_gpa_history_student ON gpa_history(student_id, timestamp, id)",
+    """CREATE TABLE IF NOT EXISTS grading_schemes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        code TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        is_default INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TABLE IF NOT EXISTS grading_scheme_grades (
+        scheme_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        grade TEXT NOT NULL,
+        points REAL NOT NULL,
+        min_mark INTEGER,
+        max_mark INTEGER,
+        PRIMARY KEY (scheme_id, grade),
+        FOREIGN KEY (scheme_id) REFERENCES grading_schemes(id) ON DELETE CASCADE
+    )""",
+    """CREATE TABLE IF NOT EXISTS student_grading_schemes (
+        student_id TEXT PRIMARY KEY,
+        scheme_id INTEGER NOT NULL,
+        FOREIGN KEY (student_id) REFERENCES users(student_id),
+        FOREIGN KEY (scheme_id) REFERENCES grading_schemes(id)
+    )""",
+    """CREATE TABLE IF NOT EXISTS gpa_summary (
+        student_id TEXT PRIMARY KEY,
+        records INTEGER NOT NULL,
+        last_history_id INTEGER,
+        last_timestamp TEXT,
+        latest_gpa REAL,
+        latest_cgpa REAL,
+        total_credits INTEGER,
+        best_gpa REAL,
+        best_history_id INTEGER,
+        worst_gpa REAL,
+        worst_history_id INTEGER,
+        sum_x REAL NOT NULL DEFAULT 0,
+        sum_y REAL NOT NULL DEFAULT 0,
+        sum_xy REAL NOT NULL DEFAULT 0,
+        sum_xx REAL NOT NULL DEFAULT 0,
+        trend_slope REAL NOT NULL DEFAULT 0,
+        FOREIGN KEY (student_id) REFERENCES users(student_id)
+    )""",
+)
+_GPA_READY = set()   # DB_PATHs whose GPA indexes / grading tables exist
+
+# Seeded when a database has no grading scheme yet: (grade, points, min mark, max mark), best first
+DEFAULT_GRADING_SCHEME = ("TARUMT", "TAR UMT", [
+    ("A+", 4.00, 90, 100), ("A", 4.00, 80, 89), ("A-", 3.67, 75, 79),
+    ("B+", 3.33, 70, 74), ("B", 3.00, 65, 69), ("B-", 2.67, 60, 64),
+    ("C+", 2.33, 55, 59), ("C", 2.00, 50, 54), ("F", 0.00, 0, 49),
+])
+
+def _ensure_gpa_schema(conn):
+    """Add the GPA indexes and grading-scheme tables to databases created before they existed."""
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='gpa_courses'")
+        if not cur.fetchone():
+            return  # schema not initialized yet
+        for stmt in _GPA_SCHEMA:
+            cur.execute(stmt)
+        cur.execute("PRAGMA table_info(gpa_history)")
+        if not any(row[1] == "scheme_code" for row in cur.fetchall()):
+            cur.execute("ALTER TABLE gpa_history ADD COLUMN scheme_code TEXT")
+        cur.execute("SELECT 1 FROM grading_schemes LIMIT 1")
+        if not cur.fetchone():
+            code, name, grades = DEFAULT_GRADING_SCHEME
+            _save_grading_scheme(cur, code, name, grades, is_default=True)
+        # students whose history predates the summary table
+        cur.execute("""
+            SELECT DISTINCT student_id FROM gpa_history
+            WHERE student_id NOT IN (SELECT student_id FROM gpa_summary)
+        """)
+        for (student_id,) in cur.fetchall():
+            _rebuild_gpa_summary(cur, student_id)
+        conn.commit()
+        _GPA_READY.add(DB_PATH)
+    except sqlite3.Error as e:
+        print(f"Database error in _ensure_gpa_schema: {e}")
+
+def _save_grading_scheme(cur, code, name, grades, is_default=False):
+    cur.execute("INSERT OR IGNORE INTO grading_schemes (code, name) VALUES (?, ?)", (code, name))
+    cur.execute("UPDATE grading_schemes SET name = ? WHERE code = ?", (name, code))
+    cur.execute("SELECT id FROM grading_schemes WHERE code = ?", (code,))
+    scheme_id = cur.fetchone()[0]
+    if is_default:
+        cur.execute("UPDATE grading_schemes SET is_default = (id = ?)", (scheme_id,))
+    cur.execute("DELETE FROM grading_scheme_grades WHERE scheme_id = ?", (scheme_id,))
+    cur.executemany('''
+        INSERT INTO grading_scheme_grades (scheme_id, position, grade, points, min_mark, max_mark)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', [(scheme_id, pos, g[0], float(g[1]), g[2] if len(g) > 2 else None, g[3] if len(g) > 3 else None)
+          for pos, g in enumerate(grades)])
+    return scheme_id
+
+_SUMMARY_COLUMNS = ("records", "last_history_id", "last_timestamp", "latest_gpa", "latest_cgpa",
+                    "total_credits", "best_gpa", "best_history_id", "worst_gpa", "worst_history_id",
+                    "sum_x", "sum_y", "sum_xy", "sum_xx", "trend_slope")
+
+def _fold_gpa_summary(s, history_id, timestamp, gpa, cgpa, total_credits):
+    """
+    Fold one new (latest) history record into a summary dict (None = no history yet).
+    The trend is the least-squares slope of semester GPA over record number
+    (0, 1, 2, ...), kept as running sums so no older row is read again.
+    """
+    if s is None:
+        s = {"records": 0, "best_gpa": None, "worst_gpa": None,
+             "sum_x": 0.0, "sum_y": 0.0, "sum_xy": 0.0, "sum_xx": 0.0}
+    x, y = s["records"], float(gpa or 0.0)
+    n = x + 1
+    s.update(records=n, last_history_id=history_id, last_timestamp=timestamp,
+             latest_gpa=y, latest_cgpa=cgpa, total_credits=total_credits,
+             sum_x=s["sum_x"] + x, sum_y=s["sum_y"] + y,
+             sum_xy=s["sum_xy"] + x * y, sum_xx=s["sum_xx"] + x * x)
+    if s["best_gpa"] is None or y > s["best_gpa"]:
+        s.update(best_gpa=y, best_history_id=history_id)
+    if s["worst_gpa"] is None or y < s["worst_gpa"]:
+        s.update(worst_gpa=y, worst_history_id=history_id)
+    den = n * s["sum_xx"] - s["sum_x"] ** 2
+    s["trend_slope"] = (n * s["sum_xy"] - s["sum_x"] * s["sum_y"]) / den if den else 0.0
+    return s
+
+def _write_gpa_summaries(cur, summaries):
+    """Store {student_id: summary dict} rows."""
+    cur.executemany(f'''
+        INSERT OR REPLACE INTO gpa_summary (student_id, {', '.join(_SUMMARY_COLUMNS)})
+        VALUES (?{", ?" * len(_SUMMARY_COLUMNS)})
+    ''', [(student_id, *(s[c] for c in _SUMMARY_COLUMNS)) for student_id, s in summaries.items()])
+
+def _add_to_gpa_summary(cur, student_id, history_id, timestamp, gpa, cgpa, total_credits):
+    """Fold one new (latest) history record into the student's gpa_summary row."""
+    cur.execute(f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM gpa_summary WHERE student_id = ?", (student_id,))
+    row = cur.fetchone()
+    s = _fold_gpa_summary(dict(zip(_SUMMARY_COLUMNS, row)) if row else None,
+                          history_id, timestamp, gpa, cgpa, total_credits)
+    _write_gpa_summaries(cur, {student_id: s})
+
+def _rebuild_gpa_summary(cur, student_id):
+    """Recompute a student's gpa_summary row from all of their history."""
+    cur.execute("DELETE FROM gpa_summary WHERE student_id = ?", (student_id,))
+    cur.execute('''
+        SELECT id, timestamp, gpa, cgpa, total_credits FROM gpa_history
+        WHERE student_id = ? ORDER BY timestamp, id
+    ''', (student_id,))
+    s = None
+    for row in cur.fetchall():
+        s = _fold_gpa_summary(s, *row)
+    if s is not None:
+        _write_gpa_summaries(cur, {student_id: s})
+
+def _load_gpa_summaries(cur, student_ids):
+    """{student_id: summary dict} for those of student_ids that have one (chunked IN queries)."""
+    ids, summaries = list(dict.fromkeys(student_ids)), {}
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        cur.execute(f'''
+            SELECT student_id, {', '.join(_SUMMARY_COLUMNS)} FROM gpa_summary
+            WHERE student_id IN ({",".join("?" * len(chunk))})
+        ''', chunk)
+        for row in cur.fetchall():
+            summaries[row[0]] = dict(zip(_SUMMARY_COLUMNS, row[1:]))
+    return summaries
+
+def get_gpa_summaries(student_ids):
+    """Summary rows of many students at once: {student_id: summary} (no entry without history)."""
+    try:
+        conn = get_connection()
+        summaries = _load_gpa_summaries(conn.cursor(), student_ids)
+        conn.close()
+        return summaries
+    except sqlite3.Error as e:
+        print(f"Database error in get_gpa_summaries: {e}")
+        return {}
+
+def get_gpa_summary(student_id):
+    """
+    The student's academic summary in one row, or None without history:
+    {'records', 'latest_gpa', 'latest_cgpa', 'total_credits', 'best_gpa',
+     'best_history_id', 'worst_gpa', 'worst_history_id', 'trend_slope', ...}
+    trend_slope is the average change of semester GPA per calculation.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM gpa_summary WHERE student_id = ?",
+                       (student_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return dict(zip(_SUMMARY_COLUMNS, row)) if row else None
+    except sqlite3.Error as e:
+        print(f"Database error in get_gpa_summary: {e}")
+        return None
+
+def rebuild_gpa_summary(student_id):
+    """Recompute a student's summary from scratch (after history was edited outside the app)."""
+    try:
+        conn = get_connection()
+        _rebuild_gpa_summary(conn.cursor(), student_id)
+        conn.commit()
+        conn.close()
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error in rebuild_gpa_summary: {e}")
+        return False
+
+# -----------------
+# GRADING SCHEMES
+# -----------------
+def get_grading_schemes():
+    """
+    Every grading scheme with its grades, in one query:
+    [{'code', 'name', 'is_default', 'grades': [(grade, points, min_mark, max_mark), ...]}]
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT s.id, s.code, s.name, s.is_default, g.grade, g.points, g.min_mark, g.max_mark
+            FROM grading_schemes s
+            LEFT JOIN grading_scheme_grades g ON g.scheme_id = s.id
+            ORDER BY s.id, g.position
+        ''')
+        schemes = {}
+        for sid, code, name, is_default, grade, points, min_mark, max_mark in cursor.fetchall():
+            scheme = schemes.setdefault(sid, {'code': code, 'name': name,
+                                              'is_default': bool(is_default), 'grades': []})
+            if grade is not None:
+                scheme['grades'].append((grade, points, min_mark, max_mark))
+        conn.close()
+        return list(schemes.values())
+    except sqlite3.Error as e:
+        print(f"Database error in get_grading_schemes: {e}")
+        return []
+
+def get_student_grading_schemes():
+    """{student_id: scheme code} for students assigned a non-default scheme."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT a.student_id, s.code
+            FROM student_grading_schemes a JOIN grading_schemes s ON s.id = a.scheme_id
+        ''')
+        result = dict(cursor.fetchall())
+        conn.close()
+        return result
+    except sqlite3.Error as e:
+        print(f"Database error in get_student_grading_schemes: {e}")
+        return {}
+
+def save_grading_scheme(code, name, grades, is_default=False):
+    """Create or replace a scheme (e.g. per faculty or intake). grades: [(grade, points, min_mark, max_mark)]."""
+    try:
+        conn = get_connection()
+        _save_grading_scheme(conn.cursor(), code, name, grades, is_default)
+        conn.commit()
+        conn.close()
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error in save_grading_scheme: {e}")
+        return False
+
+def set_student_grading_scheme(student_id, code):
+    """Assign a scheme to a student (code=None: back to the default scheme)."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        if code is None:
+            cursor.execute("DELETE FROM student_grading_schemes WHERE student_id = ?", (student_id,))
+        else:
+            cursor.execute('''
+                INSERT OR REPLACE INTO student_grading_schemes (student_id, scheme_id)
+                SELECT ?, id FROM grading_schemes WHERE code = ?
+            ''', (student_id, code))
+        conn.commit()
+        ok = code is None or cursor.rowcount > 0
+        conn.close()
+        return ok
+    except sqlite3.Error as e:
+        print(f"Database error in set_student_grading_scheme: {e}")
+        return False
+
 def save_gpa_calculation(student_id, semester_credits, gpa, total_credits, cgpa, 
-                       courses_data, current_cgpa, completed_credits):
-    """Save a GPA calculation to the database using normalized tables"""
+                       courses_data, current_cgpa, completed_credits, scheme_code=None):
+    """Save a GPA calculation (and the grading scheme it used) using normalized tables"""
     try:
         conn = get_connection()
         cursor = conn.cursor()
@@ -420,59 +957,204 @@ def save_gpa_calculation(student_id, semester_credits, gpa, total_credits, cgpa,
         cursor.execute('''
             INSERT INTO gpa_history 
             (student_id, timestamp, semester_credits, gpa, total_credits, cgpa, 
-             current_cgpa, completed_credits)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+             current_cgpa, completed_credits, scheme_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (student_id, current_time, semester_credits, gpa, total_credits, cgpa, 
-              current_cgpa, completed_credits))
+              current_cgpa, completed_credits, scheme_code))
         
         gpa_history_id = cursor.lastrowid
         
-        for course in courses_data:
-            cursor.execute('''
-                INSERT INTO gpa_courses (gpa_history_id, name, credits, grade)
-                VALUES (?, ?, ?, ?)
-            ''', (gpa_history_id, course['name'], course['credits'], course['grade']))
+        cursor.executemany('''
+            INSERT INTO gpa_courses (gpa_history_id, name, credits, grade)
+            VALUES (?, ?, ?, ?)
+        ''', [(gpa_history_id, course['name'], course['credits'], course['grade'])
+              for course in courses_data])
+        
+        # same transaction: the summary never disagrees with the history
+        _add_to_gpa_summary(cursor, student_id, gpa_history_id, current_time, gpa, cgpa, total_credits)
         
         conn.commit()
         conn.close()
+        mark_gpa_changed({student_id: (gpa_history_id,)})
         return True
     except sqlite3.Error as e:
         print(f"Database error in save_gpa_calculation: {e}")
         return False
 
-def get_gpa_history(student_id, limit=10):
-    """Retrieve GPA history for a student with courses"""
+def save_gpa_calculations(records):
+    """
+    Bulk version of save_gpa_calculation for whole transcripts, in one transaction.
+    records: dicts shaped like get_gpa_history() rows plus 'student_id' (no 'id'),
+    each student's records oldest first. Histories and courses go in with
+    executemany (ids are assigned up front) and every student's summary row is
+    updated once. Returns the number of records saved, or None on error.
+    """
+    records = list(records)
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")  # nobody else takes ids until we commit
+        cursor.execute('''
+            SELECT MAX(COALESCE((SELECT MAX(id) FROM gpa_history), 0),
+                       COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'gpa_history'), 0))
+        ''')
+        next_id = cursor.fetchone()[0] + 1
+        ids = range(next_id, next_id + len(records))
+        
+        cursor.executemany('''
+            INSERT INTO gpa_history 
+            (id, student_id, timestamp, semester_credits, gpa, total_credits, cgpa, 
+             current_cgpa, completed_credits, scheme_code)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(hid, r['student_id'], r['timestamp'], r['semester_credits'], r['gpa'], r['total_credits'],
+               r['cgpa'], r['current_cgpa'], r['completed_credits'], r.get('scheme_code'))
+              for hid, r in zip(ids, records)])
+        cursor.executemany('''
+            INSERT INTO gpa_courses (gpa_history_id, name, credits, grade)
+            VALUES (?, ?, ?, ?)
+        ''', [(hid, c['name'], c['credits'], c['grade'])
+              for hid, r in zip(ids, records) for c in r['courses_data']])
+        
+        # summaries: fold the new records in, or rebuild a student whose import
+        # goes back before their latest saved record
+        summaries, stale = _load_gpa_summaries(cursor, (r['student_id'] for r in records)), set()
+        for hid, r in zip(ids, records):
+            sid, s = r['student_id'], summaries.get(r['student_id'])
+            if s is not None and str(r['timestamp']) < str(s['last_timestamp']):
+                stale.add(sid)
+            summaries[sid] = _fold_gpa_summary(s, hid, r['timestamp'], r['gpa'], r['cgpa'], r['total_credits'])
+        _write_gpa_summaries(cursor, {sid: s for sid, s in summaries.items() if sid not in stale})
+        for sid in stale:
+            _rebuild_gpa_summary(cursor, sid)
+        
+        conn.commit()
+        conn.close()
+        ids_by_student = {}
+        for hid, r in zip(ids, records):
+            ids_by_student.setdefault(r['student_id'], []).append(hid)
+        mark_gpa_changed(ids_by_student)
+        return len(records)
+    except sqlite3.Error as e:
+        print(f"Database error in save_gpa_calculations: {e}")
+        return None
+
+def iter_gpa_transcripts(student_ids=None, batch_size=500):
+    """
+    Stream every GPA history record (with 'student_id' and 'courses_data'),
+    by student and then oldest first, for all students or the given ones.
+    Rows are fetched batch_size at a time, so the export never holds the table.
+    """
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        sql = '''
+            SELECT h.id, h.student_id, h.timestamp, h.semester_credits, h.gpa, h.total_credits,
+                   h.cgpa, h.current_cgpa, h.completed_credits, h.scheme_code,
+                   c.name, c.credits, c.grade
+            FROM gpa_history h
+            LEFT JOIN gpa_courses c ON c.gpa_history_id = h.id
+        '''
+        if student_ids is not None:
+            # a temp table instead of IN (...): no limit on the number of students
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS _export_students (student_id TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM _export_students")
+            cursor.executemany("INSERT OR IGNORE INTO _export_students VALUES (?)", [(s,) for s in student_ids])
+            sql += " WHERE h.student_id IN (SELECT student_id FROM _export_students)"
+        sql += " ORDER BY h.student_id, h.timestamp, h.id, c.id"
+        cursor.execute(sql)
         
+        record = None
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                if record is None or record['id'] != row[0]:
+                    if record is not None:
+                        yield record
+                    record = {
+                        'id': row[0], 'student_id': row[1], 'timestamp': row[2],
+                        'semester_credits': row[3], 'gpa': row[4], 'total_credits': row[5],
+                        'cgpa': row[6], 'current_cgpa': row[7], 'completed_credits': row[8],
+                        'scheme_code': row[9], 'courses_data': []
+                    }
+                if row[10] is not None:
+                    record['courses_data'].append({'name': row[10], 'credits': row[11], 'grade': row[12]})
+        if record is not None:
+            yield record
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Database error in iter_gpa_transcripts: {e}")
+
+def get_gpa_trend(student_id):
+    """(id, timestamp, gpa, cgpa) of every history record of a student, oldest first (no courses)."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
         cursor.execute('''
+            SELECT id, timestamp, gpa, cgpa FROM gpa_history
+            WHERE student_id = ? ORDER BY timestamp, id
+        ''', (student_id,))
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    except sqlite3.Error as e:
+        print(f"Database error in get_gpa_trend: {e}")
+        return []
+
+def get_gpa_history(student_id, limit=10, before=None, after=None):
+    """
+    Retrieve GPA history for a student with courses, newest first.
+    Pages are keyset based: pass before=(timestamp, id) of the last record
+    already shown to get the next `limit` older ones (limit=None = all), or
+    after=(timestamp, id) of the newest one to get only the records added since.
+    Courses for the whole page come from one IN (...) query.
+    """
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        
+        sql = '''
             SELECT id, timestamp, semester_credits, gpa, total_credits, cgpa, 
-                   current_cgpa, completed_credits
+                   current_cgpa, completed_credits, scheme_code
             FROM gpa_history 
             WHERE student_id = ?
-            ORDER BY timestamp DESC
-            LIMIT ?
-        ''', (student_id, limit))
+        '''
+        params = [student_id]
+        if before is not None:
+            sql += " AND (timestamp, id) < (?, ?)"
+            params += [before[0], before[1]]
+        if after is not None:
+            sql += " AND (timestamp, id) > (?, ?)"
+            params += [after[0], after[1]]
+        sql += " ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
         
-        history = []
-        for row in cursor.fetchall():
-            gpa_history_id = row[0]
-            
-            cursor.execute('''
-                SELECT name, credits, grade 
+        courses_by_record = {row[0]: [] for row in rows}
+        ids = list(courses_by_record)
+        for start in range(0, len(ids), 500):  # stay under SQLite's variable limit
+            chunk = ids[start:start + 500]
+            cursor.execute(f'''
+                SELECT gpa_history_id, name, credits, grade 
                 FROM gpa_courses 
-                WHERE gpa_history_id = ?
-                ORDER BY name
-            ''', (gpa_history_id,))
-            
-            courses_data = []
+                WHERE gpa_history_id IN ({",".join("?" * len(chunk))})
+                ORDER BY gpa_history_id, name
+            ''', chunk)
             for course_row in cursor.fetchall():
-                courses_data.append({
-                    'name': course_row[0],
-                    'credits': course_row[1],
-                    'grade': course_row[2]
+                courses_by_record[course_row[0]].append({
+                    'name': course_row[1],
+                    'credits': course_row[2],
+                    'grade': course_row[3]
                 })
+        
+        history = []
+        for row in rows:
+            gpa_history_id = row[0]
+            courses_data = courses_by_record[gpa_history_id]
             
             history.append({
                 'id': gpa_history_id,
@@ -483,6 +1165,7 @@ def get_gpa_history(student_id, limit=10):
                 'cgpa': row[5],
                 'current_cgpa': row[6],
                 'completed_credits': row[7],
+                'scheme_code': row[8],
                 'courses_data': courses_data
             })
         
@@ -501,7 +1184,8 @@ _DEFAULT_TOOL_PREFS = {
     "colors": {"pencil": "#555555", "pen": "#000000", "marker": "#ffeb3b"},
     "widths": {"pencil": 2, "pen": 4, "marker": 14, "eraser": 20},
     "alphas": {"pencil": 255, "pen": 255, "marker": 110},
-    "eraser_mode": "normal"
+    "eraser_mode": "normal",
+    "undo": {"max_depth": 100, "max_mb": 32}
 }
 
 def create_folder(name, parent_id=None, user_id=None):
@@ -515,6 +1199,7 @@ def create_folder(name, parent_id=None, user_id=None):
     fid = cur.lastrowid
     conn.commit()
     conn.close()
+    mark_notes_changed("folder", "create", (fid,), user_id)
     return fid
 
 def get_folder(folder_id, user_id=None):
@@ -622,6 +1307,7 @@ def update_folder(folder_id, name, parent_id=None, user_id=None):
             """, (name, parent_id, folder_id))
     conn.commit()
     conn.close()
+    mark_notes_changed("folder", "update", (folder_id,), user_id)
 
 def delete_folder(folder_id, user_id=None):
     """Delete one folder only if it belongs to the user."""
@@ -649,6 +1335,30 @@ def delete_folder(folder_id, user_id=None):
         """, (folder_id,))
     conn.commit()
     conn.close()
+    mark_notes_changed("folder", "delete", (folder_id,), user_id)
+
+def get_folder_tree(user_id):
+    """
+    All folders of a user plus the titles of the notes filed in them, in one query.
+    Returns (folders [(id, name, parent_id)], notes [(id, title, folder_id)]).
+    """
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT 'f', id, name, parent_id FROM folders WHERE user_id = ?
+            UNION ALL
+            SELECT 'n', id, title, folder_id FROM notes
+            WHERE user_id = ? AND folder_id IS NOT NULL
+        """, (user_id, user_id))
+        folders, notes = [], []
+        for kind, rid, label, parent in cur.fetchall():
+            (folders if kind == 'f' else notes).append((rid, label, parent))
+        conn.close()
+        return folders, notes
+    except sqlite3.Error as e:
+        print(f"Database error in get_folder_tree: {e}")
+        return [], []
 
 def list_notes(user_id, order="updated_desc", limit=10):
     """Retrieve notes for a specific user with optional ordering and limit"""
@@ -713,6 +1423,92 @@ def get_note(note_id, user_id):
         print(f"Database error in get_note: {e}")
         return None
     
+def search_notes(user_id, text, folder_id=None, order="rank", limit=None, with_terms=False):
+    """
+    Full-text search over note titles and bodies for one user.
+    folder_id: None = all notes, -1 = uncategorized, else that folder.
+    order: "rank" (bm25, title hits weigh more), "modified" or "title".
+    Returns dicts: id, title, modified_at, snippet, rank
+    (+ terms, the note's search_terms(), when with_terms=True).
+    """
+    match = fts_query(text)
+    if not match:
+        return []
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        where, args = ["n.user_id = ?"], [user_id]
+        if folder_id == -1:
+            where.append("(n.folder_id IS NULL "
+                         " OR TRIM(CAST(n.folder_id AS TEXT)) = '' "
+                         " OR n.folder_id NOT IN (SELECT id FROM folders WHERE user_id = ?))")
+            args.append(user_id)
+        elif folder_id is not None:
+            where.append("n.folder_id = ?"); args.append(folder_id)
+
+        order_by = {
+            "modified": "modified_at DESC, LOWER(n.title)",
+            "title":    "LOWER(n.title)",
+        }.get(order, "score, modified_at DESC")
+
+        if _FTS_STATE.get(DB_PATH):
+            _sync_notes_fts(conn)
+            sql = f"""
+                SELECT n.id, n.title, COALESCE(n.updated_at, n.created_at) AS modified_at,
+                       snippet(notes_fts, 1, '[', ']', '…', 12) AS snip,
+                       bm25(notes_fts, 10.0, 1.0) AS score,
+                       {"notes_fts.title || ' ' || notes_fts.body" if with_terms else "''"} AS doc
+                FROM notes_fts
+                JOIN notes n ON n.id = notes_fts.rowid
+                WHERE notes_fts MATCH ? AND {" AND ".join(where)}
+                ORDER BY {order_by}
+            """
+            args = [match] + args
+        else:
+            # no FTS5: substring match on every word, unranked
+            for tok in _TOKEN_RE.findall(text):
+                where.append("(LOWER(n.title) LIKE ? OR LOWER(n.content) LIKE ?)")
+                args += [f"%{tok.lower()}%"] * 2
+            sql = f"""
+                SELECT n.id, n.title, COALESCE(n.updated_at, n.created_at) AS modified_at,
+                       '' AS snip, 0 AS score,
+                       {"COALESCE(n.title, '') || ' ' || notes_plain(n.content)" if with_terms else "''"} AS doc
+                FROM notes n
+                WHERE {" AND ".join(where)}
+                ORDER BY {order_by}
+            """
+        if limit:
+            sql += " LIMIT ?"; args.append(int(limit))
+        cur.execute(sql, args)
+        rows = []
+        for r in cur.fetchall():
+            row = {"id": r[0], "title": r[1], "modified_at": r[2], "snippet": r[3], "rank": r[4]}
+            if with_terms:
+                row["terms"] = search_terms(r[5])
+            rows.append(row)
+        conn.close()
+        return rows
+    except sqlite3.Error as e:
+        print(f"Database error in search_notes: {e}")
+        return []
+
+def existing_note_ids(note_ids, user_id):
+    """Return the subset of note_ids that still exist for this user (one query)."""
+    ids = [int(n) for n in note_ids if n is not None]
+    if not ids:
+        return set()
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        marks = ",".join("?" * len(ids))
+        cursor.execute(f"SELECT id FROM notes WHERE user_id = ? AND id IN ({marks})", (user_id, *ids))
+        found = {row[0] for row in cursor.fetchall()}
+        conn.close()
+        return found
+    except sqlite3.Error as e:
+        print(f"Database error in existing_note_ids: {e}")
+        return set(ids)
+
 def create_note(title, content, user_id, overlay=None):
     """Create a new note for a user (overlay is optional JSON string)"""
     try:
@@ -730,8 +1526,10 @@ def create_note(title, content, user_id, overlay=None):
             """, (title, content, overlay, user_id))
         
         note_id = cursor.lastrowid
+        index_notes(cursor, (note_id,))
         conn.commit()
         conn.close()
+        mark_notes_changed("note", "create", (note_id,), user_id, title=title)
         return note_id
     except sqlite3.Error as e:
         print(f"Database error in create_note: {e}")
@@ -784,6 +1582,7 @@ def update_note(note_id, title, content, overlay_or_user=None, user_id=None):
         if uid is None:
             raise TypeError("update_note requires user_id (either as the legacy 4th argument or as the user_id= keyword).")
 
+        _revision_before_write(cursor, note_id, uid)
         if overlay is None:
             cursor.execute("""
                 UPDATE notes 
@@ -797,9 +1596,14 @@ def update_note(note_id, title, content, overlay_or_user=None, user_id=None):
                 WHERE id = ? AND user_id = ?
             """, (title, content, overlay, note_id, uid))
 
-        conn.commit()
         changed = cursor.rowcount > 0
+        if changed:
+            index_notes(cursor, (note_id,))
+        conn.commit()
         conn.close()
+        if changed:
+            fields = ("title", "content") if overlay is None else ("title", "content", "overlay")
+            mark_notes_changed("note", "update", (note_id,), uid, fields, title=title)
         return changed
     except sqlite3.Error as e:
         print(f"Database error in update_note: {e}")
@@ -811,19 +1615,366 @@ def update_note_overlay(note_id, overlay_json, user_id):
     try:
         conn = get_connection()
         cursor = conn.cursor()
+        _revision_before_write(cursor, note_id, user_id)
         cursor.execute("""
             UPDATE notes 
             SET overlay = ?, updated_at = CURRENT_TIMESTAMP
             WHERE id = ? AND user_id = ?
         """, (overlay_json, note_id, user_id))
-        conn.commit()
         ok = cursor.rowcount > 0
+        conn.commit()
         conn.close()
+        if ok:
+            mark_notes_changed("note", "update", (note_id,), user_id, ("overlay",))
         return ok
     except sqlite3.Error as e:
         print(f"Database error in update_note_overlay: {e}")
         return False
 
+def update_notes_batch(user_id, items):
+    """
+    Save several notes of one user in a single transaction (autosave tick).
+    items: (note_id, title, content, overlay_json_or_None); a None overlay is kept.
+    Returns the ids that were updated (deleted notes are left out), or None on error.
+    """
+    if not items:
+        return []
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        done = []
+        for note_id, title, content, overlay in items:
+            _revision_before_write(cursor, note_id, user_id)
+            cursor.execute("""
+                UPDATE notes
+                SET title = ?, content = ?, overlay = COALESCE(?, overlay),
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ? AND user_id = ?
+            """, (title, content, overlay, note_id, user_id))
+            if cursor.rowcount > 0:
+                done.append(note_id)
+        index_notes(cursor, done)
+        conn.commit()
+        conn.close()
+        titles = {item[0]: item[1] for item in items}
+        for note_id in done:
+            mark_notes_changed("note", "update", (note_id,), user_id,
+                               ("title", "content", "overlay"), title=titles[note_id])
+        return done
+    except sqlite3.Error as e:
+        print(f"Database error in update_notes_batch: {e}")
+        return None
+
+# --------- Note revisions (delta history) ----------
+# A revision row stores the note's title plus zlib-compressed opcode deltas
+# against the previous revision: HTML content line by line and every overlay
+# list (strokes, images) item by item. Every keyframe_every-th revision is a
+# delta against the empty note so rebuilding any revision replays a bounded chain.
+_REVISION_POLICY = {"interval_s": 300, "keyframe_every": 20}
+
+_NOTE_REVISIONS_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS note_revisions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        note_id INTEGER NOT NULL,
+        user_id TEXT NOT NULL,
+        rev_no INTEGER NOT NULL,
+        keyframe INTEGER NOT NULL DEFAULT 0,
+        title TEXT,
+        content_delta BLOB,
+        overlay_delta BLOB,
+        digest TEXT,
+        size INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (note_id, rev_no)
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS note_revisions_ad AFTER DELETE ON notes BEGIN
+        DELETE FROM note_revisions WHERE note_id = old.id;
+    END
+    """,
+]
+
+# (DB_PATH, note_id) -> (rev_no, content lines, overlay parts) of the newest revision
+_REV_TIPS = OrderedDict()
+_REV_TIPS_MAX = 32
+_REV_LOCK = threading.Lock()
+_REV_READY = set()   # DB_PATHs whose note_revisions table exists
+
+def set_revision_policy(interval_s=None, keyframe_every=None):
+    """Change how often update_note snapshots a revision and how long delta chains get."""
+    if interval_s is not None:
+        _REVISION_POLICY["interval_s"] = max(0, int(interval_s))
+    if keyframe_every is not None:
+        _REVISION_POLICY["keyframe_every"] = max(1, int(keyframe_every))
+
+def _ensure_note_revisions(conn):
+    try:
+        cur = conn.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='notes'")
+        if not cur.fetchone():
+            return  # schema not initialized yet
+        for stmt in _NOTE_REVISIONS_SCHEMA:
+            cur.execute(stmt)
+        conn.commit()
+        _REV_READY.add(DB_PATH)
+    except sqlite3.Error as e:
+        print(f"Database error in _ensure_note_revisions: {e}")
+
+def _seq_delta(old, new):
+    """Opcodes turning old into new: ["c", i, j] copies old[i:j], ["i", items] inserts."""
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new).get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", new[j1:j2]])
+    return ops
+
+def _seq_apply(old, ops):
+    out = []
+    for op in ops:
+        if op[0] == "c":
+            out.extend(old[op[1]:op[2]])
+        else:
+            out.extend(op[1])
+    return out
+
+def _overlay_parts(overlay):
+    """Overlay JSON -> {key: [canonical item JSON] for lists, else the value}."""
+    if not overlay:
+        return {}
+    try:
+        data = json.loads(overlay) if isinstance(overlay, (str, bytes)) else dict(overlay)
+    except Exception:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {k: [json.dumps(i, sort_keys=True, separators=(",", ":")) for i in v]
+            if isinstance(v, list) else v for k, v in data.items()}
+
+def _overlay_from_parts(parts):
+    if not parts:
+        return None
+    return json.dumps({k: [json.loads(i) for i in v] if isinstance(v, list) else v
+                       for k, v in parts.items()})
+
+def _overlay_delta(old, new):
+    delta = {"seq": {}, "set": {}, "del": [k for k in old if k not in new]}
+    for k, v in new.items():
+        if isinstance(v, list) and isinstance(old.get(k), list):
+            if v != old[k]:
+                delta["seq"][k] = _seq_delta(old[k], v)
+        elif old.get(k) != v or k not in old:
+            delta["set"][k] = v
+    return delta
+
+def _overlay_apply(old, delta):
+    parts = {k: v for k, v in old.items() if k not in delta.get("del", ())}
+    for k, ops in delta.get("seq", {}).items():
+        parts[k] = _seq_apply(old.get(k) or [], ops)
+    parts.update(delta.get("set", {}))
+    return parts
+
+def _pack(obj):
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"), 6)
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8")) if blob else None
+
+def _revision_digest(title, content, overlay):
+    h = hashlib.sha1()
+    for part in (title, content, overlay):
+        h.update((part or "").encode("utf-8", "ignore")); h.update(b"\0")
+    return h.hexdigest()
+
+def _revision_state(cur, note_id, rev_no):
+    """Rebuild (title, content lines, overlay parts) of a revision from its keyframe."""
+    cur.execute("""
+        SELECT rev_no, keyframe, title, content_delta, overlay_delta
+        FROM note_revisions
+        WHERE note_id = ? AND rev_no <= ?
+          AND rev_no >= (SELECT MAX(rev_no) FROM note_revisions
+                         WHERE note_id = ? AND rev_no <= ? AND keyframe = 1)
+        ORDER BY rev_no
+    """, (note_id, rev_no, note_id, rev_no))
+    rows = cur.fetchall()
+    if not rows or rows[-1][0] != rev_no:
+        return None
+    title, lines, parts = "", [], {}
+    for _no, _key, title, cdelta, odelta in rows:
+        lines = _seq_apply(lines, _unpack(cdelta) or [])
+        parts = _overlay_apply(parts, _unpack(odelta) or {})
+    return title, lines, parts
+
+def _record_revision(cur, note_id, user_id, force=False):
+    """
+    Snapshot the note's current row as a new revision if the cadence allows it
+    (or force) and it differs from the newest revision. Returns the rev_no or None.
+    """
+    cur.execute("SELECT title, content, overlay FROM notes WHERE id = ? AND user_id = ?", (note_id, user_id))
+    row = cur.fetchone()
+    if not row:
+        return None
+    title, content, overlay = row
+    cur.execute("""
+        SELECT rev_no, keyframe, digest, (julianday('now') - julianday(created_at)) * 86400
+        FROM note_revisions WHERE note_id = ? ORDER BY rev_no DESC LIMIT 1
+    """, (note_id,))
+    last = cur.fetchone()
+    digest = _revision_digest(title, content, overlay)
+    if last:
+        if last[2] == digest:
+            return None
+        if not force and last[3] is not None and last[3] < _REVISION_POLICY["interval_s"]:
+            return None
+
+    lines = (content or "").splitlines(keepends=True)
+    parts = _overlay_parts(overlay)
+    rev_no = (last[0] + 1) if last else 1
+    key = (DB_PATH, note_id)
+    with _REV_LOCK:
+        tip = _REV_TIPS.get(key)
+    if last and (tip is None or tip[0] != last[0]):
+        state = _revision_state(cur, note_id, last[0])
+        tip = (last[0], state[1], state[2]) if state else None
+    cur.execute("""
+        SELECT COUNT(*) FROM note_revisions
+        WHERE note_id = ? AND rev_no > COALESCE(
+            (SELECT MAX(rev_no) FROM note_revisions WHERE note_id = ? AND keyframe = 1), 0)
+    """, (note_id, note_id))
+    keyframe = tip is None or cur.fetchone()[0] + 1 >= _REVISION_POLICY["keyframe_every"]
+    base_lines, base_parts = ([], {}) if keyframe else (tip[1], tip[2])
+
+    cur.execute("""
+        INSERT INTO note_revisions
+            (note_id, user_id, rev_no, keyframe, title, content_delta, overlay_delta, digest, size)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, (note_id, user_id, rev_no, int(keyframe), title,
+          _pack(_seq_delta(base_lines, lines)), _pack(_overlay_delta(base_parts, parts)),
+          digest, len(content or "")))
+    with _REV_LOCK:
+        _REV_TIPS[key] = (rev_no, lines, parts)
+        _REV_TIPS.move_to_end(key)
+        while len(_REV_TIPS) > _REV_TIPS_MAX:
+            _REV_TIPS.popitem(last=False)
+    return rev_no
+
+def _revision_before_write(cur, note_id, user_id):
+    """
+    Cadence-limited snapshot of the row a save is about to overwrite, inside
+    its transaction; never fails the save. The first save of a note always
+    keeps the original, and the last state of a burst of edits is kept by the
+    first save after the interval.
+    """
+    try:
+        _record_revision(cur, note_id, user_id)
+    except (sqlite3.Error, ValueError, zlib.error) as e:
+        print(f"Note revision skipped: {e}")
+
+def snapshot_note_revision(note_id, user_id, force=True):
+    """Record a revision of the note now (e.g. on manual save). Returns rev_no or None."""
+    try:
+        conn = get_connection()
+        rev_no = _record_revision(conn.cursor(), note_id, user_id, force=force)
+        conn.commit()
+        conn.close()
+        return rev_no
+    except sqlite3.Error as e:
+        print(f"Database error in snapshot_note_revision: {e}")
+        return None
+
+def list_note_revisions(note_id, user_id):
+    """Revisions of a note, newest first (metadata only)."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT rev_no, title, size, keyframe, created_at,
+                   LENGTH(content_delta) + LENGTH(overlay_delta)
+            FROM note_revisions
+            WHERE note_id = ? AND user_id = ?
+            ORDER BY rev_no DESC
+        """, (note_id, user_id))
+        rows = cursor.fetchall()
+        conn.close()
+        return [{
+            "rev_no": r[0], "title": r[1], "size": r[2], "keyframe": bool(r[3]),
+            "created_at": r[4], "stored_bytes": r[5]
+        } for r in rows]
+    except sqlite3.Error as e:
+        print(f"Database error in list_note_revisions: {e}")
+        return []
+
+def get_note_revision(note_id, rev_no, user_id):
+    """Full title/content/overlay (JSON string) of one revision, or None."""
+    try:
+        conn = get_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT created_at FROM note_revisions WHERE note_id = ? AND rev_no = ? AND user_id = ?",
+                       (note_id, rev_no, user_id))
+        row = cursor.fetchone()
+        state = _revision_state(cursor, note_id, rev_no) if row else None
+        conn.close()
+        if not state:
+            return None
+        title, lines, parts = state
+        return {"note_id": note_id, "rev_no": rev_no, "title": title, "content": "".join(lines),
+                "overlay": _overlay_from_parts(parts), "created_at": row[0]}
+    except sqlite3.Error as e:
+        print(f"Database error in get_note_revision: {e}")
+        return None
+
+def _plain_lines(content):
+    text = str(content or "")
+    if "<" in text:
+        text = _HTML_DROP_RE.sub(" ", text)
+        text = _HTML_BREAK_RE.sub("\n", text)
+        text = _HTML_TAG_RE.sub("", text)
+    return [s for s in (l.strip() for l in html.unescape(text).splitlines()) if s]
+
+def diff_note_revisions(note_id, rev_a, rev_b=None, user_id=None, context=3):
+    """
+    Compare two revisions (rev_b=None compares against the current note).
+    Returns {"title": (a, b) or None, "text": unified diff lines of the plain text,
+             "overlay": {key: (items_removed, items_added)}} or None.
+    """
+    a = get_note_revision(note_id, rev_a, user_id)
+    if rev_b is None:
+        cur_note = get_note(note_id, user_id)
+        b = cur_note and {"title": cur_note["title"], "content": cur_note["content"],
+                          "overlay": cur_note.get("overlay")}
+    else:
+        b = get_note_revision(note_id, rev_b, user_id)
+    if not a or not b:
+        return None
+    text = list(difflib.unified_diff(_plain_lines(a["content"]), _plain_lines(b["content"]),
+                                     f"rev {rev_a}", "current" if rev_b is None else f"rev {rev_b}",
+                                     n=context, lineterm=""))
+    pa, pb = _overlay_parts(a["overlay"]), _overlay_parts(b["overlay"])
+    overlay = {}
+    for k in set(pa) | set(pb):
+        va, vb = pa.get(k) or [], pb.get(k) or []
+        if isinstance(va, list) and isinstance(vb, list) and va != vb:
+            sa, sb = set(va), set(vb)
+            overlay[k] = (sum(1 for i in va if i not in sb), sum(1 for i in vb if i not in sa))
+    return {"title": (a["title"], b["title"]) if a["title"] != b["title"] else None,
+            "text": text, "overlay": overlay}
+
+def restore_note_revision(note_id, rev_no, user_id):
+    """
+    Put a revision back into the note. The current state is snapshotted first,
+    so a restore can itself be undone. Image overlays point at the note's media
+    files, which hold the latest saved pictures.
+    """
+    rev = get_note_revision(note_id, rev_no, user_id)
+    if not rev:
+        return False
+    snapshot_note_revision(note_id, user_id, force=True)
+    return update_note(note_id, rev["title"] or "Untitled", rev["content"],
+                       rev["overlay"] or json.dumps({"strokes": [], "images": []}), user_id=user_id)
+
 # --------- Notes Tool Preferences (per user) ----------
 def get_notes_tool_prefs(user_id):
     """
@@ -842,9 +1993,9 @@ def get_notes_tool_prefs(user_id):
             data = json.loads(row[0])
             # Merge with defaults to tolerate future schema changes
             merged = dict(_DEFAULT_TOOL_PREFS)
-            merged.update({k: v for k, v in data.items() if k in ("colors", "widths", "alphas", "eraser_mode")})
+            merged.update({k: v for k, v in data.items() if k in ("colors", "widths", "alphas", "eraser_mode", "undo")})
             # Ensure nested dicts exist
-            for k in ("colors", "widths", "alphas"):
+            for k in ("colors", "widths", "alphas", "undo"):
                 merged[k] = dict(_DEFAULT_TOOL_PREFS[k], **merged.get(k, {}))
             return merged
         except Exception:
@@ -857,7 +2008,8 @@ def set_notes_tool_prefs(user_id, prefs_dict):
     """
     Upsert per-user tool preferences as JSON.
     Expects a dict like:
-      {"colors": {...}, "widths": {...}, "alphas": {...}, "eraser_mode": "normal|lasso"}
+      {"colors": {...}, "widths": {...}, "alphas": {...}, "eraser_mode": "normal|lasso",
+       "undo": {"max_depth": int, "max_mb": int}}
     """
     try:
         payload = json.dumps(prefs_dict or {}, ensure_ascii=False)
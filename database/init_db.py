@@ -3,6 +3,11 @@ import sqlite3
 import hashlib
 import secrets
 
+try:
+    from database.db_manager import DEFAULT_GRADING_SCHEME, _save_grading_scheme
+except ImportError:   # run as database/init_db.py
+    from db_manager import DEFAULT_GRADING_SCHEME, _save_grading_scheme
+
 def hash_password(password, salt=None):
     """Hash password with salt using SHA-256"""
     if salt is None:
@@ -121,6 +126,61 @@ CREATE TABLE IF NOT EXISTS gpa_courses (
 )
 """)
 
+# 8b. Grading schemes (grade -> quality points; several schemes, e.g. per faculty or intake)
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS grading_schemes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    code TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    is_default INTEGER NOT NULL DEFAULT 0
+)
+""")
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS grading_scheme_grades (
+    scheme_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    grade TEXT NOT NULL,
+    points REAL NOT NULL,
+    min_mark INTEGER,
+    max_mark INTEGER,
+    PRIMARY KEY (scheme_id, grade),
+    FOREIGN KEY (scheme_id) REFERENCES grading_schemes(id) ON DELETE CASCADE
+)
+""")
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS student_grading_schemes (
+    student_id TEXT PRIMARY KEY,
+    scheme_id INTEGER NOT NULL,
+    FOREIGN KEY (student_id) REFERENCES users(student_id),
+    FOREIGN KEY (scheme_id) REFERENCES grading_schemes(id)
+)
+""")
+if not _table_has_column("gpa_history", "scheme_code"):
+    cursor.execute("ALTER TABLE gpa_history ADD COLUMN scheme_code TEXT")
+
+# 8c. GPA summary (one row per student, maintained by save_gpa_calculation)
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS gpa_summary (
+    student_id TEXT PRIMARY KEY,
+    records INTEGER NOT NULL,
+    last_history_id INTEGER,
+    last_timestamp TEXT,
+    latest_gpa REAL,
+    latest_cgpa REAL,
+    total_credits INTEGER,
+    best_gpa REAL,
+    best_history_id INTEGER,
+    worst_gpa REAL,
+    worst_history_id INTEGER,
+    sum_x REAL NOT NULL DEFAULT 0,
+    sum_y REAL NOT NULL DEFAULT 0,
+    sum_xy REAL NOT NULL DEFAULT 0,
+    sum_xx REAL NOT NULL DEFAULT 0,
+    trend_slope REAL NOT NULL DEFAULT 0,
+    FOREIGN KEY (student_id) REFERENCES users(student_id)
+)
+""")
+
 # 9. Folders
 cursor.execute("""
 CREATE TABLE IF NOT EXISTS folders (
@@ -167,10 +227,43 @@ CREATE TABLE IF NOT EXISTS notes_tool_prefs (
 )
 """)
 
+# 12. Note revisions (compressed deltas; see db_manager "Note revisions")
+cursor.execute("""
+CREATE TABLE IF NOT EXISTS note_revisions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    rev_no INTEGER NOT NULL,
+    keyframe INTEGER NOT NULL DEFAULT 0,
+    title TEXT,
+    content_delta BLOB,
+    overlay_delta BLOB,
+    digest TEXT,
+    size INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (note_id, rev_no)
+)
+""")
+cursor.execute("""
+CREATE TRIGGER IF NOT EXISTS note_revisions_ad AFTER DELETE ON notes BEGIN
+    DELETE FROM note_revisions WHERE note_id = old.id;
+END
+""")
+
+# Helpful indexes for GPA history (courses per record, keyset paging per student)
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_gpa_courses_history ON gpa_courses(gpa_history_id)")
+cursor.execute("CREATE INDEX IF NOT EXISTS idx_gpa_history_student ON gpa_history(student_id, timestamp, id)")
+
 # Helpful indexes for notes
 cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_title   ON notes(title)")
 cursor.execute("CREATE INDEX IF NOT EXISTS idx_notes_updated ON notes(updated_at)")
 
+# Insert the default grading scheme (the one db_manager falls back to)
+cursor.execute("SELECT 1 FROM grading_schemes LIMIT 1")
+if not cursor.fetchone():
+    code, name, grades = DEFAULT_GRADING_SCHEME
+    _save_grading_scheme(cursor, code, name, grades, is_default=True)
+
 # Insert Locations
 cursor.executemany("INSERT OR IGNORE INTO locations (id, name) VALUES (?, ?)", [
     (1, 'Cyber Centre Discussion Room'),
@@ -1,17 +1,21 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, 
                              QPushButton, QGroupBox, QGridLayout, QMessageBox)
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QIcon, QDoubleValidator, QIntValidator
-from styles.gpa_styles import gpa_styles
+from PyQt5.QtCore import Qt, QRegExp
+from PyQt5.QtGui import QDoubleValidator, QIntValidator, QRegExpValidator
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
+from .goal_planner import plan_goal
+from .grading import scheme_for
 
 class GoalCalculatorPage(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.parent = parent
+        self.scheme = scheme_for(parent.current_user_id)
         self.current_cgpa = 0.0
         self.completed_credits = 0
         
-        self.setStyleSheet(gpa_styles())
+        apply_scope(self, "gpa")
         self.init_ui()
     
     def init_ui(self):
@@ -30,7 +34,7 @@ class GoalCalculatorPage(QWidget):
 
         # Reset button
         reset_btn = QPushButton("Reset")
-        reset_btn.setIcon(QIcon("Photo/reset.png"))
+        reset_btn.setIcon(assets.icon("Photo/reset.png"))
         reset_btn.setObjectName("resetButton")
         reset_btn.setCursor(Qt.PointingHandCursor) 
         reset_btn.setFixedSize(110, 45)
@@ -41,7 +45,7 @@ class GoalCalculatorPage(QWidget):
         layout.addLayout(title_bar)
         
         # Description
-        desc = QLabel("Calculate the GPA you need next semester to reach your target CGPA")
+        desc = QLabel("Calculate the GPA you need over your next semesters to reach your target CGPA")
         desc.setObjectName("gpaSubheader")
         layout.addWidget(desc)
         
@@ -52,7 +56,7 @@ class GoalCalculatorPage(QWidget):
         input_layout.setSpacing(10)
         
         # Add input validators
-        cgpa_validator = QDoubleValidator(0.0, 4.0, 2)
+        cgpa_validator = QDoubleValidator(0.0, self.scheme.max_points, 2)
         cgpa_validator.setNotation(QDoubleValidator.StandardNotation)
         
         credits_validator = QIntValidator(0, 999)
@@ -78,11 +82,11 @@ class GoalCalculatorPage(QWidget):
         self.target_cgpa_input.setValidator(cgpa_validator)
         input_layout.addWidget(self.target_cgpa_input, 2, 1)
         
-        # Future Credits (next semester)
-        input_layout.addWidget(QLabel("Next Semester Credits:"), 3, 0)
+        # Future Credits (one load per future semester, comma separated)
+        input_layout.addWidget(QLabel("Future Semester Credits:"), 3, 0)
         self.future_credits_input = QLineEdit()
-        self.future_credits_input.setPlaceholderText("E.g. 15")
-        self.future_credits_input.setValidator(credits_validator)
+        self.future_credits_input.setPlaceholderText("E.g. 15 or 15, 18, 12")
+        self.future_credits_input.setValidator(QRegExpValidator(QRegExp(r"\d{0,2}(\s*,\s*\d{0,2}){0,11}"), self))
         input_layout.addWidget(self.future_credits_input, 3, 1)
         
         layout.addWidget(input_group)
@@ -112,9 +116,15 @@ class GoalCalculatorPage(QWidget):
         self.scenario_label.setAlignment(Qt.AlignCenter)
         self.scenario_label.setWordWrap(True)
         
+        # Ranked grade plans (easiest first)
+        self.plans_label = QLabel()
+        self.plans_label.setWordWrap(True)
+        self.plans_label.setTextFormat(Qt.RichText)
+        
         results_layout.addWidget(self.required_gpa_label)
         results_layout.addWidget(self.explanation_label)
         results_layout.addWidget(self.scenario_label)
+        results_layout.addWidget(self.plans_label)
         
         layout.addWidget(self.results_group)
         layout.addStretch()
@@ -127,9 +137,9 @@ class GoalCalculatorPage(QWidget):
                 
             if is_float:
                 value = float(text)
-                if value < 0 or value > 4.0:  # CGPA should be between 0 and 4.0
+                if value < 0 or value > self.scheme.max_points:  # CGPA is on the scheme's scale
                     QMessageBox.warning(self, "Invalid Input", 
-                                    f"{field_name} must be between 0.0 and 4.0")
+                                    f"{field_name} must be between 0.00 and {self.scheme.max_points:.2f}")
                     return False, 0
             else:
                 value = int(text)
@@ -165,9 +175,12 @@ class GoalCalculatorPage(QWidget):
             self.target_cgpa_input.text(), "Target CGPA", is_float=True
         ))
         
-        validations.append(self.validate_numeric_input(
-            self.future_credits_input.text(), "Next Semester Credits", allow_zero=False
-        ))
+        loads = [part.strip() for part in self.future_credits_input.text().split(",") if part.strip()]
+        for load in loads:
+            valid, value = self.validate_numeric_input(load, "Future Semester Credits", allow_zero=False)
+            if not valid:
+                return
+        semester_loads = [int(load) for load in loads]
         
         # Check if any fields are empty
         empty_fields = []
@@ -177,8 +190,8 @@ class GoalCalculatorPage(QWidget):
             empty_fields.append("Completed Credits")
         if not self.target_cgpa_input.text().strip():
             empty_fields.append("Target CGPA")
-        if not self.future_credits_input.text().strip():
-            empty_fields.append("Next Semester Credits")
+        if not loads:
+            empty_fields.append("Future Semester Credits")
         
         # Show single error message for empty fields
         if empty_fields:
@@ -195,7 +208,6 @@ class GoalCalculatorPage(QWidget):
         current_cgpa = validations[0][1]
         completed_credits = validations[1][1]
         target_cgpa = validations[2][1]
-        future_credits = validations[3][1]
         
         # Additional validation: Target CGPA should be achievable
         if target_cgpa < current_cgpa:
@@ -203,26 +215,27 @@ class GoalCalculatorPage(QWidget):
                             "Target CGPA cannot be lower than current CGPA")
             return
             
-        # Calculate required GPA
-        current_total = current_cgpa * completed_credits
-        future_total = target_cgpa * (completed_credits + future_credits)
-        required_gpa = (future_total - current_total) / future_credits
-        
-        # Clamp between 0-4.0 and round
-        required_gpa = max(0.0, min(4.0, round(required_gpa, 2)))
+        # Required average GPA plus ranked grade plans over the future semesters
+        result = plan_goal(current_cgpa, completed_credits, target_cgpa, semester_loads,
+                           self.scheme.points, max_plans=3)
+        required_gpa = max(0.0, round(result["required_gpa"], 2))
 
         # Display results
-        self.required_gpa_label.setText(f"Required GPA: {required_gpa:.2f}")
+        self.required_gpa_label.setText(f"Required GPA: {min(required_gpa, self.scheme.max_points):.2f}")
             
         # Set the explanation
+        when = "in your next semester" if len(semester_loads) == 1 else \
+            f"on average over your next {len(semester_loads)} semesters ({sum(semester_loads)} credits)"
         explanation_text = f"""To reach your target CGPA of {target_cgpa:.2f}, you need to get 
-    a GPA of {required_gpa:.2f} in your next semester."""
+    a GPA of {required_gpa:.2f} {when}."""
             
         self.explanation_label.setText(explanation_text)
+        self.plans_label.setText(self.format_plans(result["plans"]))
 
         # Add scenario analysis
-        if required_gpa > 4.0:
-            scenario = "⚠️  Target exceeds maximum GPA - recommend adjusting timeline or goal"
+        if not result["plans"]:
+            scenario = (f"⚠️  Target exceeds maximum GPA - the best reachable CGPA is {result['max_cgpa']:.2f}. "
+                        "Recommend adjusting timeline or goal")
         elif required_gpa >= 3.7:
             scenario = "🎯 Challenging but possible! Plan for dedicated study time"
         elif required_gpa >= 3.0:
@@ -233,6 +246,21 @@ class GoalCalculatorPage(QWidget):
         self.scenario_label.setText(scenario)
         self.results_group.setVisible(True)
 
+    def format_plans(self, plans):
+        """Ranked plans as rich text: one line per semester with its grade mix"""
+        if not plans:
+            return ""
+        lines = []
+        for n, plan in enumerate(plans, 1):
+            lines.append(f"<b>Plan {n}</b> (final CGPA {plan['cgpa']:.2f}, hardest grade {plan['hardest']})")
+            for s, sem in enumerate(plan["semesters"], 1):
+                mix = {}
+                for _credits, letter in sem["grades"]:
+                    mix[letter] = mix.get(letter, 0) + 1
+                grades = ", ".join(f"{count}× {letter}" for letter, count in mix.items())
+                lines.append(f"&nbsp;&nbsp;Semester {s} ({sem['credits']} cr): GPA {sem['gpa']:.2f} — {grades}")
+        return "<br>".join(lines)
+
     def reset_all(self):
         """Reset all inputs"""
         reply = QMessageBox.question(self, 'Reset Confirmation', 
@@ -253,4 +281,5 @@ class GoalCalculatorPage(QWidget):
             # Optional: Clear result labels
             self.required_gpa_label.clear()
             self.explanation_label.clear()
+            self.plans_label.clear()
             self.scenario_label.clear()
\ No newline at end of file
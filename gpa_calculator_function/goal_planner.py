@@ -0,0 +1,143 @@
+# goal_planner.py
+"""
+Goal planning over one or more future semesters.
+
+Each future semester is a credit load, split into courses of COURSE_CREDITS
+(plus a smaller remainder course). A plan gives every course a grade from
+the grading scheme so that the final CGPA reaches the target. Effort is
+measured as the quality points a plan needs: less is easier. Between plans
+that need the same points, the one with the mildest hardest grade and the
+most even semesters wins.
+
+The search is a dynamic program over quality-point totals. Grade points are
+converted to an integer unit first (thirds for the 4.00 / 3.67 / 3.33 ...
+scheme), so the number of distinct totals stays in the low thousands:
+  1. per semester: the easiest grade mix for every reachable semester total
+  2. across semesters: the most even plan for every reachable overall total,
+     keeping only totals that can still reach the target and that are not
+     far beyond it
+The cheapest totals at or above the target give the ranked plans.
+"""
+COURSE_CREDITS = 3   # a semester load is split into courses of this size
+MAX_PLANS      = 5
+
+
+def split_load(credits, course_credits=COURSE_CREDITS):
+    """Course credit values for one semester load, e.g. 14 -> [3, 3, 3, 3, 2]."""
+    credits = int(credits)
+    courses = [course_credits] * (credits // course_credits)
+    if credits % course_credits:
+        courses.append(credits % course_credits)
+    return courses
+
+
+def grade_levels(scheme):
+    """Distinct grade points of a {grade: points} scheme, highest first, each with one letter."""
+    by_points = {}
+    for letter, points in scheme.items():
+        by_points[round(float(points), 2)] = letter  # for equal points the later letter (A over A+)
+    return [(by_points[p], p) for p in sorted(by_points, reverse=True)]
+
+
+def _unit(points):
+    """Smallest denominator d (<= 12) making every points * d an integer (2-decimal rounding allowed)."""
+    for d in range(1, 13):
+        if all(abs(p * d - round(p * d)) <= 0.006 * d for p in points):
+            return d
+    return 100
+
+
+def _semester_options(courses, units):
+    """
+    {semester total: grade index per course} for every reachable total, keeping
+    the easiest mix (its hardest grade as low as possible, then the next, ...).
+    """
+    states = {0: ((), ())}   # total -> (sorted grade indexes = difficulty key, per-course indexes)
+    for credits in courses:
+        nxt = {}
+        for total, (key, grades) in states.items():
+            for i, u in enumerate(units):
+                t = total + credits * u
+                cand_key = tuple(sorted(key + (i,)))
+                best = nxt.get(t)
+                # larger indexes are lower grades: the larger key is the easier mix
+                if best is None or cand_key > best[0]:
+                    nxt[t] = (cand_key, grades + (i,))
+        states = nxt
+    return {t: grades for t, (_key, grades) in states.items()}
+
+
+def plan_goal(current_cgpa, completed_credits, target_cgpa, semester_loads, scheme,
+              max_plans=MAX_PLANS, course_credits=COURSE_CREDITS):
+    """
+    Ranked plans reaching target_cgpa after the given future semester loads,
+    using the grades of scheme ({grade: points}).
+
+    Returns {"required_gpa": average GPA needed over all future credits,
+    "max_cgpa": best CGPA reachable, "plans": [...]} where each plan is
+    {"cgpa", "points", "hardest", "semesters": [{"credits", "gpa", "grades"}]}
+    (grades as [(course credits, letter)]), easiest first. "plans" is empty
+    when the target cannot be reached.
+    """
+    levels = grade_levels(scheme)
+    letters = [l for l, _p in levels]
+    points = [p for _l, p in levels]
+    d = _unit(points)
+    units = [int(round(p * d)) for p in points]
+
+    semesters = [split_load(c, course_credits) for c in semester_loads if int(c) > 0]
+    future = sum(sum(c) for c in semesters)
+    completed = int(completed_credits)
+    all_credits = completed + future
+    result = {"required_gpa": 0.0, "max_cgpa": float(current_cgpa), "plans": []}
+    if not future:
+        return result
+
+    # quality points still needed from the future courses, in units (rounded up)
+    need = target_cgpa * all_credits - current_cgpa * completed
+    result["required_gpa"] = need / future
+    result["max_cgpa"] = (current_cgpa * completed + points[0] * future) / all_credits
+    need_u = max(0, int(-(-round(need * d, 6) // 1)))
+
+    options = [_semester_options(courses, units) for courses in semesters]
+    max_rest = [0] * (len(options) + 1)
+    for k in range(len(options) - 1, -1, -1):
+        max_rest[k] = max_rest[k + 1] + max(options[k])
+    if max_rest[0] < need_u:
+        return result
+
+    # the max_plans cheapest totals lie within a few course grades of the need
+    slack = max(c for courses in semesters for c in courses) * units[0] * max(1, max_plans)
+    cap = need_u + slack
+    # total -> ((hardest grade as -index, evenness), per-semester totals)
+    plans = {0: ((-len(units), 0.0), ())}
+    for k, opts in enumerate(options):
+        credits = sum(semesters[k])
+        nxt = {}
+        for total, ((hard, spread), picks) in plans.items():
+            for sem_total, grades in opts.items():
+                t = total + sem_total
+                if t > cap or t + max_rest[k + 1] < need_u:
+                    continue
+                gpa = sem_total / (d * credits)
+                key = (max(hard, -min(grades)), spread + gpa * gpa * credits)
+                best = nxt.get(t)
+                if best is None or key < best[0]:
+                    nxt[t] = (key, picks + (sem_total,))
+        plans = nxt
+
+    ranked = sorted((t for t in plans if t >= need_u))[:max_plans]
+    for t in ranked:
+        (hard, _spread), picks = plans[t]
+        sems = []
+        for courses, opts, sem_total in zip(semesters, options, picks):
+            grades = sorted(zip(courses, opts[sem_total]), key=lambda cg: (cg[1], -cg[0]))
+            sems.append({"credits": sum(courses), "gpa": sem_total / (d * sum(courses)),
+                         "grades": [(c, letters[i]) for c, i in grades]})
+        result["plans"].append({
+            "cgpa": (current_cgpa * completed + t / d) / all_credits,
+            "points": t / d,
+            "hardest": letters[-hard],
+            "semesters": sems,
+        })
+    return result
@@ -5,26 +5,28 @@ from PyQt5.QtWidgets import (
     QHeaderView, QDialog, QStackedWidget
 )
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QFont, QDoubleValidator, QIntValidator
+from PyQt5.QtGui import QFont, QDoubleValidator, QIntValidator
 import sys
-from styles.gpa_styles import gpa_styles
-from database.db_manager import save_gpa_calculation, get_gpa_history  # Import database functions
-from .gpaHistory import GPAHistory
-
-qualityPoint = {
-    "A+": 4.00, "A": 4.00, "A-": 3.67,
-    "B+": 3.33, "B": 3.00, "B-": 2.67,
-    "C+": 2.33, "C": 2.00, "F": 0.00
-}
+import numpy as np
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
+from database.db_manager import save_gpa_calculation  # Import database functions
+from .gpa_engine import semester_totals, combine_cgpa
+from .grading import scheme_for
 
 class GPACalculatorPage(QWidget):
     def __init__(self, main_window):
         super().__init__()
         self.main_window = main_window
         self.current_user_id = main_window.current_user_id
+        self.scheme = scheme_for(self.current_user_id)
         self.course_rows = []
+        # credits / quality points per course row (same order as course_rows)
+        self._credits = np.zeros(0)
+        self._points = np.zeros(0)
+        self._sem_credits, self._gpa = 0, 0.0
         
-        self.setStyleSheet(gpa_styles())
+        apply_scope(self, "gpa")
         self.init_ui()
         self.update_results()
     
@@ -58,7 +60,7 @@ class GPACalculatorPage(QWidget):
 
         # Reset button
         reset_btn = QPushButton("Reset")
-        reset_btn.setIcon(QIcon("Photo/reset.png"))
+        reset_btn.setIcon(assets.icon("Photo/reset.png"))
         reset_btn.setObjectName("resetButton")
         reset_btn.setCursor(Qt.PointingHandCursor) 
         reset_btn.setFixedSize(110, 45)
@@ -67,7 +69,7 @@ class GPACalculatorPage(QWidget):
     
         # History button on the right
         history_btn = QPushButton("View History")
-        history_btn.setIcon(QIcon("Photo/history_gpa.png"))
+        history_btn.setIcon(assets.icon("Photo/history_gpa.png"))
         history_btn.setObjectName("historyButton")
         history_btn.setCursor(Qt.PointingHandCursor) 
         history_btn.setFixedSize(180, 45)
@@ -121,7 +123,7 @@ class GPACalculatorPage(QWidget):
         status_layout.setHorizontalSpacing(15)
 
         # Add input validators
-        cgpa_validator = QDoubleValidator(0.0, 4.0, 2)
+        cgpa_validator = QDoubleValidator(0.0, self.scheme.max_points, 2)
         cgpa_validator.setNotation(QDoubleValidator.StandardNotation)
         
         credits_validator = QIntValidator(0, 10)
@@ -129,12 +131,17 @@ class GPACalculatorPage(QWidget):
         self.cgpa_input = QLineEdit()
         self.cgpa_input.setPlaceholderText("E.g. 3.75")
         self.cgpa_input.setValidator(cgpa_validator)
-        self.cgpa_input.textChanged.connect(self.update_results)
+        self.cgpa_input.textChanged.connect(self._update_cgpa)
+        # warn once when the user leaves the field, not on every keystroke
+        self.cgpa_input.editingFinished.connect(
+            lambda: self.validate_numeric_input(self.cgpa_input.text(), "CGPA", is_float=True))
 
         self.credits_input = QLineEdit()
         self.credits_input.setPlaceholderText("E.g. 45")
         self.credits_input.setValidator(credits_validator)
-        self.credits_input.textChanged.connect(self.update_results)
+        self.credits_input.textChanged.connect(self._update_cgpa)
+        self.credits_input.editingFinished.connect(
+            lambda: self.validate_numeric_input(self.credits_input.text(), "Completed Credits"))
 
         status_layout.addWidget(QLabel("Current CGPA:"), 0, 0)
         status_layout.addWidget(self.cgpa_input, 0, 1)
@@ -198,7 +205,7 @@ class GPACalculatorPage(QWidget):
 
         # Add Course button at the bottom of the groupbox
         add_btn_inside = QPushButton("Add Course")
-        add_btn_inside.setIcon(QIcon("Photo/plus.png"))
+        add_btn_inside.setIcon(assets.icon("Photo/plus.png"))
         add_btn_inside.setObjectName("addCourseButton")
         add_btn_inside.setCursor(Qt.PointingHandCursor)
         add_btn_inside.setFixedSize(300, 35)
@@ -261,7 +268,7 @@ class GPACalculatorPage(QWidget):
                 small_separator = QFrame()
                 small_separator.setFrameShape(QFrame.HLine)
                 small_separator.setFrameShadow(QFrame.Plain)
-                small_separator.setStyleSheet("background-color: #eee;")
+                small_separator.setObjectName("resultItemSeparator")
                 small_separator.setFixedHeight(1)
                 result_layout.addWidget(small_separator)
         
@@ -273,7 +280,7 @@ class GPACalculatorPage(QWidget):
         
         # Save button
         save_btn = QPushButton(" Save My Calculation")
-        save_btn.setIcon(QIcon("Photo/save.png"))
+        save_btn.setIcon(assets.icon("Photo/save.png"))
         save_btn.setObjectName("saveButton")
         save_btn.setCursor(Qt.PointingHandCursor)
         save_btn.setFixedSize(770, 43)
@@ -299,14 +306,13 @@ class GPACalculatorPage(QWidget):
         credits.setValue(0)
         credits.setFixedWidth(75)
         credits.setFixedHeight(35)
-        credits.valueChanged.connect(self.update_results)
+        credits.valueChanged.connect(lambda _v: self._course_changed(row_widget))
 
         grade = QComboBox()
-        grade.addItems(list(qualityPoint.keys()))
+        grade.addItems([band.grade for band in self.scheme.bands])
         grade.setCurrentIndex(0)
         grade.setFixedWidth(70)
-        grade.currentIndexChanged.connect(self.update_results)
-        grade.view().setStyleSheet("background-color: white; color: black;")
+        grade.currentIndexChanged.connect(lambda _i: self._course_changed(row_widget))
 
         remove_btn = QPushButton("×")
         remove_btn.setFixedSize(35, 35)
@@ -334,8 +340,8 @@ class GPACalculatorPage(QWidget):
             if widget == row_widget:
                 # Disconnect signals first
                 try:
-                    credits.valueChanged.disconnect(self.update_results)
-                    grade.currentIndexChanged.disconnect(self.update_results)
+                    credits.valueChanged.disconnect()
+                    grade.currentIndexChanged.disconnect()
                 except:
                     pass
                 
@@ -379,9 +385,9 @@ class GPACalculatorPage(QWidget):
                 
             if is_float:
                 value = float(text)
-                if value <= 0 or value > 4.0:  # CGPA should be between 0 and 4.0
+                if value <= 0 or value > self.scheme.max_points:  # CGPA is on the scheme's scale
                     QMessageBox.warning(self, "Invalid Input", 
-                                    f"{field_name} must be between 0.0 and 4.0")
+                                    f"{field_name} must be between 0.00 and {self.scheme.max_points:.2f}")
                     return False, 0  # Return 0 instead of None
             else:
                 value = int(text)
@@ -395,59 +401,54 @@ class GPACalculatorPage(QWidget):
                             f"Please enter a valid number for {field_name}")
             return False, 0  # Return 0 instead of None
 
-    def update_results(self):
-        total_quality_points = 0
-        total_credits = 0
-        valid_courses = 0
-
-        for name, credits, grade, widget in self.course_rows:
-            selected_grade = grade.currentText()
-            credit_val = credits.value()
-
-            if selected_grade in qualityPoint and credit_val > 0:
-                gp = qualityPoint[selected_grade]
-                total_quality_points += gp * credit_val
-                total_credits += credit_val
-                valid_courses += 1
+    def _row_values(self, credits, grade):
+        """(credits, quality points) of one course row (NaN points for an unknown grade)"""
+        return credits.value(), self.scheme.points.get(grade.currentText(), float("nan"))
 
-        self.semester_credits_label.setText(str(total_credits))
-        
-        # Calculate GPA
-        if total_credits > 0:
-            gpa = total_quality_points / total_credits
-            self.gpa_label.setText(f"{gpa:.2f}")
-        else:
-            self.gpa_label.setText("0.00")
-            gpa = 0
-
-        # Validate inputs before CGPA calculation
-        cgpa_valid, current_cgpa = self.validate_numeric_input(
-            self.cgpa_input.text(), "CGPA", is_float=True
-        )
-        
-        credits_valid, completed_credits = self.validate_numeric_input(
-            self.credits_input.text(), "Completed Credits"
-        )
+    def _course_changed(self, row_widget):
+        """One course row changed: update only its slot, then the totals"""
+        for i, (name, credits, grade, widget) in enumerate(self.course_rows):
+            if widget is row_widget:
+                self._credits[i], self._points[i] = self._row_values(credits, grade)
+                break
+        self._update_semester()
 
-        # Only calculate CGPA if we have valid inputs
-        if cgpa_valid and credits_valid:
-            try:
-                total_completed = completed_credits + total_credits
-                if total_completed > 0:
-                    overall_points = current_cgpa * completed_credits + gpa * total_credits
-                    new_cgpa = overall_points / total_completed
-                    self.total_credits_label.setText(str(total_completed))
-                    self.cgpa_label.setText(f"{new_cgpa:.2f}")
-                else:
-                    self.total_credits_label.setText("0")
-                    self.cgpa_label.setText("0.00")
-            except ZeroDivisionError:
-                self.total_credits_label.setText(str(total_credits))
-                self.cgpa_label.setText(f"{gpa:.2f}")
+    def update_results(self):
+        """Rebuild the course arrays from all rows and refresh every result"""
+        values = [self._row_values(credits, grade) for name, credits, grade, widget in self.course_rows]
+        self._credits = np.array([v[0] for v in values], dtype=float)
+        self._points = np.array([v[1] for v in values], dtype=float)
+        self._update_semester()
+
+    def _update_semester(self):
+        self._sem_credits, self._gpa = semester_totals(self._credits, self._points)
+        self.semester_credits_label.setText(str(self._sem_credits))
+        self.gpa_label.setText(f"{self._gpa:.2f}")
+        self._update_cgpa()
+
+    def _prior_inputs(self):
+        """(valid, current CGPA, completed credits) parsed quietly from the status inputs"""
+        cgpa_text, credits_text = self.cgpa_input.text(), self.credits_input.text()
+        try:
+            current_cgpa = float(cgpa_text) if cgpa_text else 0.0
+            completed_credits = int(credits_text) if credits_text else 0
+        except ValueError:
+            return False, 0.0, 0
+        if (cgpa_text and not 0 < current_cgpa <= self.scheme.max_points) or completed_credits < 0:
+            return False, 0.0, 0
+        return True, current_cgpa, completed_credits
+
+    def _update_cgpa(self):
+        """CGPA from the cached semester totals (no popups; see editingFinished)"""
+        valid, current_cgpa, completed_credits = self._prior_inputs()
+        if valid:
+            total, cgpa = combine_cgpa(current_cgpa, completed_credits, self._sem_credits, self._gpa)
+            self.total_credits_label.setText(str(int(total)))
+            self.cgpa_label.setText(f"{float(cgpa):.2f}")
         else:
             # Show only semester results if CGPA inputs are invalid
-            self.total_credits_label.setText(str(total_credits))
-            self.cgpa_label.setText(f"{gpa:.2f}")
+            self.total_credits_label.setText(str(self._sem_credits))
+            self.cgpa_label.setText(f"{self._gpa:.2f}")
     
     def reset_after_save(self):
         """Reset input fields after successful save"""
@@ -459,8 +460,8 @@ class GPACalculatorPage(QWidget):
         # Disconnect signals first to avoid update_results calls
         for name, credits, grade, widget in self.course_rows:
             try:
-                credits.valueChanged.disconnect(self.update_results)
-                grade.currentIndexChanged.disconnect(self.update_results)
+                credits.valueChanged.disconnect()
+                grade.currentIndexChanged.disconnect()
             except:
                 pass
             widget.deleteLater()
@@ -517,7 +518,8 @@ class GPACalculatorPage(QWidget):
         # Save to database using db_manager function
         success = save_gpa_calculation(
             self.current_user_id, semester_credits, gpa, 
-            total_credits, cgpa, courses_data, current_cgpa, completed_credits
+            total_credits, cgpa, courses_data, current_cgpa, completed_credits,
+            scheme_code=self.scheme.code
         )
         
         if success:
@@ -528,13 +530,9 @@ class GPACalculatorPage(QWidget):
 
     def show_history(self):
         """Show history from GPA calculator page - should return to calculator"""
-        history_data = get_gpa_history(self.current_user_id)
-        
-        # Create history page with proper parent reference
-        history_page = GPAHistory(self.main_window, history_data, self, from_calculator=True)
-        
-        # Add to main window's pages stack
-        self.main_window.pages.addWidget(history_page)
+        # Reuse the widget's one history page (only rows saved since the last visit are added)
+        history_page = self.main_window.history_page
+        history_page.refresh_data(from_calculator=True)
         self.main_window.pages.setCurrentWidget(history_page)
         
         # Update back button text
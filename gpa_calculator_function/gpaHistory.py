@@ -2,32 +2,45 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, QTableW
                              QHeaderView, QPushButton, QStackedWidget)
 from PyQt5.QtCore import Qt
 from datetime import datetime
-from styles.gpa_styles import gpa_styles
+from styles.style_registry import apply_scope
 from gpa_calculator_function.historyDetails import GPAHistoryDetails
+from gpa_calculator_function.history_model import history_model
 
 class GPAHistory(QWidget):
-    def __init__(self, parent, history_data, previous_page, from_calculator=False):
+    """
+    The one history view of a GPACalculatorWidget. It is built on the first
+    refresh_data() and afterwards only gets the rows saved since (see
+    GPAHistoryModel), wherever it is opened from.
+    """
+    def __init__(self, parent, previous_page, from_calculator=False):
         super().__init__()
         self.parent = parent  # This is GPACalculatorWidget
-        self.history_data = history_data
+        self.model = history_model(parent.current_user_id)  # cached records + summary row
         self.previous_page = previous_page  # This should be the calculator's feature grid page
         self.from_calculator = from_calculator  # Flag to track where we came from
+        self.table = None
+        self.summary_label = None
         
-        self.setStyleSheet(gpa_styles())
+        apply_scope(self, "gpa")
         
         # Create a local stacked widget for history navigation
         self.history_stack = QStackedWidget()
         self.init_ui()
 
+    @property
+    def history_data(self):
+        return self.model.records
+
+    @property
+    def summary(self):
+        return self.model.summary
+
     def init_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         
-        # Add the history stack to layout
+        # Add the history stack to layout; the table is built on the first refresh_data()
         layout.addWidget(self.history_stack)
-        
-        # Show the table view initially
-        self.show_table_view()
 
     def show_table_view(self):
         """Show the main history table"""
@@ -35,6 +48,8 @@ class GPAHistory(QWidget):
         if hasattr(self, 'table_widget'):
             self.history_stack.removeWidget(self.table_widget)
             self.table_widget.deleteLater()
+        self.table = None
+        self.summary_label = None
         
         self.table_widget = QWidget()
         table_layout = QVBoxLayout(self.table_widget)
@@ -43,6 +58,10 @@ class GPAHistory(QWidget):
         title = QLabel("GPA Calculation History")
         title.setObjectName("gpaHeader")
         table_layout.addWidget(title)
+
+        if self.summary:
+            self.summary_label = QLabel(self.summary_text(self.summary))
+            table_layout.addWidget(self.summary_label)
         
         if not self.history_data:
             no_data_label = QLabel("No history found.")
@@ -63,56 +82,18 @@ class GPAHistory(QWidget):
             # Set word wrap for all items
             self.table.setWordWrap(True)
             
-            # Populate table
-            for i, record in enumerate(self.history_data):
-                self.table.insertRow(i)
-                date_obj = datetime.fromisoformat(record['timestamp'].replace('Z', '+00:00'))
-                date_str = date_obj.strftime("%Y-%m-%d %H:%M")
-                
-                # Create items with word wrap enabled
-                date_item = QTableWidgetItem(date_str)
-                date_item.setTextAlignment(Qt.AlignLeft)
-                
-                credits_item = QTableWidgetItem(str(record['semester_credits']))
-                credits_item.setTextAlignment(Qt.AlignCenter)
-                
-                gpa_item = QTableWidgetItem(f"{record['gpa']:.2f}")
-                gpa_item.setTextAlignment(Qt.AlignCenter)
-                
-                total_credits_item = QTableWidgetItem(str(record['total_credits']))
-                total_credits_item.setTextAlignment(Qt.AlignCenter)
-                
-                cgpa_item = QTableWidgetItem(f"{record['cgpa']:.2f}")
-                cgpa_item.setTextAlignment(Qt.AlignCenter)
-                
-                prev_cgpa_text = f"{record['current_cgpa']:.2f} ({record['completed_credits']} credits)"
-                prev_cgpa_item = QTableWidgetItem(prev_cgpa_text)
-                prev_cgpa_item.setTextAlignment(Qt.AlignLeft)
-                
-                # Set items to the table
-                self.table.setItem(i, 0, date_item)
-                self.table.setItem(i, 1, credits_item)
-                self.table.setItem(i, 2, gpa_item)
-                self.table.setItem(i, 3, total_credits_item)
-                self.table.setItem(i, 4, cgpa_item)
-                self.table.setItem(i, 5, prev_cgpa_item)
-                
-                view_btn = QPushButton("Details")
-                view_btn.setObjectName("detailsButton")
-                view_btn.setCursor(Qt.PointingHandCursor) 
-                view_btn.clicked.connect(lambda checked, r=record: self.view_details(r))
-                self.table.setCellWidget(i, 6, view_btn)
-
-            # Enable word wrapping and resize rows to fit content
-            self.table.setWordWrap(True)
-            self.table.resizeRowsToContents()
-            
+            self.append_rows(self.history_data)
+
             # Set row height policy to ensure all content is visible
             self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
 
             self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-            self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            # Older records are fetched one page at a time as the table is scrolled down
+            self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAsNeeded)
             self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+            bar = self.table.verticalScrollBar()
+            bar.valueChanged.connect(self.maybe_load_more)
+            bar.rangeChanged.connect(lambda _lo, _hi: self.maybe_load_more(bar.value()))
             table_layout.addWidget(self.table)
         
         # Add table widget to stack if not already added
@@ -127,6 +108,66 @@ class GPAHistory(QWidget):
         # When on table view, back button should go to calculator's feature grid
         self.setup_table_view_back_button()
 
+    def append_rows(self, records, at_top=False):
+        """Add one table row per history record, below the existing ones (or above them)"""
+        for n, record in enumerate(records):
+            i = n if at_top else self.table.rowCount()
+            self.table.insertRow(i)
+            date_obj = datetime.fromisoformat(record['timestamp'].replace('Z', '+00:00'))
+            date_str = date_obj.strftime("%Y-%m-%d %H:%M")
+            
+            # Create items with word wrap enabled
+            date_item = QTableWidgetItem(date_str)
+            date_item.setTextAlignment(Qt.AlignLeft)
+            
+            credits_item = QTableWidgetItem(str(record['semester_credits']))
+            credits_item.setTextAlignment(Qt.AlignCenter)
+            
+            gpa_item = QTableWidgetItem(f"{record['gpa']:.2f}")
+            gpa_item.setTextAlignment(Qt.AlignCenter)
+            
+            total_credits_item = QTableWidgetItem(str(record['total_credits']))
+            total_credits_item.setTextAlignment(Qt.AlignCenter)
+            
+            cgpa_item = QTableWidgetItem(f"{record['cgpa']:.2f}")
+            cgpa_item.setTextAlignment(Qt.AlignCenter)
+            
+            prev_cgpa_text = f"{record['current_cgpa']:.2f} ({record['completed_credits']} credits)"
+            prev_cgpa_item = QTableWidgetItem(prev_cgpa_text)
+            prev_cgpa_item.setTextAlignment(Qt.AlignLeft)
+            
+            # Set items to the table
+            self.table.setItem(i, 0, date_item)
+            self.table.setItem(i, 1, credits_item)
+            self.table.setItem(i, 2, gpa_item)
+            self.table.setItem(i, 3, total_credits_item)
+            self.table.setItem(i, 4, cgpa_item)
+            self.table.setItem(i, 5, prev_cgpa_item)
+            
+            view_btn = QPushButton("Details")
+            view_btn.setObjectName("detailsButton")
+            view_btn.setCursor(Qt.PointingHandCursor) 
+            view_btn.clicked.connect(lambda checked, r=record: self.view_details(r))
+            self.table.setCellWidget(i, 6, view_btn)
+
+    @staticmethod
+    def summary_text(summary):
+        """One-line overview of a get_gpa_summary() row"""
+        slope = summary['trend_slope']
+        trend = "steady" if abs(slope) < 0.005 else f"{slope:+.2f} per semester"
+        return (f"Latest CGPA: {summary['latest_cgpa']:.2f}  |  Total Credits: {summary['total_credits']}  |  "
+                f"Best GPA: {summary['best_gpa']:.2f}  |  Lowest GPA: {summary['worst_gpa']:.2f}  |  Trend: {trend}")
+
+    def maybe_load_more(self, value):
+        """Fetch the next (older) page once the table is scrolled near its end"""
+        bar = self.table.verticalScrollBar()
+        if self.model.has_more and self.table.isVisible() and value >= bar.maximum() - bar.pageStep() // 2:
+            self.load_more()
+
+    def load_more(self):
+        """Append the next page of older records"""
+        self.append_rows(self.model.load_more())
+
     def setup_table_view_back_button(self):
         """Setup back button to go to calculator's feature grid when on table view"""
         back_button = self.find_back_button()
@@ -210,8 +251,21 @@ class GPAHistory(QWidget):
                     return child
             return None
 
-    def refresh_data(self, new_history_data, from_calculator=False):
-        """Refresh with new data and update origin flag"""
-        self.history_data = new_history_data
+    def refresh_data(self, from_calculator=False):
+        """Apply the records saved since the last visit and update origin flag"""
         self.from_calculator = from_calculator
-        self.show_table_view() # Rebuild the table view
+        new_records = self.model.refresh()
+        if new_records is None or (new_records and (self.table is None or self.summary_label is None)):
+            self.show_table_view() # First visit (or reload): build the table view
+            return
+        if new_records:
+            self.append_rows(new_records, at_top=True)
+            self.summary_label.setText(self.summary_text(self.summary))
+        # Leave any details page that was still open
+        for i in reversed(range(self.history_stack.count())):
+            page = self.history_stack.widget(i)
+            if page is not self.table_widget:
+                self.history_stack.removeWidget(page)
+                page.deleteLater()
+        self.history_stack.setCurrentWidget(self.table_widget)
+        self.setup_table_view_back_button()
@@ -1,15 +1,14 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QPushButton,
                             QStackedWidget, QLabel)
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
 
 from .gpaCalculator import GPACalculatorPage
 from .goalCalculator import GoalCalculatorPage
 from .gpaHistory import GPAHistory
 from .gradingScheme import GradingSchemePage
 from .feature_button import FeatureButton
-from styles.gpa_styles import gpa_styles
-from database.db_manager import get_gpa_history
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
 
 class GPACalculatorWidget(QWidget):
     def __init__(self, main_window, user_id):
@@ -22,7 +21,7 @@ class GPACalculatorWidget(QWidget):
         self.original_current_widget = None
         
         # Apply styles
-        self.setStyleSheet(gpa_styles())
+        apply_scope(self, "gpa")
 
         # Main layout
         self.main_layout = QVBoxLayout(self)
@@ -44,7 +43,7 @@ class GPACalculatorWidget(QWidget):
     def setup_back_button(self):
         """Back button shown on all pages - add to layout LAST"""
         self.back_btn = QPushButton()
-        self.back_btn.setIcon(QIcon("Photo/back.png"))
+        self.back_btn.setIcon(assets.icon("Photo/back.png"))
         self.back_btn.setText(" Back to Home")
         self.back_btn.setFixedSize(750, 40)
         self.back_btn.setCursor(Qt.PointingHandCursor)
@@ -94,8 +93,8 @@ class GPACalculatorWidget(QWidget):
         self.gpa_calculator_page = GPACalculatorPage(self)
         self.goal_calculator_page = GoalCalculatorPage(self)
 
-        history_data = get_gpa_history(self.current_user_id) # Fetch data from database first
-        self.history_page = GPAHistory(self, history_data, self.gpa_calculator_page)
+        # The one history view; it reads its (cached) records when first shown
+        self.history_page = GPAHistory(self, self.gpa_calculator_page)
         self.grading_scheme_page = GradingSchemePage(self)
         
         self.pages.addWidget(self.gpa_calculator_page)
@@ -147,13 +146,11 @@ class GPACalculatorWidget(QWidget):
 
     def show_history(self):
         """Show history from feature grid - should return to feature grid"""
-        fresh_history_data = get_gpa_history(self.current_user_id)
-        
         # Store the current back button state before navigating
         self.store_back_button_state()
         
         # Update history page with flag indicating we came from feature grid
-        self.history_page.refresh_data(fresh_history_data, from_calculator=False)
+        self.history_page.refresh_data(from_calculator=False)
         self.pages.setCurrentWidget(self.history_page)
         self.back_btn.setText(" Back")
 
@@ -0,0 +1,125 @@
+# gpa_engine.py
+"""
+GPA / CGPA arithmetic without widgets.
+
+Everything works on NumPy arrays, so one call handles a single semester on
+the calculator page or a whole cohort for an adviser. Conventions (same as
+the calculator page always used):
+  - a course counts when its credits are > 0 and its grade is in the scheme
+    (a {grade: points} mapping, see grading.py)
+  - GPA  = sum(credits * grade points) / sum(credits), 0.0 with no credits
+  - CGPA = (prior CGPA * prior credits + GPA * semester credits) / all credits
+"""
+import numpy as np
+
+
+def grade_points(grades, scheme) -> np.ndarray:
+    """Quality points for each grade letter (NaN for grades not in the scheme)."""
+    return np.fromiter((scheme.get(g, np.nan) for g in grades), dtype=float)
+
+
+def _counted(credits, points):
+    """Credits as floats with the courses that do not count zeroed out, and their points."""
+    credits = np.asarray(credits, dtype=float)
+    points = np.asarray(points, dtype=float)
+    ok = (credits > 0) & ~np.isnan(points)
+    return np.where(ok, credits, 0.0), np.where(ok, points, 0.0)
+
+
+def _ratio(num, den):
+    den = np.asarray(den, dtype=float)
+    return np.divide(num, den, out=np.zeros(np.broadcast(num, den).shape), where=den > 0)
+
+
+def semester_totals(credits, points):
+    """(semester credits, GPA) for one semester's courses."""
+    c, p = _counted(credits, points)
+    total = c.sum()
+    return int(total), float(c @ p / total) if total > 0 else 0.0
+
+
+def batch_gpa(credits, points, semester, n_semesters=None):
+    """
+    Per-semester (credits, GPA) for courses of many semesters at once.
+    semester[i] is the 0-based semester index of course i.
+    """
+    c, p = _counted(credits, points)
+    semester = np.asarray(semester, dtype=np.intp)
+    n = n_semesters if n_semesters is not None else (int(semester.max()) + 1 if semester.size else 0)
+    sem_credits = np.bincount(semester, weights=c, minlength=n)
+    sem_points = np.bincount(semester, weights=c * p, minlength=n)
+    return sem_credits.astype(int), _ratio(sem_points, sem_credits)
+
+
+def combine_cgpa(prior_cgpa, prior_credits, sem_credits, sem_gpa):
+    """(total credits, CGPA) after adding a semester to a prior record (broadcasts)."""
+    prior_credits = np.asarray(prior_credits, dtype=float)
+    sem_credits = np.asarray(sem_credits, dtype=float)
+    total = prior_credits + sem_credits
+    points = np.asarray(prior_cgpa, dtype=float) * prior_credits + np.asarray(sem_gpa, dtype=float) * sem_credits
+    return total.astype(int), _ratio(points, total)
+
+
+def running_cgpa(student, sem_credits, sem_gpa, prior_cgpa=0.0, prior_credits=0):
+    """
+    CGPA after each semester for many students at once.
+    student[i] is the 0-based student index of semester row i. Rows of one
+    student are taken in the order given. prior_* are scalars or one value
+    per student. Returns (total credits, CGPA) per row.
+    """
+    student = np.asarray(student, dtype=np.intp)
+    c = np.asarray(sem_credits, dtype=float)
+    qp = c * np.asarray(sem_gpa, dtype=float)
+    if not student.size:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    order = np.argsort(student, kind="stable")
+    s, c_sorted, qp_sorted = student[order], c[order], qp[order]
+    cum_c, cum_qp = np.cumsum(c_sorted), np.cumsum(qp_sorted)
+    # restart the running sums at the first row of every student
+    first = np.r_[True, s[1:] != s[:-1]]
+    start = np.maximum.accumulate(np.where(first, np.arange(s.size), 0))
+    base_c = np.where(start > 0, cum_c[start - 1], 0.0)
+    base_qp = np.where(start > 0, cum_qp[start - 1], 0.0)
+    prior_credits = np.asarray(prior_credits, dtype=float)
+    prior_cgpa = np.asarray(prior_cgpa, dtype=float)
+    if prior_credits.ndim: prior_credits = prior_credits[s]
+    if prior_cgpa.ndim:    prior_cgpa = prior_cgpa[s]
+    total = cum_c - base_c + prior_credits
+    points = cum_qp - base_qp + prior_cgpa * prior_credits
+    out_total, out_cgpa = np.empty(s.size, dtype=int), np.empty(s.size)
+    out_total[order] = total
+    out_cgpa[order] = _ratio(points, total)
+    return out_total, out_cgpa
+
+
+def cohort_results(students, scheme, prior=None):
+    """
+    Batch API for advisers: recompute every semester of every student.
+
+    students: {student_id: [semester, ...]} with each semester a list of
+    (credits, grade) pairs, oldest first. prior: optional {student_id:
+    (cgpa, credits)} completed before the first listed semester.
+    Returns {student_id: [{"semester_credits", "gpa", "total_credits", "cgpa"}, ...]}.
+    """
+    ids = list(students)
+    credits, grades, sem_of, stu_of = [], [], [], []
+    n_sem = 0
+    for k, sid in enumerate(ids):
+        for semester in students[sid]:
+            for cr, gr in semester:
+                credits.append(cr); grades.append(gr); sem_of.append(n_sem)
+            stu_of.append(k)
+            n_sem += 1
+    sem_credits, sem_gpa = batch_gpa(credits, grade_points(grades, scheme), sem_of, n_sem)
+    prior = prior or {}
+    prior_cgpa = np.array([prior.get(sid, (0.0, 0))[0] for sid in ids], dtype=float)
+    prior_credits = np.array([prior.get(sid, (0.0, 0))[1] for sid in ids], dtype=float)
+    total, cgpa = running_cgpa(stu_of, sem_credits, sem_gpa, prior_cgpa, prior_credits)
+
+    out, row = {sid: [] for sid in ids}, 0
+    for k, sid in enumerate(ids):
+        for _ in students[sid]:
+            out[sid].append({"semester_credits": int(sem_credits[row]), "gpa": float(sem_gpa[row]),
+                             "total_credits": int(total[row]), "cgpa": float(cgpa[row])})
+            row += 1
+    return out
@@ -0,0 +1,67 @@
+# grading.py
+"""
+Grading schemes shared by the calculator, goal planner, history and grading table.
+
+The schemes live in the grading_schemes / grading_scheme_grades tables. They
+are read once (one query), frozen into GradingScheme tuples with read-only
+grade -> points mappings, and served from memory afterwards. reload_schemes()
+drops the cache after a scheme was edited.
+"""
+from collections import namedtuple
+from types import MappingProxyType
+
+from database import db_manager as db
+
+GradeBand = namedtuple("GradeBand", "grade points min_mark max_mark")
+# points: read-only {grade: points}; bands: tuple of GradeBand, best grade first
+GradingScheme = namedtuple("GradingScheme", "code name bands points max_points")
+
+_CACHE = None   # (schemes by code, default code, {student_id: code})
+
+
+def _freeze(code, name, grades):
+    bands = tuple(GradeBand(g, float(p), lo, hi) for g, p, lo, hi in grades)
+    points = MappingProxyType({b.grade: b.points for b in bands})
+    return GradingScheme(code, name, bands, points, max((b.points for b in bands), default=0.0))
+
+
+def _load():
+    global _CACHE
+    if _CACHE is None:
+        rows = [r for r in db.get_grading_schemes() if r["grades"]]
+        if not rows:
+            # DB unavailable: fall back to the built-in points so the calculator still works
+            rows = [{"code": db.DEFAULT_GRADING_SCHEME[0], "name": db.DEFAULT_GRADING_SCHEME[1],
+                     "is_default": True, "grades": db.DEFAULT_GRADING_SCHEME[2]}]
+        schemes = {r["code"]: _freeze(r["code"], r["name"], r["grades"]) for r in rows}
+        default = next((r["code"] for r in rows if r["is_default"]), rows[0]["code"])
+        _CACHE = (MappingProxyType(schemes), default, db.get_student_grading_schemes())
+    return _CACHE
+
+
+def schemes():
+    """Every scheme by code (read-only)."""
+    return _load()[0]
+
+
+def default_scheme() -> GradingScheme:
+    all_schemes, default, _students = _load()
+    return all_schemes[default]
+
+
+def get_scheme(code) -> GradingScheme:
+    """The scheme with this code, or the default one (unknown / None code)."""
+    all_schemes, default, _students = _load()
+    return all_schemes.get(code) or all_schemes[default]
+
+
+def scheme_for(student_id) -> GradingScheme:
+    """The scheme assigned to a student (e.g. by faculty or intake), else the default."""
+    _schemes, _default, students = _load()
+    return get_scheme(students.get(student_id))
+
+
+def reload_schemes():
+    """Forget the cached schemes; the next lookup reads the tables again."""
+    global _CACHE
+    _CACHE = None
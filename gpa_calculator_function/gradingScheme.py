@@ -1,13 +1,15 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QTableWidget, 
                              QTableWidgetItem, QHeaderView)
 from PyQt5.QtCore import Qt
-from styles.gpa_styles import gpa_styles
+from styles.style_registry import apply_scope
+from .grading import scheme_for
 
 class GradingSchemePage(QWidget):
     def __init__(self, parent):
         super().__init__()
         self.parent = parent
-        self.setStyleSheet(gpa_styles())
+        self.scheme = scheme_for(getattr(parent, "current_user_id", None))
+        apply_scope(self, "gpa")
         self.init_ui()
 
     def init_ui(self):
@@ -21,14 +23,14 @@ class GradingSchemePage(QWidget):
         layout.addWidget(title)
 
         # Description
-        desc = QLabel("Grade to quality point conversion table for GPA computation")
+        desc = QLabel(f"Grade to quality point conversion table for GPA computation ({self.scheme.name})")
         desc.setObjectName("gpaSubheader")
         layout.addWidget(desc)
 
         # Grading Table - COMPACT VERSION
         self.table = QTableWidget()
         self.table.setColumnCount(3)
-        self.table.setRowCount(9)
+        self.table.setRowCount(len(self.scheme.bands))
         self.table.setHorizontalHeaderLabels(["Marks", "Grade", "Quality Points"])
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
@@ -36,26 +38,15 @@ class GradingSchemePage(QWidget):
         self.table.verticalHeader().setVisible(False)
         
         # Set compact row heights
-        for row in range(9):
+        for row in range(len(self.scheme.bands)):
             self.table.setRowHeight(row, 57)
         
-        # Set table data
-        grading_data = [
-            ("90 - 100", "A+", "4.00"),
-            ("80 - 89", "A", "4.00"),
-            ("75 - 79", "A-", "3.67"),
-            ("70 - 74", "B+", "3.33"),
-            ("65 - 69", "B", "3.00"),
-            ("60 - 64", "B-", "2.67"),
-            ("55 - 59", "C+", "2.33"),
-            ("50 - 54", "C", "2.00"),
-            ("0 - 49", "F", "0.00")
-        ]
-
-        for row, (marks, grade, points) in enumerate(grading_data):
+        # Set table data (from the shared grading scheme)
+        for row, band in enumerate(self.scheme.bands):
+            marks = f"{band.min_mark} - {band.max_mark}" if band.min_mark is not None else "-"
             self.table.setItem(row, 0, QTableWidgetItem(marks))
-            self.table.setItem(row, 1, QTableWidgetItem(grade))
-            self.table.setItem(row, 2, QTableWidgetItem(points))
+            self.table.setItem(row, 1, QTableWidgetItem(band.grade))
+            self.table.setItem(row, 2, QTableWidgetItem(f"{band.points:.2f}"))
             
             for col in range(3):
                 self.table.item(row, col).setTextAlignment(Qt.AlignCenter)
@@ -2,17 +2,20 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QGroupBox, QGridLayout, QPushButton, QSizePolicy, QScrollArea
 )
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
 from datetime import datetime
-from styles.gpa_styles import gpa_styles
+from styles.style_registry import apply_scope
+from .grading import get_scheme
+from .trend_chart import MetricBars, TrendChart
 
 class GPAHistoryDetails(QWidget):
     def __init__(self, parent, record):
         super().__init__()
         self.record = record
         self.parent = parent
+        # the scheme the record was calculated with (older records: the default)
+        self.scheme = get_scheme(record.get('scheme_code'))
 
-        self.setStyleSheet(gpa_styles())
+        apply_scope(self, "gpa")
         self.init_ui()
 
     def init_ui(self):
@@ -85,10 +88,15 @@ class GPAHistoryDetails(QWidget):
         courses_layout.setContentsMargins(15, 15, 15, 15)
 
         if self.record['courses_data']:
+            # one label for all courses, however many there are
+            lines = []
             for course in self.record['courses_data']:
-                course_text = f"{course['name'].upper()} - {course['credits']} credits - Grade: {course['grade']}"
-                course_label = QLabel(course_text)
-                courses_layout.addWidget(course_label)
+                points = self.scheme.points.get(course['grade'])
+                points_text = f" ({points:.2f})" if points is not None else ""
+                lines.append(f"{course['name'].upper()} - {course['credits']} credits - Grade: {course['grade']}{points_text}")
+            courses_label = QLabel("\n".join(lines))
+            courses_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+            courses_layout.addWidget(courses_label)
         else:
             courses_layout.addWidget(QLabel("No course data available"))
 
@@ -108,35 +116,20 @@ class GPAHistoryDetails(QWidget):
         current_cgpa = self.record['current_cgpa']
         new_cgpa = self.record['cgpa']
 
-        # Create grid for aligned content
-        grid_layout = QGridLayout()
-        grid_layout.setSpacing(10)
-
-        def create_bar(value, max_value=4.0):
-            bar_length = 20
-            filled = int((value / max_value) * bar_length)
-            return "█" * filled + "░" * (bar_length - filled)
-
         # Add rows
         metrics = [
             ("Semester GPA", semester_gpa),
             ("Previous CGPA", current_cgpa),
             ("New CGPA", new_cgpa)
         ]
-
-        for row, (name, value) in enumerate(metrics, 1):
-            grid_layout.addWidget(QLabel(name), row, 0)
-            
-            # Create bar label with monospace font for proper alignment
-            bar_label = QLabel(create_bar(value))
-            bar_label.setFont(QFont("Monospace", 9))  # Monospace for consistent width
-            grid_layout.addWidget(bar_label, row, 1)
-            
-            value_label = QLabel(f"{value:.2f}")
-            value_label.setAlignment(Qt.AlignCenter)
-            grid_layout.addWidget(value_label, row, 2)
-
-        chart_layout.addLayout(grid_layout)
+        # the student's best / lowest semesters, from the summary row the history page read
+        summary = getattr(self.parent, 'summary', None)
+        if summary and summary['records'] > 1:
+            metrics += [("Best Semester GPA", summary['best_gpa']),
+                        ("Lowest Semester GPA", summary['worst_gpa'])]
+
+        # One painted widget for all bars
+        chart_layout.addWidget(MetricBars(metrics, self.scheme.max_points))
         chart_layout.addSpacing(10)
 
         # Add performance text
@@ -154,6 +147,23 @@ class GPAHistoryDetails(QWidget):
 
         container_layout.addWidget(chart_group)
 
+        # GPA / CGPA over every saved calculation (cached by the history model)
+        model = getattr(self.parent, 'model', None)
+        trend = model.trend() if model is not None else []
+        if len(trend) > 1:
+            container_layout.addSpacing(15)
+            trend_group = QGroupBox("GPA Trend")
+            trend_group.setObjectName("chartGroup")
+            trend_group.setContentsMargins(10, 20, 10, 10)
+            trend_layout = QVBoxLayout(trend_group)
+            trend_layout.setContentsMargins(15, 15, 15, 15)
+            ids = [row[0] for row in trend]
+            chart = TrendChart()
+            chart.set_data([row[2] for row in trend], [row[3] for row in trend], self.scheme.max_points,
+                           highlight=ids.index(self.record['id']) if self.record['id'] in ids else None)
+            trend_layout.addWidget(chart)
+            container_layout.addWidget(trend_group)
+
         # Add stretch at the end
         container_layout.addStretch()
 
@@ -0,0 +1,105 @@
+# history_model.py
+"""
+Cached GPA history of one student, shared by every view of it.
+
+The first page is read when a view first needs it, older pages as the table
+is scrolled. After that nothing is read again until db_manager reports a
+committed save for this student (mark_gpa_changed). refresh() then fetches
+only the records newer than the newest one held, keyed on (timestamp, id).
+Records that land behind it (an import with older dates) make it start over
+from the first page. MainWindow.logout drops every model (drop_history_models).
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from database.db_manager import (add_gpa_listener, remove_gpa_listener, get_gpa_history,
+                                 get_gpa_summary, get_gpa_trend)
+
+PAGE_SIZE = 10  # records fetched per page (the default limit of get_gpa_history)
+
+
+class GPAHistoryModel(QObject):
+    # event dict from db_manager.mark_gpa_changed, re-emitted so slots run on the GUI thread
+    _db_changed = pyqtSignal(object)
+
+    def __init__(self, student_id):
+        super().__init__()
+        self.student_id = student_id
+        self.records = []       # newest first
+        self.summary = None     # get_gpa_summary row
+        self._trend = None      # get_gpa_trend rows, read on first use
+        self.has_more = False
+        self.loaded = False
+        self._new_ids = set()   # history ids saved since the last refresh
+        self._db_changed.connect(self._on_db_changed)
+        self._listener = self._db_changed.emit   # kept: each attribute access is a new bound signal
+        add_gpa_listener(self._listener)
+
+    def close(self):
+        """Stop listening to GPA writes (the model is dropped at logout)."""
+        remove_gpa_listener(self._listener)
+
+    def _on_db_changed(self, event):
+        self._new_ids.update(event["ids"].get(self.student_id, ()))
+
+    def _reload(self):
+        self.records = get_gpa_history(self.student_id, PAGE_SIZE)
+        self.has_more = len(self.records) >= PAGE_SIZE
+        self.summary = get_gpa_summary(self.student_id)
+        self._trend = None
+        self.loaded = True
+        self._new_ids.clear()
+
+    def refresh(self):
+        """
+        Bring the cache up to date. Returns the records added at the top
+        (newest first), [] when nothing changed, or None when everything was
+        (re)loaded and a view should be rebuilt from self.records.
+        """
+        if not self.loaded or (self._new_ids and not self.records):
+            self._reload()
+            return None
+        if not self._new_ids:
+            return []
+        newest = self.records[0]
+        new = get_gpa_history(self.student_id, None, after=(newest['timestamp'], newest['id']))
+        if not self._new_ids <= {r['id'] for r in new}:
+            self._reload()
+            return None
+        self.records[:0] = new
+        if self._trend is not None:
+            self._trend.extend((r['id'], r['timestamp'], r['gpa'], r['cgpa']) for r in reversed(new))
+        self.summary = get_gpa_summary(self.student_id)
+        self._new_ids.clear()
+        return new
+
+    def trend(self):
+        """(id, timestamp, gpa, cgpa) of every record, oldest first, for the trend chart"""
+        if self._trend is None:
+            self._trend = get_gpa_trend(self.student_id)
+        return self._trend
+
+    def load_more(self):
+        """Append and return the next page of older records"""
+        if not self.has_more or not self.records:
+            return []
+        last = self.records[-1]
+        older = get_gpa_history(self.student_id, PAGE_SIZE, before=(last['timestamp'], last['id']))
+        self.has_more = len(older) >= PAGE_SIZE
+        self.records.extend(older)
+        return older
+
+
+_models = {}
+
+def history_model(student_id) -> GPAHistoryModel:
+    """The shared model of this student (created on first use, which must be on the GUI thread)."""
+    if student_id not in _models:
+        _models[student_id] = GPAHistoryModel(student_id)
+    return _models[student_id]
+
+def drop_history_models():
+    """Forget every cached model and its listener (logout)."""
+    for model in _models.values():
+        model.close()
+        model.deleteLater()
+    _models.clear()
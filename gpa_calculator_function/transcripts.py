@@ -0,0 +1,277 @@
+# transcripts.py
+"""
+Bulk import / export of GPA transcripts (many semesters for many students).
+
+A transcript file has one line per course:
+
+    CSV    student_id, semester, course, credits, grade [, timestamp]
+    JSON   [{"student_id", "semesters": [{"semester", "timestamp"?,
+             "courses": [{"name", "credits", "grade"}]}]}]   (.jsonl: one student per line)
+
+Each student's semesters are ordered by timestamp (file order for equal
+ones; no timestamp means the time of the import) and appended after the
+student's saved history, the order the history shows them in. Every row is
+checked first: a registered student, credits > 0, a grade of the student's
+grading scheme, and every timestamp after the student's latest saved record
+(so importing a file twice, or re-importing an export, is refused instead of
+duplicating the history). Nothing is written if any row fails. GPA / CGPA
+are computed for the whole batch with gpa_engine and saved with executemany
+in one transaction (db.save_gpa_calculations). CSV and .jsonl are read and written as streams.
+No Qt is used, so it also works from the command line:
+
+    python -m gpa_calculator_function.transcripts import <file> [--dry-run] [--db path]
+    python -m gpa_calculator_function.transcripts export <file> [--user <student_id> ...] [--db path]
+"""
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from database import db_manager as db
+from gpa_calculator_function import gpa_engine as engine
+from gpa_calculator_function.grading import scheme_for
+
+CSV_COLUMNS  = ("student_id", "semester", "course", "credits", "grade", "timestamp")
+EXPORT_EXTRA = ("gpa", "cgpa")   # written for readers; recomputed on import
+TIME_FORMAT  = "%Y-%m-%d %H:%M"  # as save_gpa_calculation stores it
+
+
+class TranscriptError(Exception):
+    pass
+
+
+def _student_courses(student, where):
+    """Course rows of one JSON student object."""
+    sid = str(student.get("student_id") or "").strip()
+    for k, sem in enumerate(student.get("semesters") or (), 1):
+        label = str(sem.get("semester") or k)
+        for course in sem.get("courses") or ():
+            yield (f"{where}, semester {label}", sid, label, sem.get("timestamp"),
+                   course.get("name"), course.get("credits"), course.get("grade"))
+
+
+def read_transcript(path):
+    """
+    Stream (where, student_id, semester, timestamp, course, credits, grade)
+    rows from a CSV / JSON / JSON-lines transcript. Raises TranscriptError
+    for a file that cannot be read at all.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if ext == ".jsonl":
+            for n, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        student = json.loads(line)
+                    except ValueError as e:
+                        raise TranscriptError(f"line {n}: {e}")
+                    yield from _student_courses(student, f"line {n}")
+        elif ext == ".json":
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise TranscriptError(str(e))
+            for n, student in enumerate(data.get("students", []) if isinstance(data, dict) else data, 1):
+                yield from _student_courses(student, f"student {n}")
+        else:
+            reader = csv.DictReader(f)
+            missing = [c for c in CSV_COLUMNS[:5] if c not in (reader.fieldnames or ())]
+            if missing:
+                raise TranscriptError(f"missing column(s): {', '.join(missing)}")
+            for row in reader:
+                yield (f"line {reader.line_num}", (row["student_id"] or "").strip(), (row["semester"] or "").strip(),
+                       row.get("timestamp"), row["course"], row["credits"], row["grade"])
+
+
+def _timestamp(value):
+    """Normalized timestamp text, '' when not given; ValueError when malformed."""
+    value = (value or "").strip()
+    return datetime.fromisoformat(value).strftime(TIME_FORMAT) if value else ""
+
+
+def import_transcripts(path, dry_run=False, progress=None):
+    """
+    Validate and import a transcript file. progress(rows read) is called every
+    1000 rows. With dry_run nothing is saved. Returns a summary dict
+    {"students", "semesters", "courses", "saved", "errors"}.
+    """
+    stats = {"students": 0, "semesters": 0, "courses": 0, "saved": 0, "errors": []}
+    semesters = {}   # (student_id, semester) -> {"timestamp", "courses"}, file order
+    try:
+        for where, sid, label, stamp, name, credits, grade in read_transcript(path):
+            stats["courses"] += 1
+            if progress and stats["courses"] % 1000 == 0:
+                progress(stats["courses"])
+            name, grade = str(name or "").strip(), str(grade or "").strip().upper()
+            problems = []
+            if not sid:
+                problems.append("no student_id")
+            if not name:
+                problems.append("no course name")
+            try:
+                credits = int(str(credits).strip())
+                if credits <= 0:
+                    raise ValueError
+            except ValueError:
+                problems.append(f"credits {credits!r} is not a positive whole number")
+            if sid and grade not in scheme_for(sid).points:
+                problems.append(f"grade {grade!r} is not in the {scheme_for(sid).name} scheme")
+            try:
+                stamp = _timestamp(stamp)
+            except ValueError:
+                problems.append(f"timestamp {stamp!r} is not a date/time")
+            if problems:
+                stats["errors"].append(f"{where}: {'; '.join(problems)}")
+                continue
+            sem = semesters.setdefault((sid, label), {"timestamp": stamp, "courses": []})
+            sem["courses"].append({"name": name, "credits": credits, "grade": grade})
+    except (OSError, TranscriptError) as e:
+        stats["errors"].append(f"{path}: {e}")
+        return stats
+
+    students = list(dict.fromkeys(sid for sid, _label in semesters))
+    known = db.existing_student_ids(students)
+    stats["errors"] += [f"student {sid}: not a registered student" for sid in students if sid not in known]
+    summaries = db.get_gpa_summaries([sid for sid in students if sid in known])
+    for (sid, label), sem in semesters.items():
+        last = (summaries.get(sid) or {}).get("last_timestamp")
+        if sem["timestamp"] and last and sem["timestamp"] <= str(last):
+            stats["errors"].append(f"student {sid}, semester {label}: timestamp {sem['timestamp']} "
+                                   f"is not after the latest saved record ({last})")
+    stats["students"], stats["semesters"] = len(students), len(semesters)
+    if stats["errors"] or dry_run or not semesters:
+        return stats
+
+    records = _build_records(semesters, students, summaries)
+    saved = db.save_gpa_calculations(records)
+    if saved is None:
+        stats["errors"].append("Database error while saving; nothing was imported")
+    else:
+        stats["saved"] = saved
+    return stats
+
+
+def _build_records(semesters, students, summaries):
+    """
+    gpa_history records for the grouped semesters, GPA / CGPA computed in one
+    batch. summaries: the students' gpa_summary rows (get_gpa_summaries).
+    """
+    now = datetime.now().strftime(TIME_FORMAT)
+    order = {sid: k for k, sid in enumerate(students)}
+    # by student, then by timestamp as the history lists them; stable: file order on ties
+    keys = sorted(semesters, key=lambda key: (order[key[0]], semesters[key]["timestamp"] or now))
+    credits, points, sem_of = [], [], []
+    for s, key in enumerate(keys):
+        scheme = scheme_for(key[0]).points
+        for course in semesters[key]["courses"]:
+            credits.append(course["credits"]); points.append(scheme[course["grade"]]); sem_of.append(s)
+    sem_credits, sem_gpa = engine.batch_gpa(credits, points, sem_of, len(keys))
+
+    # continue from each student's saved history
+    prior_cgpa, prior_credits = np.zeros(len(students)), np.zeros(len(students))
+    for sid, summary in summaries.items():
+        prior_cgpa[order[sid]] = summary["latest_cgpa"] or 0.0
+        prior_credits[order[sid]] = summary["total_credits"] or 0
+    stu_of = [order[sid] for sid, _label in keys]
+    total, cgpa = engine.running_cgpa(stu_of, sem_credits, sem_gpa, prior_cgpa, prior_credits)
+
+    records, before = [], {}
+    for s, key in enumerate(keys):
+        sid = key[0]
+        prev_cgpa, prev_credits = before.get(sid, (prior_cgpa[order[sid]], prior_credits[order[sid]]))
+        records.append({
+            "student_id": sid,
+            "timestamp": semesters[key]["timestamp"] or now,
+            "semester_credits": int(sem_credits[s]),
+            "gpa": round(float(sem_gpa[s]), 2),
+            "total_credits": int(total[s]),
+            "cgpa": round(float(cgpa[s]), 2),
+            "current_cgpa": round(float(prev_cgpa), 2),
+            "completed_credits": int(prev_credits),
+            "scheme_code": scheme_for(sid).code,
+            "courses_data": semesters[key]["courses"],
+        })
+        before[sid] = (cgpa[s], total[s])
+    return records
+
+
+def _by_student(records):
+    """Group a student-ordered record stream into (student_id, [records])."""
+    sid, group = None, []
+    for record in records:
+        if record["student_id"] != sid and group:
+            yield sid, group
+            group = []
+        sid = record["student_id"]
+        group.append(record)
+    if group:
+        yield sid, group
+
+
+def export_transcripts(path, student_ids=None):
+    """
+    Write the saved history of all (or the given) students to a CSV / JSON /
+    JSON-lines transcript that import_transcripts reads back. Semesters are
+    labelled S1, S2, ... per student. Returns the number of records written.
+    """
+    written = 0
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        if ext in (".json", ".jsonl"):
+            if ext == ".json":
+                f.write("[\n")
+            for n, (sid, records) in enumerate(_by_student(db.iter_gpa_transcripts(student_ids))):
+                student = {"student_id": sid, "semesters": [
+                    {"semester": f"S{k}", "timestamp": r["timestamp"], "gpa": r["gpa"], "cgpa": r["cgpa"],
+                     "courses": r["courses_data"]} for k, r in enumerate(records, 1)]}
+                if ext == ".json":
+                    f.write((",\n" if n else "") + json.dumps(student))
+                else:
+                    f.write(json.dumps(student) + "\n")
+                written += len(records)
+            if ext == ".json":
+                f.write("\n]\n")
+        else:
+            writer = csv.writer(f)
+            writer.writerow(CSV_COLUMNS + EXPORT_EXTRA)
+            for sid, records in _by_student(db.iter_gpa_transcripts(student_ids)):
+                for k, r in enumerate(records, 1):
+                    writer.writerows((sid, f"S{k}", c["name"], c["credits"], c["grade"], r["timestamp"],
+                                      r["gpa"], r["cgpa"]) for c in r["courses_data"])
+                written += len(records)
+    return written
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import or export GPA transcripts (CSV, JSON or JSON lines).")
+    ap.add_argument("action", choices=("import", "export"))
+    ap.add_argument("path")
+    ap.add_argument("--user", action="append", default=None, help="export only this student_id (repeatable)")
+    ap.add_argument("--dry-run", action="store_true", help="validate an import without saving it")
+    ap.add_argument("--db", default=None, help="SQLite file (default: %s)" % db.DB_PATH)
+    args = ap.parse_args(argv)
+    if args.db:
+        db.DB_PATH = args.db
+
+    if args.action == "export":
+        written = export_transcripts(args.path, args.user)
+        print(f"Exported {written} semester record(s) to {args.path}.")
+        return 0
+
+    stats = import_transcripts(args.path, args.dry_run, progress=lambda n: print(f"{n} course rows read"))
+    for err in stats["errors"]:
+        print(err)
+    if stats["errors"]:
+        print(f"{len(stats['errors'])} problem(s); nothing was imported.")
+        return 1
+    verb = "Checked" if args.dry_run else "Imported"
+    print(f"{verb} {stats['semesters']} semester(s) of {stats['students']} student(s), "
+          f"{stats['courses']} course(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
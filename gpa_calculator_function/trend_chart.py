@@ -0,0 +1,168 @@
+# trend_chart.py
+"""
+Custom-painted charts for the GPA history details page.
+
+TrendChart draws semester GPA and CGPA over every saved calculation as two
+lines, and MetricBars draws labelled horizontal bars (these replace the old
+monospace text bars). Each chart is one widget however many records there
+are. The data is kept as plain float lists, the geometry is worked out once
+per data change or resize, and paintEvent only draws it.
+"""
+from PyQt5.QtCore import Qt, QPointF, QRectF
+from PyQt5.QtGui import QColor, QFont, QPainter, QPainterPath, QPen
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+GPA_COLOR   = QColor("#673AB7")
+CGPA_COLOR  = QColor("#3949AB")
+GRID_COLOR  = QColor("#E1D7F6")
+TRACK_COLOR = QColor("#f3e9fd")
+TEXT_COLOR  = QColor("#4B4B4C")
+MAX_MARKERS = 60   # beyond this many records the points are not marked individually
+
+
+def _font(widget, px=12, bold=False):
+    f = QFont(widget.font())
+    f.setPixelSize(px)
+    f.setBold(bold)
+    return f
+
+
+class TrendChart(QWidget):
+    """GPA and CGPA of every record (oldest first), with one record highlighted."""
+    MARGINS = (40, 26, 14, 26)   # left, top, right, bottom (axis labels, legend)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._gpa, self._cgpa = [], []
+        self._max = 4.0
+        self._highlight = None
+        self._geometry = None   # _build() result for the current size and data
+        self.setMinimumHeight(220)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def set_data(self, gpa, cgpa, max_value=4.0, highlight=None):
+        """gpa / cgpa: one value per record, oldest first; highlight: index of the record shown"""
+        self._gpa, self._cgpa = [float(v or 0.0) for v in gpa], [float(v or 0.0) for v in cgpa]
+        self._max = max_value or 4.0
+        self._highlight = highlight
+        self._geometry = None
+        self.update()
+
+    def resizeEvent(self, e):
+        self._geometry = None
+        super().resizeEvent(e)
+
+    def _x(self, plot, i):
+        n = len(self._gpa)
+        return plot.center().x() if n == 1 else plot.left() + plot.width() * i / (n - 1)
+
+    def _y(self, plot, v):
+        return plot.bottom() - plot.height() * min(max(v, 0.0), self._max) / self._max
+
+    def _build(self):
+        left, top, right, bottom = self.MARGINS
+        plot = QRectF(self.rect()).adjusted(left, top, -right, -bottom)
+
+        def line(values):
+            points = [QPointF(self._x(plot, i), self._y(plot, v)) for i, v in enumerate(values)]
+            path = QPainterPath(points[0])
+            for pt in points[1:]:
+                path.lineTo(pt)
+            return path, points
+
+        gpa_path, gpa_pts = line(self._gpa)
+        cgpa_path, cgpa_pts = line(self._cgpa)
+        return plot, gpa_path, cgpa_path, gpa_pts, cgpa_pts
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setFont(_font(self))
+        if not self._gpa:
+            p.setPen(TEXT_COLOR)
+            p.drawText(self.rect(), Qt.AlignCenter, "No history yet")
+            return
+        if self._geometry is None:
+            self._geometry = self._build()
+        plot, gpa_path, cgpa_path, gpa_pts, cgpa_pts = self._geometry
+
+        # grid: one line per grade point, labelled on the left
+        step = 1.0 if self._max >= 2 else 0.5
+        v = 0.0
+        while v <= self._max + 1e-9:
+            y = self._y(plot, v)
+            p.setPen(QPen(GRID_COLOR, 1))
+            p.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+            p.setPen(TEXT_COLOR)
+            p.drawText(QRectF(0, y - 8, plot.left() - 6, 16), Qt.AlignRight | Qt.AlignVCenter, f"{v:.1f}")
+            v += step
+
+        # record numbers under the axis, at most one per 40 px
+        n = len(self._gpa)
+        every = max(1, int(40 * n / max(plot.width(), 1)) + 1) if n > 1 else 1
+        for i in range(0, n, every):
+            x = self._x(plot, i)
+            p.drawText(QRectF(x - 20, plot.bottom() + 4, 40, 18), Qt.AlignHCenter | Qt.AlignTop, str(i + 1))
+
+        if self._highlight is not None and 0 <= self._highlight < n:
+            x = self._x(plot, self._highlight)
+            p.setPen(QPen(GRID_COLOR.darker(120), 1, Qt.DashLine))
+            p.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+
+        p.setBrush(Qt.NoBrush)
+        for path, pts, color in ((cgpa_path, cgpa_pts, CGPA_COLOR), (gpa_path, gpa_pts, GPA_COLOR)):
+            p.setPen(QPen(color, 2))
+            p.drawPath(path)
+            if n <= MAX_MARKERS or self._highlight is not None:
+                p.setBrush(color)
+                marked = pts if n <= MAX_MARKERS else [pts[self._highlight]]
+                for pt in marked:
+                    p.drawEllipse(pt, 3, 3)
+                p.setBrush(Qt.NoBrush)
+
+        # legend (top right)
+        x = plot.right()
+        for label, color in (("CGPA", CGPA_COLOR), ("Semester GPA", GPA_COLOR)):
+            w = p.fontMetrics().horizontalAdvance(label)
+            x -= w
+            p.setPen(TEXT_COLOR)
+            p.drawText(QRectF(x, 2, w, 18), Qt.AlignVCenter, label)
+            x -= 16
+            p.fillRect(QRectF(x, 7, 10, 10), color)
+            x -= 14
+
+
+class MetricBars(QWidget):
+    """Labelled horizontal bars, one row per (label, value)."""
+    ROW_H, LABEL_W, VALUE_W = 30, 170, 50
+
+    def __init__(self, rows=(), max_value=4.0, parent=None):
+        super().__init__(parent)
+        self.set_rows(rows, max_value)
+
+    def set_rows(self, rows, max_value=4.0):
+        self._rows = [(label, float(value or 0.0)) for label, value in rows]
+        self._max = max_value or 4.0
+        self.setMinimumHeight(self.ROW_H * max(1, len(self._rows)))
+        self.update()
+
+    def paintEvent(self, e):
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing)
+        p.setFont(_font(self, 13))
+        bar_w = max(10, self.width() - self.LABEL_W - self.VALUE_W - 20)
+        for i, (label, value) in enumerate(self._rows):
+            top = i * self.ROW_H
+            p.setPen(TEXT_COLOR)
+            p.drawText(QRectF(0, top, self.LABEL_W, self.ROW_H), Qt.AlignVCenter, label)
+            track = QRectF(self.LABEL_W + 10, top + 8, bar_w, self.ROW_H - 16)
+            p.setPen(Qt.NoPen)
+            p.setBrush(TRACK_COLOR)
+            p.drawRoundedRect(track, 4, 4)
+            fill = QRectF(track)
+            fill.setWidth(track.width() * min(max(value, 0.0), self._max) / self._max)
+            p.setBrush(GPA_COLOR)
+            p.drawRoundedRect(fill, 4, 4)
+            p.setPen(TEXT_COLOR)
+            p.drawText(QRectF(track.right() + 10, top, self.VALUE_W, self.ROW_H),
+                       Qt.AlignVCenter | Qt.AlignRight, f"{value:.2f}")
@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel,
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QCursor
 from database.db_manager import get_user
-from styles.login_styles import get_login_styles
+from styles.style_registry import apply_scope
 
 class LoginWidget(QWidget):
     login_successful = pyqtSignal(str, str)  # student_id, name
@@ -12,7 +12,7 @@ class LoginWidget(QWidget):
         super().__init__()
         self.main_window = main_window
         self.setObjectName("loginWidget")
-        self.setStyleSheet(get_login_styles())
+        apply_scope(self, "login")
         self.setup_ui()
 
     def setup_ui(self):
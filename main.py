@@ -1,29 +1,26 @@
 import sys
 import os
+import time
+_START = time.perf_counter()
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QLabel, QPushButton,
     QHBoxLayout, QMessageBox, QGridLayout, QStackedWidget
 )
 from PyQt5.QtGui import QPixmap, QFont, QPainter, QBrush
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QPoint, QEvent
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QPoint, QEvent, QTimer
 
-from styles.styles import load_stylesheet, get_menu_button_style
+from styles.styles import get_menu_button_style
+from styles.style_registry import app_stylesheet
+from styles import asset_cache as assets
 from login import LoginWidget
 from database.db_manager import get_connection
+# Feature pages (room booking, academic tools, notes) are imported on first use
+from page_registry import PageRegistry, record_timing, startup_report
 
-# Room booking features
-from room_booking_function.location_selection import LocationSelectionWidget
-from room_booking_function.room_booking_widget import RoomBookingWidget
-from room_booking_function.feature_button import FeatureButton
-from room_booking_function.guidelines import GuidelinesPage
-from room_booking_function.all_booking import AllBookingsPage
+record_timing("main imports", (time.perf_counter() - _START) * 1000)
 
-# Academic feature
-from gpa_calculator_function.gpa_calculator_widget import GPACalculatorWidget
-
-# Notes features
-from notes_organizer_function.dashboard import DashboardWidget
-from notes_organizer_function.notes_organizer import NoteOrganizerWidget
+# Pages built ahead of the first click after login (the others only import ahead)
+WARM_PAGES = ("location_selection", "gpa", "dashboard")
 
 
 class SlidingMenu(QWidget):
@@ -155,17 +152,19 @@ class SlidingMenu(QWidget):
         if filename:
             path = f"Photo/{filename}"
             if os.path.exists(path):
-                pix = QPixmap(path)
+                pix = assets.pixmap(path, 150, mode=Qt.KeepAspectRatioByExpanding)
                 if not pix.isNull():
-                    circular = QPixmap(150, 150)
-                    circular.fill(Qt.transparent)
-                    p = QPainter(circular)
-                    p.setRenderHint(QPainter.Antialiasing)
-                    p.setBrush(QBrush(pix.scaled(150, 150, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)))
-                    p.setPen(Qt.NoPen)
-                    p.drawEllipse(0, 0, 150, 150)
-                    p.end()
-                    self.avatar.setPixmap(circular)
+                    def paint():
+                        circular = QPixmap(150, 150)
+                        circular.fill(Qt.transparent)
+                        p = QPainter(circular)
+                        p.setRenderHint(QPainter.Antialiasing)
+                        p.setBrush(QBrush(pix))
+                        p.setPen(Qt.NoPen)
+                        p.drawEllipse(0, 0, 150, 150)
+                        p.end()
+                        return circular
+                    self.avatar.setPixmap(assets.rendered_pixmap(("avatar", os.path.abspath(path), 150), paint))
                     return
         self.avatar.setPixmap(self.default_avatar)
 
@@ -226,17 +225,25 @@ class MainWindow(QMainWindow):
         self.login_page.login_successful.connect(self.handle_login_success)
         self.pages.addWidget(self.login_page)
 
-        # Pre-create static pages
-        self.guidelines_page = GuidelinesPage(self)
-        self.pages.addWidget(self.guidelines_page)
-
-        self.all_bookings_page = AllBookingsPage(self)
-        self.pages.addWidget(self.all_bookings_page)
-
-        # Lazy pages
+        # Feature pages: imported and built on first navigation (see page_registry)
+        self.registry = PageRegistry(self.pages, self)
+        self.registry.register("guidelines", "room_booking_function.guidelines", "GuidelinesPage",
+                               lambda cls: cls(self), per_user=False)
+        self.registry.register("all_bookings", "room_booking_function.all_booking", "AllBookingsPage",
+                               lambda cls: cls(self), per_user=False)
+        self.registry.register("location_selection", "room_booking_function.location_selection",
+                               "LocationSelectionWidget", lambda cls: cls(self))
+        self.registry.register("gpa", "gpa_calculator_function.gpa_calculator_widget", "GPACalculatorWidget",
+                               lambda cls: cls(self, self.user_id))
+        # Notes: one dashboard per login; it keeps itself current through the notes bus
+        self.registry.register("dashboard", "notes_organizer_function.dashboard", "DashboardWidget",
+                               lambda cls: cls(user_id=self.user_id,
+                                               on_add_note_clicked=self.open_notes_page,
+                                               on_back_home=self.back_to_main_from_dashboard))
+        self.registry.register("notes", "notes_organizer_function.notes_organizer", "NoteOrganizerWidget",
+                               lambda cls: cls(on_return_callback=self.back_to_dashboard,
+                                               user_id=self.user_id))
         self.feature_grid_page = None
-        self.location_selection_page = None
-        self.gpa_calculator_widget = None
 
         # Sliding menu + overlay
         self.sliding_menu = SlidingMenu(self)
@@ -256,6 +263,22 @@ class MainWindow(QMainWindow):
         # Start on login page
         self.pages.setCurrentWidget(self.login_page)
 
+    @property
+    def guidelines_page(self):
+        return self.registry.get("guidelines")
+
+    @property
+    def all_bookings_page(self):
+        return self.registry.get("all_bookings")
+
+    @property
+    def location_selection_page(self):
+        return self.registry.get("location_selection")
+
+    @property
+    def gpa_calculator_widget(self):
+        return self.registry.get("gpa")
+
     def initialize_database(self):
         try:
             conn = get_connection()
@@ -268,8 +291,11 @@ class MainWindow(QMainWindow):
             QMessageBox.critical(self, "Database Error", str(e))
 
     def handle_login_success(self, student_id, name):
+        from notes_organizer_function.autosave import recover_drafts
         self.user_id = student_id
         self.user_name = name
+        # note drafts of a session that crashed go back into the notes first
+        recover_drafts(student_id)
         self.initialize_main_app()
         self.sliding_menu.update_profile_info(name, student_id)
         self.menu_btn.setVisible(True)
@@ -279,14 +305,11 @@ class MainWindow(QMainWindow):
         if self.feature_grid_page is None:
             self.feature_grid_page = self.create_feature_grid()
             self.pages.addWidget(self.feature_grid_page)
-        if self.location_selection_page is None:
-            self.location_selection_page = LocationSelectionWidget(self)
-            self.pages.addWidget(self.location_selection_page)
-        if self.gpa_calculator_widget is None:
-            self.gpa_calculator_widget = GPACalculatorWidget(self, self.user_id)
-            self.pages.addWidget(self.gpa_calculator_widget)
+        # once the grid is on screen: import all features, build the common pages
+        QTimer.singleShot(0, lambda: self.registry.warm_up(WARM_PAGES))
 
     def create_feature_grid(self):
+        from room_booking_function.feature_button import FeatureButton
         page = QWidget()
         layout = QVBoxLayout(page)
         layout.setContentsMargins(30, 30, 30, 30)
@@ -317,40 +340,22 @@ class MainWindow(QMainWindow):
         elif feature_name == "Academic Tools":
             self.pages.setCurrentWidget(self.gpa_calculator_widget)
         elif feature_name == "Note Organizer":
-            # Recreate dashboard each time to reflect current user
-            if hasattr(self, 'dashboard'):
-                try:
-                    if self.pages.indexOf(self.dashboard) != -1:
-                        self.pages.removeWidget(self.dashboard)
-                    self.dashboard.deleteLater()
-                except Exception as e:
-                    print(f"Error removing old dashboard: {e}")
-                delattr(self, 'dashboard')
-
-            self.dashboard = DashboardWidget(
-                user_id=self.user_id,
-                on_add_note_clicked=self.open_notes_page,
-                on_back_home=self.back_to_main_from_dashboard            
-            )
-            self.pages.addWidget(self.dashboard)
-            self.pages.setCurrentWidget(self.dashboard)
+            self.pages.setCurrentWidget(self.ensure_dashboard())
         else:
             self.show_qna()
 
+    # Notes: the dashboard of the logged-in user (dropped by the registry at logout)
+    def ensure_dashboard(self):
+        return self.registry.get("dashboard")
+
     # Notes: open editor (optionally a specific note) — user_id is passed through
     def open_notes_page(self, note_id=None):
-        if not hasattr(self, 'notes_page'):
-            self.notes_page = NoteOrganizerWidget(
-                on_return_callback=self.back_to_dashboard,
-                user_id=self.user_id
-            )
-            self.pages.addWidget(self.notes_page)
+        notes_page = self.registry.get("notes")
+        self.pages.setCurrentWidget(notes_page)
 
-        self.pages.setCurrentWidget(self.notes_page)
-
-        if note_id is not None and hasattr(self.notes_page, "_open_by_id"):
+        if note_id is not None and hasattr(notes_page, "_open_by_id"):
             try:
-                self.notes_page._open_by_id(note_id)
+                notes_page._open_by_id(note_id)
             except Exception as e:
                 QMessageBox.warning(self, "Open Note", f"Could not open the selected note.\n{str(e)}")
 
@@ -358,19 +363,8 @@ class MainWindow(QMainWindow):
         self.pages.setCurrentWidget(self.feature_grid_page)
 
     def back_to_dashboard(self):
-        if not hasattr(self, 'dashboard'):
-            self.dashboard = DashboardWidget(
-                user_id=self.user_id,
-                on_add_note_clicked=self.open_notes_page,
-                on_back_home=self.back_to_main_from_dashboard
-            )
-            self.pages.addWidget(self.dashboard)
-        self.pages.setCurrentWidget(self.dashboard)
-        try:
-            self.dashboard._refresh_folders()
-            self.dashboard._refilter_notes()
-        except Exception as e:
-            print(f"Error refreshing dashboard: {e}")
+        # pending note changes are applied by the dashboard's showEvent
+        self.pages.setCurrentWidget(self.ensure_dashboard())
 
     def show_qna(self):
         QMessageBox.information(
@@ -427,6 +421,7 @@ class MainWindow(QMainWindow):
         self.hide_menu()
 
     def open_room_booking_page(self, location_id):
+        from room_booking_function.room_booking_widget import RoomBookingWidget
         if hasattr(self, 'room_booking_widget_by_location'):
             self.pages.removeWidget(self.room_booking_widget_by_location)
             self.room_booking_widget_by_location.deleteLater()
@@ -435,6 +430,7 @@ class MainWindow(QMainWindow):
         self.pages.setCurrentWidget(self.room_booking_widget_by_location)
 
     def logout(self):
+        from gpa_calculator_function.history_model import drop_history_models
         self.user_id = None
         self.user_name = None
         self.sliding_menu.name_label.setText("Please Login")
@@ -444,31 +440,20 @@ class MainWindow(QMainWindow):
         self.sliding_menu.avatar.setPixmap(self.sliding_menu.default_avatar)
         self.menu_btn.setVisible(False)
 
-        # Remove lazily created pages
-        widgets_to_remove = [
-            getattr(self, 'feature_grid_page', None),
-            getattr(self, 'location_selection_page', None),
-            getattr(self, 'gpa_calculator_widget', None),
-        ]
-        if hasattr(self, 'dashboard'):
-            widgets_to_remove.append(self.dashboard)
-            delattr(self, 'dashboard')
-        if hasattr(self, 'notes_page'):
-            widgets_to_remove.append(self.notes_page)
-            delattr(self, 'notes_page')
-
-        for w in widgets_to_remove:
-            if w is not None:
-                try:
-                    if self.pages.indexOf(w) != -1:
-                        self.pages.removeWidget(w)
-                    w.deleteLater()
-                except Exception as e:
-                    print(f"Error removing widget: {e}")
-
+        # Remove the pages of this user (rebuilt on demand for the next one)
+        notes = self.registry.peek("notes")
+        if notes is not None:
+            notes.end_session()
+        self.registry.drop_user_pages()
+        drop_history_models()   # the cached GPA history of this user
+        if self.feature_grid_page is not None:
+            try:
+                if self.pages.indexOf(self.feature_grid_page) != -1:
+                    self.pages.removeWidget(self.feature_grid_page)
+                self.feature_grid_page.deleteLater()
+            except Exception as e:
+                print(f"Error removing widget: {e}")
         self.feature_grid_page = None
-        self.location_selection_page = None
-        self.gpa_calculator_widget = None
 
         self.hide_menu()
         self.pages.setCurrentWidget(self.login_page)
@@ -477,8 +462,13 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    app.setStyleSheet(load_stylesheet())
+    app.setStyleSheet(app_stylesheet())   # every page's styles, parsed once
     app.setFont(QFont("Segoe UI", 10))
     w = MainWindow()
     w.show()
+    # first turn of the event loop: the login screen is up
+    QTimer.singleShot(0, lambda: record_timing("login screen shown (since start)",
+                                               (time.perf_counter() - _START) * 1000))
+    if "--startup-report" in sys.argv:
+        app.aboutToQuit.connect(lambda: print(startup_report()))
     sys.exit(app.exec_())
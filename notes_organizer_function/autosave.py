@@ -0,0 +1,205 @@
+# autosave.py
+"""
+Dirty-tracking autosave for the note editor tabs.
+
+Tabs only report that they *might* have changed. Once per tick the engine
+takes a snapshot of each reported tab, compares its digest (title + HTML +
+overlay) with the last one recorded, and appends the real changes to the
+user's draft journal (see draft_journal.py). Every CHECKPOINT_INTERVAL_MS,
+and when a tab closes or the editor is left, the newest drafts are written
+into `notes` as one transaction. All file and SQLite work runs on a
+one-thread writer pool, never on the UI thread. recover_drafts() runs at
+login, before any note page is built.
+"""
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from database import db_manager as db
+from notes_organizer_function.draft_journal import DraftJournal
+
+AUTOSAVE_INTERVAL_MS   = 800
+CHECKPOINT_INTERVAL_MS = 15000
+
+
+class _WriterSignals(QObject):
+    # (list of (note_id, digest) checkpointed, updated note ids or None on DB error)
+    saved = pyqtSignal(object, object)
+
+
+class _WriteTask(QRunnable):
+    """Write changed images, journal the drafts, then checkpoint notes in one transaction."""
+    def __init__(self, user_id, journal, drafts, images, checkpoint, signals: _WriterSignals):
+        super().__init__()
+        self.user_id = user_id
+        self.journal = journal
+        self.drafts = drafts          # [(note_id, title, content, overlay_json, digest)]
+        self.images = images          # [(QImage, path)]
+        self.checkpoint = checkpoint  # same shape as drafts
+        self.signals = signals
+
+    def run(self):
+        for img, path in self.images:
+            if not img.save(path, "PNG"):
+                print(f"Autosave could not write {path}")
+        try:
+            self.journal.append(self.drafts)
+        except OSError as e:
+            print(f"Draft journal write failed: {e}")
+        if not self.checkpoint:
+            return
+        done = db.update_notes_batch(
+            self.user_id, [(nid, title, content, overlay) for nid, title, content, overlay, _d in self.checkpoint])
+        if done is not None:
+            ok = set(done)
+            try:
+                self.journal.checkpoint([(nid, d) for nid, _t, _c, _o, d in self.checkpoint if nid in ok])
+            except OSError as e:
+                print(f"Draft journal write failed: {e}")
+        self.signals.saved.emit([(nid, d) for nid, _t, _c, _o, d in self.checkpoint], done)
+
+
+def recover_drafts(user_id):
+    """
+    Write drafts left by a session of user_id that did not close cleanly back
+    into `notes` (synchronously, at login). Returns their note ids.
+    """
+    journal = DraftJournal(user_id)
+    drafts = journal.recover()
+    if not drafts:
+        return []
+    done = db.update_notes_batch(
+        user_id, [(nid, title, content, overlay) for nid, (title, content, overlay, _d) in drafts.items()])
+    if done is None:
+        return []   # keep the journal for the next login
+    journal.discard()
+    return done
+
+
+class AutosaveEngine(QObject):
+    """Collects dirty note tabs, journals what really changed and checkpoints it into the DB."""
+    noteMissing = pyqtSignal(int)   # note deleted elsewhere; its tab should close
+
+    def __init__(self, user_id, parent=None, interval_ms=AUTOSAVE_INTERVAL_MS,
+                 checkpoint_ms=CHECKPOINT_INTERVAL_MS):
+        super().__init__(parent)
+        self.user_id = user_id
+        self._tabs = {}      # note_id -> tab
+        self._dirty = set()  # note ids reported since the last tick
+        self._latest = {}    # note_id -> newest journaled (title, content, overlay_json, digest)
+        self._saved = {}     # note_id -> digest in the DB (or loaded from it)
+        self._queued = {}    # note_id -> digest handed to the writer for a checkpoint
+
+        self._timer = QTimer(self); self._timer.setSingleShot(True)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+        self._ckpt_timer = QTimer(self); self._ckpt_timer.setSingleShot(True)
+        self._ckpt_timer.setInterval(checkpoint_ms)
+        self._ckpt_timer.timeout.connect(lambda: self.flush())
+
+        # a single writer keeps journal appends and checkpoints in order
+        self._pool = QThreadPool(self); self._pool.setMaxThreadCount(1)
+        self._signals = _WriterSignals(self)
+        self._signals.saved.connect(self._on_saved)
+        self.journal = DraftJournal(user_id)
+
+    def close(self):
+        """End of the session (logout): checkpoint everything and close the journal."""
+        self._timer.stop(); self._ckpt_timer.stop()
+        self.flush(wait=True)
+        self.journal.close()
+
+    # ---- tabs
+    def track(self, tab):
+        """Start watching a freshly loaded tab; its current state counts as saved."""
+        self._tabs[tab.note_id] = tab
+        self._saved[tab.note_id] = tab.snapshot(collect_images=False)["digest"]
+        tab.edited.connect(self.mark_dirty)
+
+    def untrack(self, tab, flush=True):
+        """Stop watching a tab (checkpointing its last changes first unless flush=False)."""
+        if flush:
+            self.flush([tab])
+        try:
+            tab.edited.disconnect(self.mark_dirty)
+        except TypeError:
+            pass
+        self._tabs.pop(tab.note_id, None)
+        self._dirty.discard(tab.note_id)
+
+    def mark_dirty(self, tab):
+        """A tab may have changed; it is examined on the next tick (not re-armed per keystroke)."""
+        if tab.note_id in self._tabs:
+            self._dirty.add(tab.note_id)
+            if not self._timer.isActive():
+                self._timer.start()
+
+    def has_pending(self) -> bool:
+        return bool(self._dirty or self._queued) or any(
+            self._latest[n][3] != self._saved.get(n) for n in self._latest)
+
+    # ---- saving
+    def flush(self, tabs=None, wait=False):
+        """Checkpoint now: the given tabs (or all of them). wait=True blocks until written."""
+        if tabs is None:
+            ids = set(self._dirty)
+            ckpt = set(self._latest)
+        else:
+            ids = ckpt = {t.note_id for t in tabs if t.note_id in self._tabs}
+        self._write(ids, ckpt)
+        if wait:
+            self._pool.waitForDone()
+
+    def _tick(self):
+        self._write(set(self._dirty), ())
+
+    def _write(self, ids, checkpoint_ids):
+        self._dirty -= ids
+        if not self._dirty:
+            self._timer.stop()
+        drafts, images = [], []
+        for nid in ids:
+            tab = self._tabs.get(nid)
+            if tab is None:
+                continue
+            snap = tab.snapshot()
+            images.extend(snap["images"])
+            last = self._latest.get(nid)
+            if snap["digest"] == (last[3] if last else self._saved.get(nid)):
+                continue  # formatting-only signal, programmatic change, ...
+            entry = (snap["title"], snap["content"], snap["overlay_json"], snap["digest"])
+            self._latest[nid] = entry
+            drafts.append((nid,) + entry)
+
+        checkpoint = []
+        for nid in checkpoint_ids:
+            entry = self._latest.get(nid)
+            if entry and entry[3] != self._queued.get(nid, self._saved.get(nid)):
+                checkpoint.append((nid,) + entry)
+                self._queued[nid] = entry[3]
+        behind = any(e[3] != self._queued.get(n, self._saved.get(n)) for n, e in self._latest.items())
+        if not behind:
+            self._ckpt_timer.stop()
+        elif not self._ckpt_timer.isActive():
+            self._ckpt_timer.start()
+        if drafts or images or checkpoint:
+            self._pool.start(_WriteTask(self.user_id, self.journal, drafts, images, checkpoint, self._signals))
+
+    def _on_saved(self, written, done):
+        if done is None:
+            # DB error: forget the queued digests so the next checkpoint retries
+            for nid, digest in written:
+                if self._queued.get(nid) == digest:
+                    self._queued.pop(nid, None)
+            self._ckpt_timer.start()
+            return
+        done = set(done)
+        for nid, digest in written:
+            if self._queued.get(nid) == digest:
+                self._queued.pop(nid, None)
+            if nid in done:
+                self._saved[nid] = digest
+                if nid not in self._tabs and self._latest.get(nid, (None,) * 4)[3] == digest:
+                    self._latest.pop(nid, None)   # closed tab, nothing left to checkpoint
+            elif nid in self._tabs:
+                self.noteMissing.emit(nid)
+            else:
+                self._latest.pop(nid, None)
@@ -0,0 +1,50 @@
+# canvas.py
+"""
+Chunked canvas for the ink overlay of a note.
+
+The document is cut into horizontal chunks CHUNK_H pixels tall (one rendered
+page, see render_note_pages). A ChunkIndex buckets strokes or images by the
+chunks their vertical extent touches. Painting the viewport, hit-testing,
+erasing and rendering a page then only visit the items of the chunks
+involved, and nothing ever needs an image as tall as the whole note.
+
+The editor keeps its plain `strokes` / `images` lists because the undo
+commands edit them by position. An index stores positions into such a list
+and is rebuilt after the list changes.
+"""
+CHUNK_H = 1131   # = RENDER_PAGE_H, so an editor chunk is an exported page
+
+
+def chunk_span(top, bottom, chunk_h=CHUNK_H) -> range:
+    """Chunk numbers covered by the document rows [top, bottom]."""
+    return range(max(0, int(top)) // chunk_h, max(0, int(bottom)) // chunk_h + 1)
+
+
+class ChunkIndex:
+    """Positions of items (strokes, images, ...) per chunk of a list."""
+    __slots__ = ("chunk_h", "bottom", "_chunks")
+
+    def __init__(self, items=(), bounds=None, chunk_h=CHUNK_H):
+        """bounds(item) -> (top, bottom) in document pixels."""
+        self.chunk_h = chunk_h
+        self.bottom = 0          # lowest row reached by any item
+        self._chunks = {}        # chunk number -> [positions], ascending
+        for pos, item in enumerate(items):
+            top, bottom = bounds(item)
+            self.bottom = max(self.bottom, int(bottom))
+            for c in chunk_span(top, bottom, chunk_h):
+                self._chunks.setdefault(c, []).append(pos)
+
+    def positions(self, y0, y1) -> list:
+        """List positions of the items touching rows [y0, y1), in list (z) order."""
+        span = chunk_span(y0, max(y0, y1 - 1), self.chunk_h)
+        if len(span) == 1:
+            return self._chunks.get(span[0], [])
+        hit = set()
+        for c in span:
+            hit.update(self._chunks.get(c, ()))
+        return sorted(hit)
+
+    def chunk_count(self, min_bottom=0) -> int:
+        """Number of chunks needed to show everything above row max(bottom, min_bottom)."""
+        return max(1, -(-max(self.bottom, int(min_bottom)) // self.chunk_h))
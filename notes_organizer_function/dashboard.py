@@ -1,17 +1,29 @@
 import os
+from collections import OrderedDict
 from datetime import datetime
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel,
     QListWidget, QListWidgetItem, QMessageBox, QButtonGroup, QToolButton, QMenu,
-    QFileDialog, QInputDialog, QTableWidget, QTableWidgetItem, QAbstractItemView,
-    QHeaderView, QListView
+    QFileDialog, QInputDialog, QTableView, QAbstractItemView,
+    QHeaderView, QListView, QStyledItemDelegate, QStyle, QProgressDialog
 )
-from PyQt5.QtCore import Qt, QSize, QPoint, pyqtSignal
-from PyQt5.QtGui import QIcon, QPixmap
+from PyQt5.QtCore import (
+    Qt, QSize, QPoint, QRect, QEvent, QTimer, QObject, QRunnable, QThreadPool, pyqtSignal,
+    QAbstractTableModel, QAbstractListModel, QModelIndex
+)
+from PyQt5.QtGui import QIcon, QColor, QPainter
 
-from styles.dashboard_styles import get_dashboard_styles
-from database.db_manager import get_connection
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
+from database.db_manager import (
+    get_connection, search_notes, query_tokens, terms_match,
+    notes_generation, mark_notes_changed, get_folder_tree, index_notes
+)
+from notes_organizer_function.notes_bus import notes_bus
+from notes_organizer_function.note_importer import import_tree
+from notes_organizer_function.note_exporter import export_notes
+from notes_organizer_function.thumbnails import ThumbnailService
 
 APP_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 
@@ -24,6 +36,19 @@ ACTIONS_W     = 46
 LEVEL_STEP    = 14
 NOTE_EXTRA_INDENT = 12
 
+# ---------- search pipeline ----------
+SEARCH_DEBOUNCE_MS = 180
+QUERY_CACHE_SIZE   = 32
+
+# sidebar rows keep their indent level here (UserRole holds the row kind/id)
+LEVEL_ROLE = Qt.UserRole + 1
+
+# list/grid models hand rows to the views in batches of this size
+FETCH_BATCH = 200
+
+# writes reported on the notes bus are applied together after this delay
+CHANGE_COALESCE_MS = 50
+
 # ---------- assets ----------
 ASSET_DIRS = ["Photo", "assets", "icons", "images"]
 def _find_first(cands):
@@ -42,6 +67,390 @@ EDIT_ICON_PATH   = _find_first(["edit.png"])
 BACK_ICON_PATH   = _find_first(["back.png", "notes_back.png"])
 
 
+# ---------- note queries (UI-free, safe on worker threads) ----------
+def _query_notes(user_id, folder_id, q, sort_mode):
+    """
+    Notes for one folder (None=all, -1=uncategorized) and search text.
+    Returns {"rows": [(id, title, modified)], "snippets": {id: str}, "terms": {id: tuple} | None}.
+    """
+    if q:
+        # full-text search over title + body; best matches first unless sorting by title
+        hits = search_notes(user_id, q, folder_id=folder_id,
+                            order="title" if sort_mode == 1 else "rank", with_terms=True)
+        return {
+            "rows": [(h["id"], h["title"], h["modified_at"]) for h in hits],
+            "snippets": {h["id"]: h["snippet"] for h in hits if h["snippet"]},
+            "terms": {h["id"]: h["terms"] for h in hits},
+        }
+
+    conn = get_connection(); cur = conn.cursor()
+    sql = "SELECT id, title, COALESCE(updated_at, created_at) AS modified_at FROM notes"
+    args, where = [user_id], ["user_id=?"]
+
+    if folder_id == -1:
+        # uncategorized for this user; be robust if stray folder_id strings exist
+        where.append("(folder_id IS NULL "
+                     " OR TRIM(CAST(folder_id AS TEXT)) = '' "
+                     " OR folder_id NOT IN (SELECT id FROM folders WHERE user_id=?))")
+        args.append(user_id)
+    elif folder_id is not None:
+        where.append("folder_id = ?"); args.append(folder_id)
+
+    sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ("modified_at DESC, LOWER(title)" if sort_mode == 0 else "LOWER(title)")
+
+    cur.execute(sql, args)
+    rows = cur.fetchall()
+    conn.close()
+    return {"rows": rows, "snippets": {}, "terms": None}
+
+def _query_child_folders(user_id, folder_id):
+    """Child folders under folder_id (or root), for this user."""
+    if folder_id == -1: return []
+    conn = get_connection(); cur = conn.cursor()
+    if folder_id is None:
+        cur.execute("SELECT id, name FROM folders WHERE parent_id IS NULL AND user_id=? ORDER BY LOWER(name)",
+                    (user_id,))
+    else:
+        cur.execute("SELECT id, name FROM folders WHERE parent_id=? AND user_id=? ORDER BY LOWER(name)",
+                    (folder_id, user_id))
+    out = cur.fetchall(); conn.close()
+    return out
+
+
+class _NoteQueryCache:
+    """
+    LRU of query results keyed by (folder, query, sort).
+    Everything is dropped as soon as db_manager reports a note/folder write.
+    """
+    def __init__(self, capacity=QUERY_CACHE_SIZE):
+        self.capacity = capacity
+        self._items = OrderedDict()
+        self._gen = notes_generation()
+
+    def _check_gen(self):
+        gen = notes_generation()
+        if gen != self._gen:
+            self._items.clear(); self._gen = gen
+
+    def clear(self):
+        self._items.clear()
+
+    def get(self, key):
+        self._check_gen()
+        entry = self._items.get(key)
+        if entry is not None:
+            self._items.move_to_end(key)
+        return entry
+
+    def put(self, key, entry, gen):
+        """Store a result computed at generation gen (ignored if a write happened since)."""
+        self._check_gen()
+        if gen != self._gen: return
+        self._items[key] = entry
+        self._items.move_to_end(key)
+        while len(self._items) > self.capacity:
+            self._items.popitem(last=False)
+
+    def narrowed(self, key):
+        """
+        Answer a query that extends a cached one (every old word is a prefix of a
+        new word) by filtering the cached rows in memory; None if no such entry.
+        """
+        self._check_gen()
+        folder, q, sort = key
+        toks = query_tokens(q)
+        if not toks: return None
+        for (f, pq, s), entry in reversed(self._items.items()):
+            if f != folder or s != sort or entry.get("terms") is None:
+                continue
+            ptoks = query_tokens(pq)
+            if not ptoks or not all(any(t.startswith(p) for t in toks) for p in ptoks):
+                continue
+            terms = entry["terms"]
+            rows = [r for r in entry["rows"] if terms_match(terms.get(r[0], ()), toks)]
+            keep = {r[0] for r in rows}
+            return {
+                "rows": rows,
+                "snippets": {k: v for k, v in entry["snippets"].items() if k in keep},
+                "terms": {k: terms[k] for k in keep},
+                "children": entry.get("children"),
+            }
+        return None
+
+
+class _FolderTree:
+    """In-memory folder hierarchy with the notes filed in each folder (sidebar model)."""
+    def __init__(self, folder_rows=(), note_rows=()):
+        self.folders  = {}   # fid -> (name, parent_id)
+        self.children = {}   # parent_id (None = root) -> [fid] sorted by name
+        self.notes    = {}   # fid -> [(nid, title)] sorted by title
+        self.note_folder = {}  # nid -> fid for notes shown in the sidebar
+        for fid, name, parent in folder_rows:
+            self.folders[fid] = (name or "", parent)
+        for fid, (name, parent) in self.folders.items():
+            self.children.setdefault(parent, []).append(fid)
+        for kids in self.children.values():
+            kids.sort(key=lambda f: self.folders[f][0].lower())
+        for nid, title, fid in note_rows:
+            if fid in self.folders:
+                self.notes.setdefault(fid, []).append((nid, title or "Untitled"))
+                self.note_folder[nid] = fid
+        for lst in self.notes.values():
+            lst.sort(key=lambda t: t[1].lower())
+
+    @classmethod
+    def load(cls, user_id):
+        folders, notes = get_folder_tree(user_id)
+        return cls(folders, notes)
+
+    def name(self, fid):   return self.folders.get(fid, ("", None))[0]
+    def parent(self, fid): return self.folders.get(fid, ("", None))[1]
+
+    def level(self, fid):
+        lvl, p = 0, self.parent(fid)
+        while p is not None:
+            lvl += 1; p = self.parent(p)
+        return lvl
+
+    def walk(self, parent=None, level=0):
+        """Yield (fid, name, level) depth-first in display order."""
+        for fid in self.children.get(parent, []):
+            yield fid, self.folders[fid][0], level
+            yield from self.walk(fid, level + 1)
+
+
+# ---------- list / grid models ----------
+class _LazyRowsModel:
+    """
+    Mixin for the note views: holds the full result in memory but only exposes
+    FETCH_BATCH more rows each time the view scrolls near the end (fetchMore).
+    """
+    def _init_rows(self):
+        self._rows, self._shown, self._snippets = [], 0, {}
+
+    def set_rows(self, rows, snippets=None):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._snippets = snippets or {}
+        self._shown = min(len(self._rows), FETCH_BATCH)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows([])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._shown
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._shown < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid(): return
+        n = min(FETCH_BATCH, len(self._rows) - self._shown)
+        if n <= 0: return
+        self.beginInsertRows(QModelIndex(), self._shown, self._shown + n - 1)
+        self._shown += n
+        self.endInsertRows()
+
+    def _tooltip(self, nid, title):
+        snip = self._snippets.get(nid)
+        return f"{title}\n{snip}" if snip else title
+
+
+class _NotesTableModel(_LazyRowsModel, QAbstractTableModel):
+    """Name / Date Modified / actions columns for the list view."""
+    HEADERS = ["Name", "Date Modified", ""]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._init_rows()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        nid, title, modified = self._rows[index.row()]
+        title = title or "Untitled"
+        col = index.column()
+        if role == Qt.UserRole:
+            return nid
+        if role == Qt.UserRole + 1:
+            return title
+        if col == 0:
+            if role == Qt.DisplayRole: return title
+            if role == Qt.DecorationRole: return _file_icon()
+            if role == Qt.ToolTipRole: return self._tooltip(nid, title)
+        elif col == 1 and role == Qt.DisplayRole:
+            d, t = DashboardWidget._split_dt(modified)
+            return (d + "  " + t) if (d or t) else ""
+        return None
+
+
+class _NotesGridModel(_LazyRowsModel, QAbstractListModel):
+    """Folders first, then notes, for the icon grid. UserRole gives (kind, id, name)."""
+    def __init__(self, parent=None, thumbnails: ThumbnailService = None):
+        super().__init__(parent)
+        self._init_rows()
+        self._note_row = {}   # note id -> row, to repaint a thumbnail when it arrives
+        self._thumbs = thumbnails
+        if thumbnails is not None:
+            thumbnails.ready.connect(self._on_thumbnail)
+
+    def set_items(self, note_rows, folder_rows, snippets=None):
+        items = [("folder", fid, name or "Folder", None) for fid, name in folder_rows]
+        items += [("note", nid, title or "Untitled", modified) for nid, title, modified in note_rows]
+        self._note_row = {it[1]: i for i, it in enumerate(items) if it[0] == "note"}
+        self.set_rows(items, snippets)
+
+    def _on_thumbnail(self, note_id):
+        row = self._note_row.get(note_id)
+        if row is not None and row < self._shown:
+            idx = self.index(row)
+            self.dataChanged.emit(idx, idx, [Qt.DecorationRole])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        kind, rid, name, modified = self._rows[index.row()]
+        if role == Qt.UserRole:
+            return (kind, rid, name)
+        if role == Qt.DisplayRole:
+            if kind == "folder": return name
+            d, t = DashboardWidget._split_dt(modified)
+            return f"{name}\n{d} {t}"
+        if role == Qt.DecorationRole:
+            if kind == "folder":
+                return _folder_icon()
+            # only rows the view actually asks for get a preview rendered
+            thumb = self._thumbs.icon(rid, modified) if self._thumbs is not None else None
+            return thumb or _file_icon()
+        if role == Qt.ToolTipRole:
+            return name if kind == "folder" else self._tooltip(rid, name)
+        return None
+
+
+def _file_icon():
+    return assets.icon(FILE_ICON_PATH) if FILE_ICON_PATH else QIcon()
+
+def _folder_icon():
+    return assets.icon(FOLDER_ICON_PATH) if FOLDER_ICON_PATH else QIcon()
+
+
+class _RowActionsDelegate(QStyledItemDelegate):
+    """Paints the per-row "more" button and reports clicks (no real widget per row)."""
+    clicked = pyqtSignal(QModelIndex, QRect)
+    BTN = 20
+
+    def _btn_rect(self, option):
+        r = option.rect
+        return QRect(r.center().x() - self.BTN // 2, r.center().y() - self.BTN // 2, self.BTN, self.BTN)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        rect = self._btn_rect(option)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        if option.state & QStyle.State_MouseOver:
+            painter.setPen(Qt.NoPen); painter.setBrush(QColor("#eef2ff"))
+            painter.drawRoundedRect(rect, 4, 4)
+        if DOTS_ICON_PATH:
+            assets.icon(DOTS_ICON_PATH).paint(painter, rect.adjusted(2, 2, -2, -2))
+        else:
+            painter.setPen(QColor("#0b1f5e"))
+            painter.drawText(rect, Qt.AlignCenter, "⋮")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton \
+                and self._btn_rect(option).contains(event.pos()):
+            self.clicked.emit(index, self._btn_rect(option))
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class _QuerySignals(QObject):
+    done = pyqtSignal(int, object, object, int)   # seq, key, entry, generation
+
+class _NoteQueryTask(QRunnable):
+    """Run one dashboard query on the thread pool."""
+    def __init__(self, seq, user_id, key, signals: _QuerySignals):
+        super().__init__()
+        self.seq, self.user_id, self.key, self.signals = seq, user_id, key, signals
+
+    def run(self):
+        folder, q, sort = self.key
+        gen = notes_generation()
+        try:
+            entry = _query_notes(self.user_id, folder, q, sort)
+            entry["children"] = _query_child_folders(self.user_id, folder)
+        except Exception as e:
+            print(f"Dashboard query failed: {e}")
+            return
+        try:
+            self.signals.done.emit(self.seq, self.key, entry, gen)
+        except RuntimeError:
+            pass  # dashboard was closed meanwhile
+
+
+class _JobSignals(QObject):
+    progress = pyqtSignal(int, int, str)   # done, total, current file/note
+    finished = pyqtSignal(object)          # import/export summary dict
+
+class _ImportTask(QRunnable):
+    """Run note_importer.import_tree on the thread pool; cancel() stops it between files."""
+    def __init__(self, root, user_id, parent_folder_id, signals: _JobSignals):
+        super().__init__()
+        self.root, self.user_id, self.parent_folder_id = root, user_id, parent_folder_id
+        self.signals = signals
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def run(self):
+        try:
+            stats = import_tree(self.root, self.user_id, self.parent_folder_id,
+                                progress=self.signals.progress.emit,
+                                cancelled=lambda: self._cancel)
+        except Exception as e:
+            stats = {"notes": 0, "folders": 0, "skipped": 0, "cancelled": False,
+                     "errors": [f"Import failed: {e}"]}
+        try:
+            self.signals.finished.emit(stats)
+        except RuntimeError:
+            pass  # dashboard was closed meanwhile
+
+
+class _ExportTask(QRunnable):
+    """Run note_exporter.export_notes on the thread pool (it renders on its own workers)."""
+    def __init__(self, zip_path, user_id, folder_id, signals: _JobSignals):
+        super().__init__()
+        self.zip_path, self.user_id, self.folder_id = zip_path, user_id, folder_id
+        self.signals = signals
+        self._cancel = False
+
+    def cancel(self):
+        self._cancel = True
+
+    def run(self):
+        try:
+            stats = export_notes(self.user_id, self.zip_path, self.folder_id,
+                                 progress=self.signals.progress.emit,
+                                 cancelled=lambda: self._cancel)
+        except Exception as e:
+            stats = {"notes": 0, "pages": 0, "cancelled": False, "errors": [f"Export failed: {e}"]}
+        try:
+            self.signals.finished.emit(stats)
+        except RuntimeError:
+            pass
+
+
 class _ClickLabel(QLabel):
     """Label that calls a callback when clicked."""
     def __init__(self, text, on_click, parent=None):
@@ -53,7 +462,7 @@ class _ClickLabel(QLabel):
         super().mousePressEvent(e)
 
 
-class FixedColumnsIconList(QListWidget):
+class FixedColumnsIconList(QListView):
     """Icon grid with a fixed number of columns that resizes nicely."""
     def __init__(self, columns=5, base_item_h=110, icon_max=96, parent=None):
         super().__init__(parent)
@@ -61,9 +470,9 @@ class FixedColumnsIconList(QListWidget):
         self.base_item_h = base_item_h
         self.icon_max = icon_max
         self.setObjectName("gridView")
-        self.setViewMode(QListWidget.IconMode)
-        self.setMovement(QListWidget.Static)
-        self.setResizeMode(QListWidget.Adjust)
+        self.setViewMode(QListView.IconMode)
+        self.setMovement(QListView.Static)
+        self.setResizeMode(QListView.Adjust)
         self.setWrapping(True)
         self.setSpacing(10)
         self.setWordWrap(True)
@@ -105,13 +514,18 @@ class DashboardWidget(QWidget):
         # app-level state
         self.sort_mode = 0                # 0 = date desc, 1 = title asc
         self.current_folder_id = None     # None=All, -1=Uncategorized
+        self._snippets = {}               # note id -> search snippet for tooltips
+        self._query_cache = _NoteQueryCache()
+        self._query_seq = 0               # latest request; older results are discarded
         self.current_folder_name = None
         self._expanded_folders = set()    # expanded nodes in sidebar
+        self._tree = _FolderTree()        # sidebar model (see _refresh_folders)
+        self._pending_changes = []        # notes bus events not applied yet
         self.view_mode = "list"           # "list" or "grid"
 
         # window chrome
         self.setObjectName("dashboardRoot")
-        self.setStyleSheet(get_dashboard_styles())
+        apply_scope(self, "dashboard")
         self.setWindowTitle("Note Organizer Dashboard")
         self.setMinimumSize(760, 500)
 
@@ -124,10 +538,21 @@ class DashboardWidget(QWidget):
         self._setup_main()
         self._setup_footer()
 
+        # background queries
+        self._query_signals = _QuerySignals(self)
+        self._query_signals.done.connect(self._on_query_done)
+
+        # writes from the editor (or anywhere else) arrive here instead of
+        # the dashboard being rebuilt each time it is shown
+        self._change_timer = QTimer(self); self._change_timer.setSingleShot(True)
+        self._change_timer.setInterval(CHANGE_COALESCE_MS)
+        self._change_timer.timeout.connect(self._apply_changes)
+        notes_bus().changed.connect(self._on_notes_changed)
+
         # initial data load
         self._refresh_folders()
         self._refresh_center()
-        self._refilter_notes()
+        self._refilter_notes(wait=True)
 
     # ---------- top bar ----------
     def _setup_top(self):
@@ -138,11 +563,15 @@ class DashboardWidget(QWidget):
         self.search_bar = QLineEdit(placeholderText="Search notes…")
         self.search_bar.setObjectName("searchField")
         self.search_bar.setFixedWidth(SEARCH_W)
-        self.search_bar.textChanged.connect(self._refilter_notes)
+        # debounce typing; the query itself runs off the UI thread
+        self._search_timer = QTimer(self); self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._refilter_notes)
+        self.search_bar.textChanged.connect(lambda _=None: self._search_timer.start())
 
         self.filter_btn = QToolButton(objectName="filterBtn")
         if FILTER_ICON_PATH:
-            self.filter_btn.setIcon(QIcon(FILTER_ICON_PATH))
+            self.filter_btn.setIcon(assets.icon(FILTER_ICON_PATH))
         self._attach_sort_menu()
 
         self.btn_list = QPushButton("List", objectName="viewBtnLeft")
@@ -188,6 +617,9 @@ class DashboardWidget(QWidget):
         m.addAction("Add Note", lambda: self._add_note_here(self.current_folder_id))
         m.addAction("New Folder", lambda: self._add_subfolder(self.current_folder_id))
         m.addAction("Import Note (.txt)", lambda: self._import_note(self.current_folder_id))
+        m.addAction("Import Folder…", lambda: self._import_folder(self.current_folder_id))
+        m.addSeparator()
+        m.addAction("Export Notes (.zip)…", lambda: self._export_notes(self.current_folder_id))
         self.add_button.setMenu(m)
 
     def _set_sort_mode(self, mode):
@@ -216,8 +648,11 @@ class DashboardWidget(QWidget):
         # right: list or grid
         self.right = QVBoxLayout(); self.right.setSpacing(4)
 
-        self.table = QTableWidget(0, 3, self)
+        self.table_model = _NotesTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.table_model)
         self.table.setObjectName("notesTable")
+        self.table.setMouseTracking(True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
@@ -230,11 +665,16 @@ class DashboardWidget(QWidget):
         hdr.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         hdr.setSectionResizeMode(2, QHeaderView.Fixed)
         self.table.setColumnWidth(2, ACTIONS_W)
-        self.table.setHorizontalHeaderLabels(["Name", "Date Modified", ""])
-        self.table.cellDoubleClicked.connect(self._open_row_by_doubleclick)
+        self.table.doubleClicked.connect(self._open_row_by_doubleclick)
+        self._actions_delegate = _RowActionsDelegate(self.table)
+        self._actions_delegate.clicked.connect(self._on_row_actions_clicked)
+        self.table.setItemDelegateForColumn(2, self._actions_delegate)
 
+        self.thumbnails = ThumbnailService(self.user_id, self)
+        self.grid_model = _NotesGridModel(self, self.thumbnails)
         self.grid = FixedColumnsIconList(columns=5, base_item_h=110, icon_max=96, parent=self)
-        self.grid.itemDoubleClicked.connect(self._grid_open_item)
+        self.grid.setModel(self.grid_model)
+        self.grid.doubleClicked.connect(self._grid_open_item)
         self.grid.setContextMenuPolicy(Qt.CustomContextMenu)
         self.grid.customContextMenuRequested.connect(self._grid_context_menu)
 
@@ -277,7 +717,7 @@ class DashboardWidget(QWidget):
         self.btn_back_home = QPushButton()
         self.btn_back_home.setObjectName("iconBackButton")
         if BACK_ICON_PATH:
-            self.btn_back_home.setIcon(QIcon(BACK_ICON_PATH))
+            self.btn_back_home.setIcon(assets.icon(BACK_ICON_PATH))
         self.btn_back_home.setText(" Back to Home")
         self.btn_back_home.setIconSize(QSize(16, 16))
         self.btn_back_home.setFixedSize(750, 40)
@@ -301,44 +741,188 @@ class DashboardWidget(QWidget):
 
     # ---------- sidebar build ----------
     def _refresh_folders(self):
-        """Rebuild the sidebar: special rows, folders, and expanded notes."""
+        """Rebuild the sidebar: special rows, folders, and expanded notes (one query)."""
+        self._tree = _FolderTree.load(self.user_id)
+        self._expanded_folders &= set(self._tree.folders)
+        self.folder_list.setUpdatesEnabled(False)
         self.folder_list.clear()
         self._add_special_item_row("All Notes", "all")
         self._add_special_item_row("Uncategorized", "uncat")
+        self._insert_rows(self.folder_list.count(), self._branch_rows(None, 0))
+        self.folder_list.setUpdatesEnabled(True)
+        self._select_sidebar_row()
+        self._refresh_folder_row_styles()
 
-        conn = self._db(); cur = conn.cursor()
-        cur.execute(
-            "SELECT id, name, parent_id FROM folders WHERE user_id=? ORDER BY LOWER(name)",
-            (self.user_id,)
-        )
-        rows = cur.fetchall(); conn.close()
-
-        tree = {}
-        for fid, name, parent in rows:
-            tree.setdefault(parent, []).append((fid, name))
-
-        def add_branch(parent_id, level=0):
-            for fid, name in sorted(tree.get(parent_id, []), key=lambda t: t[1].lower()):
-                self._add_folder_item_row(fid, name, level)
-
-                if fid in self._expanded_folders:
-                    # inline notes under expanded folder (scoped to user)
-                    conn2 = self._db(); cur2 = conn2.cursor()
-                    cur2.execute(
-                        "SELECT id, title FROM notes WHERE folder_id=? AND user_id=? ORDER BY LOWER(title)",
-                        (fid, self.user_id)
-                    )
-                    for nid, title in cur2.fetchall():
-                        self._add_note_item_row(nid, title or "Untitled", level + 1)
-                    conn2.close()
-
-                    # recurse to children
-                    add_branch(fid, level + 1)
-
-        add_branch(None)
+    def _reload_folders(self):
+        """Re-read the folder tree (one query) and update only the sidebar rows that changed."""
+        self._sync_sidebar(_FolderTree.load(self.user_id))
+
+    def _sync_sidebar(self, new_tree):
+        """Diff the old and new tree models and patch the affected sidebar rows."""
+        old, self._tree = self._tree, new_tree
+        self._expanded_folders &= set(new_tree.folders)
+        changed = {fid for fid, v in new_tree.folders.items() if old.folders.get(fid) != v}
+
+        def under_changed(fid):
+            p = new_tree.parent(fid)
+            while p is not None:
+                if p in changed: return True
+                p = new_tree.parent(p)
+            return False
+
+        self.folder_list.setUpdatesEnabled(False)
+        for fid in old.folders:
+            if fid not in new_tree.folders:
+                self._drop_folder_block(fid)
+        # reverse display order: later siblings are already in place when we insert before them
+        for fid in reversed([f for f, _n, _l in new_tree.walk()]):
+            if fid in changed and not under_changed(fid):
+                self._place_folder_block(fid)
+        for fid in list(self._expanded_folders):
+            if fid in changed or under_changed(fid): continue
+            if old.notes.get(fid) != new_tree.notes.get(fid):
+                self._refresh_note_rows(fid)
+        self.folder_list.setUpdatesEnabled(True)
         self._select_sidebar_row()
         self._refresh_folder_row_styles()
 
+    # ---------- change notifications ----------
+    def _on_notes_changed(self, event):
+        """Queue a write reported on the notes bus; applied on the next tick or when shown."""
+        uid = event.get("user_id")
+        if uid is not None and uid != self.user_id:
+            return
+        self._pending_changes.append(event)
+        if self.isVisible():
+            self._change_timer.start()
+
+    def _touches_sidebar(self, event):
+        """False only for note updates that leave every sidebar row as it is."""
+        if event.get("kind") != "note" or event.get("action") != "update":
+            return True
+        fields = event.get("fields")
+        if fields is not None and "title" not in fields:
+            return False
+        if "title" not in event:
+            return True
+        title = event["title"] or "Untitled"
+        for nid in event["ids"]:
+            fid = self._tree.note_folder.get(nid)
+            if fid is not None and (nid, title) not in self._tree.notes.get(fid, ()):
+                return True
+        return False
+
+    def _apply_changes(self):
+        """Apply queued writes: patch the sidebar only if needed, then refresh the center."""
+        self._change_timer.stop()
+        if not self._pending_changes or not self.isVisible():
+            return  # kept until showEvent
+        events, self._pending_changes = self._pending_changes, []
+        if any(self._touches_sidebar(e) for e in events):
+            self._reload_folders()
+            if self.current_folder_id not in (None, -1) and self.current_folder_id not in self._tree.folders:
+                self.current_folder_id = None
+                self.current_folder_name = None
+                self._select_sidebar_row()
+                self._refresh_folder_row_styles()
+        self._refilter_notes()
+
+    def showEvent(self, e):
+        super().showEvent(e)
+        self._apply_changes()
+
+    # ---- row specs from the tree model
+    def _branch_rows(self, parent_id, level):
+        """Row specs for the visible folders under parent_id."""
+        out = []
+        for fid in self._tree.children.get(parent_id, []):
+            out += self._folder_block(fid, level)
+        return out
+
+    def _folder_block(self, fid, level):
+        """Row specs for one folder plus, if expanded, its notes and subfolders."""
+        out = [("folder", fid, self._tree.name(fid), level)]
+        if fid in self._expanded_folders:
+            out += [("note", nid, title, level + 1) for nid, title in self._tree.notes.get(fid, [])]
+            out += self._branch_rows(fid, level + 1)
+        return out
+
+    # ---- row-level edits
+    def _insert_rows(self, row, specs):
+        for kind, rid, label, level in specs:
+            if kind == "folder": self._add_folder_item_row(rid, label, level, row=row)
+            else:                self._add_note_item_row(rid, label, level, row=row)
+            row += 1
+        return row
+
+    def _remove_rows(self, start, end):
+        for i in range(end - 1, start - 1, -1):
+            self.folder_list.takeItem(i)
+
+    def _row_of(self, kind, rid):
+        for i in range(self.folder_list.count()):
+            data = self.folder_list.item(i).data(Qt.UserRole)
+            if data and data[0] == kind and data[1] == rid:
+                return i
+        return -1
+
+    def _block_end(self, row):
+        """Index just past the rows nested under the row at `row`."""
+        lvl = self.folder_list.item(row).data(LEVEL_ROLE) or 0
+        i = row + 1
+        while i < self.folder_list.count() and (self.folder_list.item(i).data(LEVEL_ROLE) or 0) > lvl:
+            i += 1
+        return i
+
+    def _is_shown(self, fid):
+        """A folder row is shown when every ancestor exists and is expanded."""
+        if fid not in self._tree.folders: return False
+        p = self._tree.parent(fid)
+        while p is not None:
+            if p not in self._tree.folders or p not in self._expanded_folders: return False
+            p = self._tree.parent(p)
+        return True
+
+    def _expand_folder_row(self, fid):
+        row = self._row_of("folder", fid)
+        if row >= 0:
+            self._insert_rows(row + 1, self._folder_block(fid, self._tree.level(fid))[1:])
+
+    def _collapse_folder_row(self, fid):
+        row = self._row_of("folder", fid)
+        if row >= 0:
+            self._remove_rows(row + 1, self._block_end(row))
+
+    def _drop_folder_block(self, fid):
+        row = self._row_of("folder", fid)
+        if row >= 0:
+            self._remove_rows(row, self._block_end(row))
+
+    def _place_folder_block(self, fid):
+        """(Re)insert one folder's rows at its sorted position among its siblings."""
+        self._drop_folder_block(fid)
+        if not self._is_shown(fid): return
+        parent = self._tree.parent(fid)
+        siblings = self._tree.children.get(parent, [])
+        row = -1
+        for sib in siblings[siblings.index(fid) + 1:]:
+            row = self._row_of("folder", sib)
+            if row >= 0: break
+        if row < 0:
+            row = self.folder_list.count() if parent is None else self._block_end(self._row_of("folder", parent))
+        self._insert_rows(row, self._folder_block(fid, self._tree.level(fid)))
+
+    def _refresh_note_rows(self, fid):
+        """Replace the inline note rows directly under an expanded folder."""
+        row = self._row_of("folder", fid)
+        if row < 0: return
+        end = row + 1
+        while end < self.folder_list.count() and (self.folder_list.item(end).data(Qt.UserRole) or ("",))[0] == "note":
+            end += 1
+        self._remove_rows(row + 1, end)
+        lvl = self._tree.level(fid) + 1
+        self._insert_rows(row + 1, [("note", nid, t, lvl) for nid, t in self._tree.notes.get(fid, [])])
+
     def _row_widget(self, left_pad_px, icon_path, text, click_cb, show_edit=False, edit_cb=None):
         """Build one sidebar row (folder/note/special) as a custom widget."""
         it = QListWidgetItem()
@@ -353,7 +937,7 @@ class DashboardWidget(QWidget):
         icon_w = 0
         if icon_path:
             ic = QLabel()
-            pm = QPixmap(icon_path).scaled(20, 20, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            pm = assets.pixmap(icon_path, 20)
             ic.setPixmap(pm)
             lay.addWidget(ic)
             icon_w = 20
@@ -367,7 +951,7 @@ class DashboardWidget(QWidget):
         edit_w = 0
         if show_edit and edit_cb:
             btn = QToolButton(w); btn.setObjectName("folderEdit")
-            if EDIT_ICON_PATH: btn.setIcon(QIcon(EDIT_ICON_PATH))
+            if EDIT_ICON_PATH: btn.setIcon(assets.icon(EDIT_ICON_PATH))
             btn.setFixedSize(18, 18); btn.setAutoRaise(True); btn.setFocusPolicy(Qt.NoFocus)
             btn.clicked.connect(lambda _=False, b=btn: edit_cb(b))
             lay.addWidget(btn, 0, Qt.AlignRight)
@@ -391,9 +975,15 @@ class DashboardWidget(QWidget):
             self._refresh_folder_row_styles()
         it, w = self._row_widget(0, FOLDER_ICON_PATH, label, click, show_edit=False, edit_cb=None)
         it.setData(Qt.UserRole, ("special", tag))
+        it.setData(LEVEL_ROLE, 0)
         self.folder_list.addItem(it); self.folder_list.setItemWidget(it, w)
 
-    def _add_folder_item_row(self, fid, name, level):
+    def _place_row(self, it, w, row):
+        if row is None: self.folder_list.addItem(it)
+        else:           self.folder_list.insertItem(row, it)
+        self.folder_list.setItemWidget(it, w)
+
+    def _add_folder_item_row(self, fid, name, level, row=None):
         """Add a folder row (with edit menu)."""
         it, w = self._row_widget(
             level * LEVEL_STEP, FOLDER_ICON_PATH, name,
@@ -402,9 +992,10 @@ class DashboardWidget(QWidget):
             edit_cb=lambda anchor_btn, _fid=fid, _name=name: self._folder_edit_menu(_fid, _name, anchor_btn)
         )
         it.setData(Qt.UserRole, ("folder", fid, name))
-        self.folder_list.addItem(it); self.folder_list.setItemWidget(it, w)
+        it.setData(LEVEL_ROLE, level)
+        self._place_row(it, w, row)
 
-    def _add_note_item_row(self, nid, title, level):
+    def _add_note_item_row(self, nid, title, level, row=None):
         """Add an inline note row under an expanded folder."""
         it, w = self._row_widget(
             level * LEVEL_STEP + NOTE_EXTRA_INDENT, FILE_ICON_PATH, title or "Untitled",
@@ -412,7 +1003,8 @@ class DashboardWidget(QWidget):
             show_edit=False, edit_cb=None
         )
         it.setData(Qt.UserRole, ("note", nid))
-        self.folder_list.addItem(it); self.folder_list.setItemWidget(it, w)
+        it.setData(LEVEL_ROLE, level)
+        self._place_row(it, w, row)
 
     def _refresh_folder_row_styles(self):
         """Keep custom row widgets visually in sync with selection."""
@@ -423,8 +1015,9 @@ class DashboardWidget(QWidget):
             if not w:
                 continue
             selected = (it is current)
-            if w.property("selected") != selected:
-                w.setProperty("selected", selected)
+            if bool(w.property("selected")) == selected:
+                continue   # only re-polish rows whose state flipped
+            w.setProperty("selected", selected)
             w.style().unpolish(w); w.style().polish(w); w.update()
             for lbl in w.findChildren(QLabel):
                 lbl.style().unpolish(lbl); lbl.style().polish(lbl); lbl.update()
@@ -478,15 +1071,19 @@ class DashboardWidget(QWidget):
             conn.commit()
         finally:
             conn.close()
+        mark_notes_changed("folder", "delete", (root_folder_id,), self.user_id)
 
 
     def _on_folder_row_clicked(self, fid, name):
         """Expand/collapse a folder row and show its notes."""
-        if fid in self._expanded_folders: self._expanded_folders.remove(fid)
-        else: self._expanded_folders.add(fid)
+        if fid in self._expanded_folders:
+            self._expanded_folders.remove(fid); self._collapse_folder_row(fid)
+        else:
+            self._expanded_folders.add(fid); self._expand_folder_row(fid)
         self.current_folder_id = fid
         self.current_folder_name = name
-        self._refresh_folders()
+        self._select_sidebar_row()
+        self._refresh_folder_row_styles()
         self._refilter_notes()
 
     def _open_note_from_sidebar(self, nid):
@@ -507,58 +1104,66 @@ class DashboardWidget(QWidget):
                 self.folder_list.setCurrentRow(i); return
 
     # ---------- data fetch ----------
+    def _query_key(self):
+        return (self.current_folder_id, (self.search_bar.text() or "").strip().lower(), self.sort_mode)
+
     def _fetch_notes(self):
         """Query notes for the current folder and search text (scoped to user)."""
-        q = (self.search_bar.text() or "").strip().lower()
-        conn = self._db(); cur = conn.cursor()
-
-        sql = "SELECT id, title, COALESCE(updated_at, created_at) AS modified_at FROM notes"
-        args, where = [self.user_id], ["user_id=?"]
-
-        if self.current_folder_id == -1:
-            # uncategorized for this user; be robust if stray folder_id strings exist
-            where.append("(folder_id IS NULL "
-                         " OR TRIM(CAST(folder_id AS TEXT)) = '' "
-                         " OR folder_id NOT IN (SELECT id FROM folders WHERE user_id=?))")
-            args.append(self.user_id)
-        elif self.current_folder_id not in (None, -1):
-            where.append("folder_id = ?"); args.append(self.current_folder_id)
-
-        if q:
-            where.append("LOWER(title) LIKE ?"); args.append(f"%{q}%")
-
-        sql += " WHERE " + " AND ".join(where)
-        sql += " ORDER BY " + ("modified_at DESC, LOWER(title)" if self.sort_mode == 0 else "LOWER(title)")
-
-        cur.execute(sql, args)
-        rows = cur.fetchall()
-        conn.close()
-        return rows
+        folder, q, sort = self._query_key()
+        entry = _query_notes(self.user_id, folder, q, sort)
+        self._snippets = entry["snippets"]
+        return entry["rows"]
 
     def _child_folders(self):
         """Get child folders under the current folder (or root), for this user."""
-        if self.current_folder_id == -1: return []
-        conn = self._db(); cur = conn.cursor()
-        if self.current_folder_id is None:
-            cur.execute("SELECT id, name FROM folders WHERE parent_id IS NULL AND user_id=? ORDER BY LOWER(name)",
-                        (self.user_id,))
-        else:
-            cur.execute("SELECT id, name FROM folders WHERE parent_id=? AND user_id=? ORDER BY LOWER(name)",
-                        (self.current_folder_id, self.user_id))
-        out = cur.fetchall(); conn.close()
-        return out
+        return _query_child_folders(self.user_id, self.current_folder_id)
 
     # ---------- fill center ----------
-    def _refilter_notes(self):
-        """Refresh the list/grid with current filters and update status."""
-        rows = self._fetch_notes()
+    def _refilter_notes(self, wait: bool = False):
+        """
+        Refresh the list/grid with current filters and update status.
+        Served from the query cache when possible (including narrowing a cached
+        search the user is still typing); otherwise queried on the thread pool,
+        or inline when wait=True.
+        """
+        self._search_timer.stop()
+        key = self._query_key()
+        self._query_seq += 1
+        entry = self._query_cache.get(key)
+        if entry is None:
+            entry = self._query_cache.narrowed(key)
+            if entry is not None:
+                self._query_cache.put(key, entry, notes_generation())
+        if entry is None and wait:
+            gen = notes_generation()
+            entry = _query_notes(self.user_id, *key)
+            entry["children"] = _query_child_folders(self.user_id, key[0])
+            self._query_cache.put(key, entry, gen)
+        if entry is not None:
+            self._show_entry(entry)
+            return
+        self.status_label.setText("Searching…" if key[1] else "Loading…")
+        QThreadPool.globalInstance().start(
+            _NoteQueryTask(self._query_seq, self.user_id, key, self._query_signals))
+
+    def _on_query_done(self, seq, key, entry, gen):
+        """Worker finished: cache the result, show it only if it is still the latest request."""
+        self._query_cache.put(key, entry, gen)
+        if seq == self._query_seq and key == self._query_key():
+            self._show_entry(entry)
+
+    def _show_entry(self, entry):
+        rows = entry["rows"]
+        self._snippets = entry.get("snippets") or {}
         search_text = (self.search_bar.text() or "").strip().lower()
 
         if self.view_mode == "list":
             self._fill_table(rows)
             has_child = False
         else:
-            children = self._child_folders()
+            children = entry.get("children")
+            if children is None:
+                children = self._child_folders()
             folders = [(fid, name) for fid, name in children if (not search_text) or (search_text in (name or "").lower())]
             self._fill_grid(rows, folder_rows=folders)
             has_child = len(folders) > 0
@@ -567,46 +1172,13 @@ class DashboardWidget(QWidget):
         self._update_empty_state(empty_notes=(len(rows) == 0), has_child_folders=has_child)
 
     def _fill_table(self, rows):
-        """Populate the table view."""
-        self.table.setRowCount(0)
-        for (nid, title, modified) in rows:
-            title = title or "Untitled"
-            d, t = self._split_dt(modified)
-            dt_text = (d + "  " + t) if (d or t) else ""
-
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            self.table.setRowHeight(r, ROW_H)
-
-            name_item = QTableWidgetItem(QIcon(FILE_ICON_PATH) if FILE_ICON_PATH else QIcon(), title)
-            name_item.setData(Qt.UserRole, nid)
-            name_item.setToolTip(title)
-            self.table.setItem(r, 0, name_item)
-            self.table.setItem(r, 1, QTableWidgetItem(dt_text))
-
-            btn = QToolButton(objectName="rowActionsBtn")
-            if DOTS_ICON_PATH: btn.setIcon(QIcon(DOTS_ICON_PATH))
-            else: btn.setText("⋮")
-            btn.setAutoRaise(True); btn.setFixedSize(20, 20)
-            btn.clicked.connect(lambda _=False, i=nid, tt=title, b=btn: self._row_actions(i, tt, b))
-            self.table.setCellWidget(r, 2, btn)
+        """Populate the table view (rows are handed to the view lazily)."""
+        self.table_model.set_rows(rows, self._snippets)
 
     def _fill_grid(self, note_rows, folder_rows=None):
         """Populate the grid view with folders and notes."""
-        self.grid.clear()
         folders = self._child_folders() if folder_rows is None else folder_rows
-        for fid, name in folders:
-            it = QListWidgetItem(QIcon(FOLDER_ICON_PATH) if FOLDER_ICON_PATH else QIcon(), name or "Folder")
-            it.setData(Qt.UserRole, ("folder", fid, name))
-            it.setToolTip(name or "Folder")
-            self.grid.addItem(it)
-        for nid, title, modified in note_rows:
-            title = title or "Untitled"
-            d, t = self._split_dt(modified)
-            it = QListWidgetItem(QIcon(FILE_ICON_PATH) if FILE_ICON_PATH else QIcon(), f"{title}\n{d} {t}")
-            it.setData(Qt.UserRole, ("note", nid, title))
-            it.setToolTip(title)
-            self.grid.addItem(it)
+        self.grid_model.set_items(note_rows, folders, self._snippets)
 
     def _update_empty_state(self, empty_notes: bool, has_child_folders: bool = False):
         """Show an empty state message when needed."""
@@ -679,6 +1251,7 @@ class DashboardWidget(QWidget):
         m = QMenu(self); m.setObjectName("popupMenu")
         m.addAction("Rename", lambda: self._rename_folder(folder_id, name))
         m.addAction("Delete", lambda: self._delete_folder(folder_id, name))
+        m.addAction("Export (.zip)…", lambda: self._export_notes(folder_id, name))
         m.exec_(anchor_btn.mapToGlobal(anchor_btn.rect().bottomLeft()) if anchor_btn else self.cursor().pos())
 
     def _rename_folder(self, folder_id, old_name):
@@ -692,8 +1265,9 @@ class DashboardWidget(QWidget):
         conn = self._db(); cur = conn.cursor()
         cur.execute("UPDATE folders SET name=? WHERE id=? AND user_id=?", (new_name, folder_id, self.user_id))
         conn.commit(); conn.close()
+        mark_notes_changed("folder", "update", (folder_id,), self.user_id)
         QMessageBox.information(self, "Folder Renamed", f"You renamed the folder into '{new_name}'.")
-        self._refresh_folders(); self._refilter_notes()
+        self._apply_changes()
 
     def _delete_folder(self, folder_id, folder_name):
         """Delete a folder (and its descendants) and move its notes to Uncategorized."""
@@ -717,8 +1291,7 @@ class DashboardWidget(QWidget):
             self.current_folder_id = None
             self.current_folder_name = None
 
-        self._refresh_folders()
-        self._refilter_notes()
+        self._apply_changes()
 
 
     # ---------- add / import ----------
@@ -731,8 +1304,10 @@ class DashboardWidget(QWidget):
             "INSERT INTO folders(name, parent_id, user_id) VALUES(?, ?, ?)",
             (name.strip(), None if parent_id in (None, -1) else parent_id, self.user_id)
         )
+        fid = cur.lastrowid
         conn.commit(); conn.close()
-        self._refresh_folders(); self._refilter_notes()
+        mark_notes_changed("folder", "create", (fid,), self.user_id)
+        self._apply_changes()
 
     def _add_note_here(self, folder_id):
         """Create a new note in the current folder (or uncategorized)."""
@@ -749,10 +1324,9 @@ class DashboardWidget(QWidget):
             "INSERT INTO notes(folder_id, title, content, user_id) VALUES(?,?,?,?)",
             (target, "Untitled", "", self.user_id)
         )
-        nid = cur.lastrowid; conn.commit(); conn.close()
-
-        self._refresh_folders()
-        self._refilter_notes()
+        nid = cur.lastrowid; index_notes(cur, (nid,)); conn.commit(); conn.close()
+        # the dashboard is hidden by the editor; the change is applied when it returns
+        mark_notes_changed("note", "create", (nid,), self.user_id, title="Untitled")
 
         if self.on_add_note_clicked:
             self.on_add_note_clicked(nid)
@@ -783,31 +1357,118 @@ class DashboardWidget(QWidget):
             "INSERT INTO notes(folder_id, title, content, user_id) VALUES (?,?,?,?)",
             (target, title, content, self.user_id)
         )
-        nid = cur.lastrowid; conn.commit(); conn.close()
-
-        self._refresh_folders()
-        self._refilter_notes()
+        nid = cur.lastrowid; index_notes(cur, (nid,)); conn.commit(); conn.close()
+        mark_notes_changed("note", "create", (nid,), self.user_id, title=title)
+        self._apply_changes()
 
         QMessageBox.information(self, "Imported", "Note added. Opening…")
         if self.on_add_note_clicked: self.on_add_note_clicked(nid)
 
+    def _import_folder(self, folder_id):
+        """Import a directory tree (.txt/.md/.html) in the background with progress."""
+        if getattr(self, "_import_task", None) is not None:
+            QMessageBox.information(self, "Import", "An import is already running.")
+            return
+        root = QFileDialog.getExistingDirectory(self, "Import Folder")
+        if not root: return
+        target = None if folder_id in (None, -1) else folder_id
+        if target is not None and not self._folder_exists(target)[0]:
+            target = None
+
+        dlg = QProgressDialog("Importing notes…", "Cancel", 0, 0, self)
+        dlg.setWindowTitle("Import Folder")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(300)
+        signals = _JobSignals(self)
+        task = _ImportTask(root, self.user_id, target, signals)
+        task.setAutoDelete(False)
+
+        def on_progress(done, total, path):
+            dlg.setMaximum(total); dlg.setValue(done)
+            dlg.setLabelText(f"Importing {done}/{total}\n{os.path.basename(path)}")
+
+        def on_finished(stats):
+            self._import_task = None
+            dlg.reset(); dlg.deleteLater()
+            msg = f"Imported {stats['notes']} note(s) into {stats['folders']} folder(s)."
+            if stats.get("skipped"): msg += f"\nSkipped {stats['skipped']} file(s)."
+            if stats.get("cancelled"): msg = "Import cancelled.\n" + msg
+            if stats.get("errors"):
+                msg += "\n\n" + "\n".join(stats["errors"][:5])
+                QMessageBox.warning(self, "Import", msg)
+            else:
+                QMessageBox.information(self, "Import", msg)
+
+        signals.progress.connect(on_progress)
+        signals.finished.connect(on_finished)
+        dlg.canceled.connect(task.cancel)
+        self._import_task = task
+        QThreadPool.globalInstance().start(task)
+
+    def _export_notes(self, folder_id, folder_name=None):
+        """Export the current folder subtree (or all notes) to a zip in the background."""
+        if getattr(self, "_export_task", None) is not None:
+            QMessageBox.information(self, "Export", "An export is already running.")
+            return
+        if folder_id == -1:
+            default = "Uncategorized"
+        elif folder_id is None:
+            default = "Notes"
+        else:
+            default = folder_name or self._tree.name(folder_id) or "Notes"
+        path, _ = QFileDialog.getSaveFileName(self, "Export Notes", f"{default}.zip", "Zip Archives (*.zip)")
+        if not path: return
+
+        dlg = QProgressDialog("Exporting notes…", "Cancel", 0, 0, self)
+        dlg.setWindowTitle("Export Notes")
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(300)
+        signals = _JobSignals(self)
+        task = _ExportTask(path, self.user_id, folder_id, signals)
+        task.setAutoDelete(False)
+
+        def on_progress(done, total, title):
+            dlg.setMaximum(total); dlg.setValue(done)
+            dlg.setLabelText(f"Exporting {done}/{total}\n{title}")
+
+        def on_finished(stats):
+            self._export_task = None
+            dlg.reset(); dlg.deleteLater()
+            if stats.get("cancelled"):
+                QMessageBox.information(self, "Export", "Export cancelled.")
+            elif stats.get("errors"):
+                done = f"Exported {stats['notes']} note(s) with problems:\n\n" if stats.get("notes") else ""
+                QMessageBox.warning(self, "Export", done + "\n".join(stats["errors"][:5]))
+            else:
+                QMessageBox.information(self, "Export",
+                                        f"Exported {stats['notes']} note(s) ({stats['pages']} page(s)).")
+
+        signals.progress.connect(on_progress)
+        signals.finished.connect(on_finished)
+        dlg.canceled.connect(task.cancel)
+        self._export_task = task
+        QThreadPool.globalInstance().start(task)
+
     # ---------- table & grid actions ----------
-    def _open_row_by_doubleclick(self, row, _col):
+    def _open_row_by_doubleclick(self, index):
         """Open a note by double-clicking its row."""
-        item = self.table.item(row, 0)
-        if not item: return
-        nid = item.data(Qt.UserRole)
+        nid = index.data(Qt.UserRole)
         if nid and self.on_add_note_clicked: self.on_add_note_clicked(nid)
 
-    def _row_actions(self, note_id, title, anchor_btn):
-        """Context menu for a note row in table view."""
+    def _on_row_actions_clicked(self, index, rect):
+        """The painted actions button of a table row was clicked."""
+        anchor = self.table.viewport().mapToGlobal(rect.bottomLeft())
+        self._row_actions(index.data(Qt.UserRole), index.data(Qt.UserRole + 1), anchor)
+
+    def _row_actions(self, note_id, title, anchor_pos):
+        """Context menu for a note row in table view (shown at a global position)."""
         m = QMenu(self); m.setObjectName("rowMenu")
         a_open   = m.addAction("Open")
         a_move   = m.addAction("Add to folder…")
         a_rename = m.addAction("Rename")
         a_delete = m.addAction("Delete")
         a_export_txt  = m.addAction("Export as TXT")
-        act = m.exec_(anchor_btn.mapToGlobal(anchor_btn.rect().bottomLeft()))
+        act = m.exec_(anchor_pos)
         if not act: return
         if   act == a_open and self.on_add_note_clicked: self.on_add_note_clicked(note_id)
         elif act == a_move:   self._note_move_to_folder(note_id)
@@ -815,9 +1476,9 @@ class DashboardWidget(QWidget):
         elif act == a_delete: self._note_delete(note_id, title)
         elif act == a_export_txt: self._note_export(note_id, title)
 
-    def _grid_open_item(self, item: QListWidgetItem):
+    def _grid_open_item(self, index):
         """Open folder or note from grid view by double-click."""
-        data = item.data(Qt.UserRole)
+        data = index.data(Qt.UserRole)
         if not data: return
         if data[0] == "folder":
             self.current_folder_id, self.current_folder_name = data[1], data[2]
@@ -827,9 +1488,9 @@ class DashboardWidget(QWidget):
 
     def _grid_context_menu(self, pos):
         """Right-click menu for grid items (folders and notes)."""
-        item = self.grid.itemAt(pos)
-        if not item: return
-        data = item.data(Qt.UserRole)
+        index = self.grid.indexAt(pos)
+        if not index.isValid(): return
+        data = index.data(Qt.UserRole)
         if not data: return
         gpos = self.grid.viewport().mapToGlobal(pos)
         if data[0] == "folder":
@@ -873,8 +1534,8 @@ class DashboardWidget(QWidget):
         conn = self._db(); cur = conn.cursor()
         cur.execute("UPDATE notes SET folder_id=? WHERE id=? AND user_id=?", (fid, note_id, self.user_id))
         conn.commit(); conn.close()
-        self._refresh_folders()
-        self._refilter_notes()
+        mark_notes_changed("note", "move", (note_id,), self.user_id, folder_id=fid)
+        self._apply_changes()
 
     def _choose_folder_dialog(self):
         """Show a simple folder picker dialog and return (id, name) or None."""
@@ -913,10 +1574,10 @@ class DashboardWidget(QWidget):
             return
         conn = self._db(); cur = conn.cursor()
         cur.execute("UPDATE notes SET title=? WHERE id=? AND user_id=?", (new_title, note_id, self.user_id))
-        conn.commit(); conn.close()
+        index_notes(cur, (note_id,)); conn.commit(); conn.close()
+        mark_notes_changed("note", "update", (note_id,), self.user_id, ("title",), title=new_title)
         QMessageBox.information(self, "Note Renamed", f"You renamed the note into '{new_title}'.")
-        self._refresh_folders()
-        self._refilter_notes()
+        self._apply_changes()
 
     def _note_delete(self, note_id, title):
         """Delete a note (this user) and notify listeners to close any open editor tab."""
@@ -927,9 +1588,9 @@ class DashboardWidget(QWidget):
         conn = self._db(); cur = conn.cursor()
         cur.execute("DELETE FROM notes WHERE id=? AND user_id=?", (note_id, self.user_id))
         conn.commit(); conn.close()
+        mark_notes_changed("note", "delete", (note_id,), self.user_id)
         QMessageBox.information(self, "Note Deleted", f"You deleted '{shown}' note.")
-        self._refresh_folders()
-        self._refilter_notes()
+        self._apply_changes()
 
         try:
             self.noteDeleted.emit(note_id)
@@ -975,8 +1636,8 @@ class DashboardWidget(QWidget):
         """Call when closing the dashboard to release references (optional)."""
         try:
             self.folder_list.clear()
-            self.table.setRowCount(0)
-            self.grid.clear()
+            self.table_model.clear()
+            self.grid_model.clear()
             self._expanded_folders.clear()
             self.current_folder_id = None
             self.current_folder_name = None
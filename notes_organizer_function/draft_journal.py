@@ -0,0 +1,168 @@
+# draft_journal.py
+"""
+Append-only draft journal for open notes (one file per user).
+
+Every autosave tick appends what changed in each edited note: line deltas of
+the HTML against the previous draft, and the title/overlay only when they
+changed. That is a cheap file append instead of a full row rewrite. The
+`notes` table is updated less often, at checkpoints. A checkpoint record
+follows each successful write, and once every note is checkpointed the file
+is truncated.
+
+After a crash, recover() rebuilds the last draft of every note that has no
+later checkpoint so it can be written back.
+
+Lines are JSON objects:
+  {"t": "draft", "n": id, "d": digest, "full": bool, "ops": [...], "title": ..., "overlay": ...}
+  {"t": "ckpt",  "n": id, "d": digest}
+A torn line (crash mid-write) is skipped. A journal kept after a failed
+recovery is appended to, so the next session starts on a fresh line.
+"""
+import difflib
+import json
+import os
+import threading
+
+APP_ROOT    = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+JOURNAL_DIR = os.path.join(APP_ROOT, "notes_media", "drafts")
+
+
+def _lines(text):
+    return (text or "").splitlines(keepends=True)
+
+
+def _delta(old, new):
+    """Opcodes turning old into new: ["c", i, j] copies old[i:j], ["i", lines] inserts."""
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, old, new).get_opcodes():
+        if tag == "equal":
+            ops.append(["c", i1, i2])
+        elif j2 > j1:
+            ops.append(["i", new[j1:j2]])
+    return ops
+
+
+def _apply(old, ops):
+    out = []
+    for op in ops:
+        if op[0] == "c":
+            out.extend(old[op[1]:op[2]])
+        else:
+            out.extend(op[1])
+    return out
+
+
+class DraftJournal:
+    """Per-user journal file. append/checkpoint may run on a worker thread."""
+    def __init__(self, user_id, directory=JOURNAL_DIR):
+        self.path = os.path.join(directory, f"{user_id}.journal")
+        self._lock = threading.Lock()
+        self._fh = None
+        self._last = {}    # note_id -> (lines, title, overlay) of the newest draft in the file
+        self._open = set() # note ids with drafts newer than their checkpoint
+
+    # ---- writing
+    def _file(self):
+        if self._fh is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            torn = False
+            if os.path.exists(self.path) and os.path.getsize(self.path):
+                with open(self.path, "rb") as fh:
+                    fh.seek(-1, os.SEEK_END)
+                    torn = fh.read(1) != b"\n"
+            self._fh = open(self.path, "a", encoding="utf-8")
+            if torn:
+                self._fh.write("\n")   # end the torn line so it stays one bad line
+        return self._fh
+
+    def append(self, drafts):
+        """drafts: [(note_id, title, content, overlay_json, digest)] -> one line each."""
+        if not drafts:
+            return
+        with self._lock:
+            out = []
+            for nid, title, content, overlay, digest in drafts:
+                lines = _lines(content)
+                prev = self._last.get(nid)
+                rec = {"t": "draft", "n": nid, "d": digest}
+                if prev is None:
+                    rec.update(full=True, ops=[["i", lines]], title=title, overlay=overlay)
+                else:
+                    rec.update(full=False, ops=_delta(prev[0], lines))
+                    if title != prev[1]: rec["title"] = title
+                    if overlay != prev[2]: rec["overlay"] = overlay
+                self._last[nid] = (lines, title, overlay)
+                self._open.add(nid)
+                out.append(json.dumps(rec, separators=(",", ":")))
+            fh = self._file()
+            fh.write("\n".join(out) + "\n")
+            fh.flush()   # survives an app crash; checkpoints reach the DB anyway
+
+    def checkpoint(self, saved):
+        """saved: [(note_id, digest)] now in the notes table. Truncates when nothing is open."""
+        if not saved:
+            return
+        with self._lock:
+            for nid, _digest in saved:
+                self._open.discard(nid)
+            if not self._open:
+                self._truncate()
+                return
+            fh = self._file()
+            fh.write("".join(json.dumps({"t": "ckpt", "n": nid, "d": d}, separators=(",", ":")) + "\n"
+                             for nid, d in saved))
+            fh.flush()
+
+    def _truncate(self):
+        if self._fh is not None:
+            self._fh.close(); self._fh = None
+        if os.path.exists(self.path):
+            open(self.path, "w").close()
+        # the next draft of each note must be self-contained again
+        self._last.clear()
+
+    def close(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close(); self._fh = None
+
+    # ---- recovery
+    def recover(self):
+        """
+        Replay the file: {note_id: (title, content, overlay_json, digest)} for every
+        note whose newest draft was never checkpointed. Call before appending.
+        """
+        state, pending = {}, {}
+        try:
+            # errors="replace": a torn line may end inside a UTF-8 sequence
+            with open(self.path, "r", encoding="utf-8", errors="replace") as fh:
+                for raw in fh:
+                    try:
+                        rec = json.loads(raw)
+                    except ValueError:
+                        continue  # torn line; later sessions follow it
+                    nid = rec.get("n")
+                    if rec.get("t") == "ckpt":
+                        pending.pop(nid, None)
+                        continue
+                    prev = state.get(nid)
+                    if prev is None and not rec.get("full"):
+                        continue  # delta without its base (should not happen)
+                    lines = _apply([] if rec.get("full") else prev[0], rec.get("ops") or [])
+                    title = rec["title"] if "title" in rec else prev[1]
+                    overlay = rec["overlay"] if "overlay" in rec else prev[2]
+                    state[nid] = (lines, title, overlay)
+                    pending[nid] = rec.get("d")
+        except FileNotFoundError:
+            return {}
+        except OSError as e:
+            print(f"Draft journal unreadable: {e}")
+            return {}
+        return {nid: (state[nid][1], "".join(state[nid][0]), state[nid][2], d)
+                for nid, d in pending.items()}
+
+    def discard(self):
+        """Forget everything in the file (after recovered drafts were written back)."""
+        with self._lock:
+            self._open.clear()
+            self._truncate()
@@ -0,0 +1,227 @@
+# note_exporter.py
+"""
+Bulk export of a user's notes (all, Uncategorized, or one folder subtree) to a zip.
+
+Each note becomes <folder path>/<title> [<id>]/ with:
+  note.html      the stored HTML
+  note.txt       title + plain text
+  page-001.png   rendered pages (text + images + ink, see render_note_pages)
+  media/...      the image files referenced by the overlay
+plus a manifest.json at the root. A note longer than MAX_PAGES_PER_NOTE
+pages gets only the first ones (reported in the errors, flagged in the
+manifest); a media file that cannot be read is reported and skipped.
+
+Notes are loaded and rendered on a small thread pool. At most workers * 2
+notes are in flight, and the zip is written by the calling thread as results
+come back, so memory stays bounded however many notes there are. A
+QGuiApplication must exist (for fonts). The command line creates one:
+
+    python -m notes_organizer_function.note_exporter out.zip --user <student_id> [--folder ID] [--db path]
+"""
+import argparse
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QTextDocument
+
+from database import db_manager as db
+from notes_organizer_function.notes_organizer import decode_overlay, render_note_pages
+
+MAX_PAGES_PER_NOTE = 200
+_UNSAFE_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def _safe(name, fallback="Untitled"):
+    name = _UNSAFE_RE.sub("_", (name or "").strip()).strip(" .")
+    return name[:60] or fallback
+
+
+def _png_bytes(img) -> bytes:
+    ba = QByteArray(); buf = QBuffer(ba); buf.open(QIODevice.WriteOnly)
+    img.save(buf, "PNG"); buf.close()
+    return bytes(ba)
+
+
+def _select_notes(user_id, folder_id):
+    """[(note_id, folder_id)] to export plus {folder_id: archive path}."""
+    folders, _notes = db.get_folder_tree(user_id)
+    info = {fid: (name, parent) for fid, name, parent in folders}
+
+    def path_of(fid):
+        parts = []
+        while fid is not None and fid in info and len(parts) < 64:
+            parts.append(_safe(info[fid][0], "Folder")); fid = info[fid][1]
+        return "/".join(reversed(parts))
+
+    conn = db.get_connection()
+    cur = conn.cursor()
+    if folder_id is None:
+        cur.execute("SELECT id, folder_id FROM notes WHERE user_id = ? ORDER BY id", (user_id,))
+    elif folder_id == -1:
+        cur.execute("SELECT id, folder_id FROM notes WHERE user_id = ? AND folder_id IS NULL ORDER BY id", (user_id,))
+    else:
+        cur.execute("""
+            WITH RECURSIVE sub(id) AS (
+                SELECT ?
+                UNION ALL
+                SELECT f.id FROM folders f JOIN sub s ON f.parent_id = s.id WHERE f.user_id = ?
+            )
+            SELECT id, folder_id FROM notes
+            WHERE user_id = ? AND folder_id IN (SELECT id FROM sub)
+            ORDER BY id
+        """, (folder_id, user_id, user_id))
+    rows = cur.fetchall()
+    conn.close()
+    paths = {fid: (path_of(fid) if fid in info else "Uncategorized") for fid in {r[1] for r in rows}}
+    return rows, paths
+
+
+def render_note_export(note_id, user_id, render=True, width_px=None):
+    """Everything the archive needs for one note (runs on a worker thread)."""
+    row = db.get_note(note_id, user_id)
+    if not row:
+        return None
+    content = row.get("content") or ""
+    overlay = decode_overlay(row.get("overlay")) if render else None
+    doc = QTextDocument()
+    if "<" in content and "</" in content:
+        doc.setHtml(content)
+    else:
+        doc.setPlainText(content)
+    pages, truncated = [], False
+    if render:
+        kw = {"width_px": width_px} if width_px else {}
+        # one page past the limit tells whether the note was cut
+        for img in render_note_pages(content, overlay, max_pages=MAX_PAGES_PER_NOTE + 1, **kw):
+            if len(pages) == MAX_PAGES_PER_NOTE:
+                truncated = True
+                break
+            pages.append(_png_bytes(img))
+    media = []
+    try:
+        raw = json.loads(row.get("overlay") or "{}")
+        media = [imd.get("abspath") for imd in raw.get("images", []) or []
+                 if imd.get("abspath") and os.path.exists(imd.get("abspath"))]
+    except (ValueError, AttributeError):
+        pass
+    title = row.get("title") or "Untitled"
+    return {"id": note_id, "title": title, "updated_at": row.get("updated_at"),
+            "html": content, "txt": title + "\n\n" + doc.toPlainText(),
+            "pages": pages, "truncated": truncated, "media": media}
+
+
+def export_notes(user_id, zip_path, folder_id=None, workers=None, render=True,
+                 progress=None, cancelled=None):
+    """
+    Write the selected notes to zip_path. folder_id: None = all notes,
+    -1 = Uncategorized, else that folder and its subfolders.
+    progress(done, total, title) after each note; cancelled() -> True aborts and
+    removes the partial archive. Returns a summary dict.
+    """
+    rows, paths = _select_notes(user_id, folder_id)
+    total = len(rows)
+    workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+    stats = {"notes": 0, "pages": 0, "media": 0, "total": total, "cancelled": False,
+             "errors": [], "path": zip_path}
+    manifest = []
+    todo = iter(rows)
+    folder_of = dict(rows)
+
+    try:
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            inflight = set()
+
+            def refill():
+                while len(inflight) < workers * 2:
+                    nxt = next(todo, None)
+                    if nxt is None:
+                        return
+                    inflight.add(pool.submit(render_note_export, nxt[0], user_id, render))
+
+            refill()
+            while inflight:
+                finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    inflight.discard(fut)
+                    if cancelled and cancelled():
+                        for f in inflight: f.cancel()
+                        raise ExportCancelled()
+                    try:
+                        item = fut.result()
+                    except Exception as e:
+                        stats["errors"].append(f"Export failed for a note: {e}")
+                        continue
+                    if item is None:
+                        continue
+                    base = f"{paths.get(folder_of[item['id']], 'Uncategorized')}/{_safe(item['title'])} [{item['id']}]"
+                    zf.writestr(f"{base}/note.html", item["html"])
+                    zf.writestr(f"{base}/note.txt", item["txt"])
+                    for i, png in enumerate(item["pages"], 1):
+                        zf.writestr(zipfile.ZipInfo(f"{base}/page-{i:03d}.png"), png, zipfile.ZIP_STORED)
+                    media = 0
+                    for path in item["media"]:
+                        try:
+                            zf.write(path, f"{base}/media/{os.path.basename(path)}", zipfile.ZIP_STORED)
+                            media += 1
+                        except OSError as e:   # e.g. deleted since the note was read
+                            stats["errors"].append(f"{item['title']}: media {os.path.basename(path)} skipped: {e}")
+                    if item["truncated"]:
+                        stats["errors"].append(f"{item['title']}: only the first {MAX_PAGES_PER_NOTE} pages "
+                                               f"were rendered")
+                    manifest.append({"id": item["id"], "title": item["title"], "path": base,
+                                     "updated_at": item["updated_at"], "pages": len(item["pages"]),
+                                     "truncated": item["truncated"]})
+                    stats["notes"] += 1
+                    stats["pages"] += len(item["pages"])
+                    stats["media"] += media
+                    if progress:
+                        progress(stats["notes"], total, item["title"])
+                refill()
+            zf.writestr("manifest.json", json.dumps({"user_id": user_id, "notes": manifest}, indent=1))
+    except ExportCancelled:
+        stats["cancelled"] = True
+    except OSError as e:
+        stats["errors"].append(f"Could not write {zip_path}: {e}")
+    if stats["cancelled"] or (stats["errors"] and not stats["notes"]):
+        try:
+            os.remove(zip_path)
+        except OSError:
+            pass
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Export notes (HTML, text, rendered pages, media) to a zip.")
+    ap.add_argument("zip_path")
+    ap.add_argument("--user", required=True, help="student_id whose notes are exported")
+    ap.add_argument("--folder", type=int, default=None, help="folder id (-1 = Uncategorized)")
+    ap.add_argument("--no-render", action="store_true", help="skip the PNG pages")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--db", default=None, help="SQLite file (default: %s)" % db.DB_PATH)
+    args = ap.parse_args(argv)
+    if args.db:
+        db.DB_PATH = args.db
+
+    from PyQt5.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication(["note_exporter"])  # noqa: F841 (fonts)
+
+    stats = export_notes(args.user, args.zip_path, args.folder, args.workers, not args.no_render,
+                         progress=lambda d, t, _n: print(f"{d}/{t}") if d == t or d % 50 == 0 else None)
+    print(f"Exported {stats['notes']} note(s), {stats['pages']} page(s), {stats['media']} media file(s) "
+          f"to {args.zip_path}.")
+    for err in stats["errors"]:
+        print(err)
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+# note_importer.py
+"""
+Bulk import of a directory tree of .txt / .md / .html files as notes.
+
+The root directory and each subdirectory become `folders` (same nesting), and
+every supported file becomes a note in its folder. Files are read one at a
+time and inserted in batched transactions, and each batch is added to the
+search index (db.index_notes) before it commits. No Qt is used here, so the
+dashboard runs it on a worker thread and it also works from the command line:
+
+    python -m notes_organizer_function.note_importer <dir> --user <student_id> [--db path]
+"""
+import argparse
+import html
+import os
+import re
+import sqlite3
+
+from database import db_manager as db
+
+SUPPORTED_EXTS = (".txt", ".md", ".html", ".htm")
+BATCH_SIZE     = 200
+MAX_FILE_BYTES = 5 * 1024 * 1024
+NAME_MAX       = 50   # CHECK (length(...) <= 50) on folders.name and notes.title
+
+_TITLE_RE   = re.compile(r"<title[^>]*>(.*?)</title\s*>", re.I | re.S)
+_MD_HEAD_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+_MD_ITEM_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+def _clip(name, fallback):
+    name = " ".join((name or "").split())
+    return (name or fallback)[:NAME_MAX]
+
+
+def _text_html(text, markdown=False):
+    """Plain text (or light Markdown: headings, bullets) as simple editor HTML."""
+    out, in_list = [], False
+    for line in text.splitlines():
+        m_head = _MD_HEAD_RE.match(line) if markdown else None
+        m_item = _MD_ITEM_RE.match(line) if markdown else None
+        if m_item:
+            if not in_list:
+                out.append("<ul>"); in_list = True
+            out.append(f"<li>{html.escape(m_item.group(1))}</li>")
+            continue
+        if in_list:
+            out.append("</ul>"); in_list = False
+        if m_head:
+            lvl = min(3, len(m_head.group(1)))
+            out.append(f"<h{lvl}>{html.escape(m_head.group(2))}</h{lvl}>")
+        else:
+            out.append(f"<p>{html.escape(line) or '<br />'}</p>")
+    if in_list:
+        out.append("</ul>")
+    return "<html><body>" + "\n".join(out) + "</body></html>"
+
+
+def read_note_file(path):
+    """Return (title, content) for one supported file, or None to skip it."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SUPPORTED_EXTS or os.path.getsize(path) > MAX_FILE_BYTES:
+        return None
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        text = f.read()
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if ext in (".html", ".htm"):
+        m = _TITLE_RE.search(text)
+        title = html.unescape(m.group(1)) if m else stem
+        return _clip(title, "Untitled"), text
+    return _clip(stem, "Untitled"), _text_html(text, markdown=(ext == ".md"))
+
+
+def count_files(root):
+    """Number of importable files under root (names only, no reads)."""
+    return sum(1 for _d, _s, files in os.walk(root)
+               for n in files if os.path.splitext(n)[1].lower() in SUPPORTED_EXTS)
+
+
+def import_tree(root, user_id, parent_folder_id=None, batch_size=BATCH_SIZE,
+                progress=None, cancelled=None):
+    """
+    Import root (recursively) for user_id under parent_folder_id (None = top level).
+    progress(done, total, path) is called after each file; cancelled() -> True stops
+    the import after the last committed batch. Returns a summary dict.
+    """
+    root = os.path.abspath(root)
+    total = count_files(root)
+    stats = {"notes": 0, "folders": 0, "skipped": 0, "errors": [], "total": total,
+             "cancelled": False, "root_folder_id": None}
+    conn = db.get_connection()
+    cur = conn.cursor()
+    folder_ids, committed = {}, set()
+    pending, new_folders = [], []
+    done = 0
+
+    def commit():
+        db.index_notes(cur, pending)
+        conn.commit()
+        if new_folders:
+            db.mark_notes_changed("folder", "create", tuple(new_folders), user_id)
+            committed.update(new_folders)
+            stats["folders"] += len(new_folders)
+            new_folders.clear()
+        if pending:
+            db.mark_notes_changed("note", "create", tuple(pending), user_id)
+            stats["notes"] += len(pending)
+            pending.clear()
+
+    try:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort(); filenames.sort()
+            parent = parent_folder_id if dirpath == root else folder_ids[os.path.dirname(dirpath)]
+            cur.execute("INSERT INTO folders (name, parent_id, user_id) VALUES (?, ?, ?)",
+                        (_clip(os.path.basename(dirpath), "Imported"), parent, user_id))
+            folder_ids[dirpath] = cur.lastrowid
+            new_folders.append(cur.lastrowid)
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if os.path.splitext(name)[1].lower() not in SUPPORTED_EXTS:
+                    continue
+                if cancelled and cancelled():
+                    raise ImportCancelled()
+                try:
+                    item = read_note_file(path)
+                except OSError as e:
+                    item = None
+                    stats["errors"].append(f"{path}: {e}")
+                if item is None:
+                    stats["skipped"] += 1
+                else:
+                    cur.execute("INSERT INTO notes (folder_id, title, content, user_id) VALUES (?, ?, ?, ?)",
+                                (folder_ids[dirpath], item[0], item[1], user_id))
+                    pending.append(cur.lastrowid)
+                    if len(pending) >= batch_size:
+                        commit()
+                done += 1
+                if progress:
+                    progress(done, total, path)
+        commit()
+    except ImportCancelled:
+        # keep the committed batches; drop the half-filled one
+        conn.rollback()
+        pending.clear(); new_folders.clear()
+        stats["cancelled"] = True
+    except sqlite3.Error as e:
+        conn.rollback()
+        stats["errors"].append(f"Database error in import_tree: {e}")
+    finally:
+        conn.close()
+    if folder_ids.get(root) in committed:
+        stats["root_folder_id"] = folder_ids[root]
+    return stats
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import a folder of .txt/.md/.html files as notes.")
+    ap.add_argument("root")
+    ap.add_argument("--user", required=True, help="student_id that will own the notes")
+    ap.add_argument("--parent-folder", type=int, default=None)
+    ap.add_argument("--db", default=None, help="SQLite file (default: %s)" % db.DB_PATH)
+    args = ap.parse_args(argv)
+    if args.db:
+        db.DB_PATH = args.db
+
+    def show(done, total, _path):
+        if done == total or done % 100 == 0:
+            print(f"{done}/{total}")
+
+    stats = import_tree(args.root, args.user, args.parent_folder, progress=show)
+    print(f"Imported {stats['notes']} note(s) into {stats['folders']} folder(s); "
+          f"skipped {stats['skipped']}.")
+    for err in stats["errors"]:
+        print(err)
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+# notes_bus.py
+"""
+Qt side of the notes change notifications in db_manager.
+
+db_manager calls its listeners on whichever thread committed the write;
+NotesBus re-emits every event as a Qt signal, so slots on GUI objects always
+run on the GUI thread (queued when the write happened on a worker).
+"""
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from database.db_manager import add_notes_listener
+
+
+class NotesBus(QObject):
+    # event dict built by db_manager.mark_notes_changed
+    changed = pyqtSignal(object)
+
+    def __init__(self):
+        super().__init__()
+        add_notes_listener(self.changed.emit)
+
+
+_bus = None
+
+def notes_bus() -> NotesBus:
+    """The shared bus (created on first use, which must be on the GUI thread)."""
+    global _bus
+    if _bus is None:
+        _bus = NotesBus()
+    return _bus
@@ -1,15 +1,25 @@
 # notes_organizer.py
 import os
 import json
+import hashlib
 from datetime import datetime, timezone
+from functools import lru_cache
 
-from styles.notes_organizer_styles import get_notes_organizer_styles
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
 from database import db_manager as db
+from notes_organizer_function.notes_bus import notes_bus
+from notes_organizer_function.autosave import AutosaveEngine
+from notes_organizer_function.canvas import CHUNK_H, ChunkIndex
+from notes_organizer_function.undo import (
+    UndoHistory, AddStrokeCommand, EraseCommand, AddImageCommand,
+    DeleteImageCommand, ImagePropsCommand
+)
 
-from PyQt5.QtCore import Qt, QPoint, QRect, QTimer, QSize, pyqtSignal
+from PyQt5.QtCore import Qt, QPoint, QRect, QRectF, QTimer, QSize, pyqtSignal, QObject, QRunnable, QThreadPool
 from PyQt5.QtGui import (
     QPixmap, QPainter, QImage, QPen, QColor, QFont, QPainterPath, QCursor,
-    QTransform, QIcon, QTextListFormat, QTextCharFormat, QBrush
+    QTransform, QIcon, QTextListFormat, QTextCharFormat, QBrush, QTextDocument
 )
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTextEdit, QMessageBox,
@@ -21,8 +31,13 @@ from PyQt5.QtWidgets import (
 APP_ROOT  = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MEDIA_DIR = os.path.join(APP_ROOT, "notes_media")
 
+# page size used when rendering notes off screen (export, previews)
+RENDER_PAGE_W = 800
+RENDER_PAGE_H = 1131   # ~A4 at 800 px wide
+
 # locate assets
 ASSET_DIR_CANDIDATES = ["Photo", "assets", "icons", "images"]
+@lru_cache(maxsize=None)
 def _find_asset(*names) -> str:
     for base in ASSET_DIR_CANDIDATES:
         for n in names:
@@ -253,13 +268,21 @@ class CropDialog(QDialog):
 # ======================= Drawing / overlay =======================
 class Stroke:
     """A freehand stroke with color, width and alpha."""
-    __slots__ = ("points", "color", "width", "alpha", "mode")
+    __slots__ = ("points", "color", "width", "alpha", "mode", "_ybounds")
     def __init__(self, points, color, width, alpha=255, mode="pen"):
         self.points = points
         self.color  = QColor(color)
         self.width  = int(width)
         self.alpha  = int(alpha)
         self.mode   = mode
+        self._ybounds = None
+    def y_bounds(self):
+        """(top, bottom) rows covered, pen width included (points never change after creation)."""
+        if self._ybounds is None:
+            ys = [p.y() for p in self.points] or [0]
+            r = self.width // 2 + 1
+            self._ybounds = (min(ys) - r, max(ys) + r)
+        return self._ybounds
     def paint(self, painter: QPainter, y_offset: int):
         """Draw the stroke on the painter (y_offset adjusts for scroll)."""
         if len(self.points) < 2: return
@@ -278,7 +301,7 @@ class InkTextEdit(QTextEdit):
     Rich text editor with extra layers:
     - Freehand strokes (pencil, pen, marker) + eraser (normal/lasso)
     - Floating images with crop, resize, move, and delete
-    - Undo/redo for strokes and image adds
+    - Command-based undo/redo for strokes, erases and every image edit
     Emits:
       overlayChanged -> whenever overlay content changes (images/strokes/eraser/etc.)
     """
@@ -303,8 +326,7 @@ class InkTextEdit(QTextEdit):
 
         self.strokes      = []
         self._current_pts = []
-        self.undo_stack   = []
-        self.redo_stack   = []
+        self.history      = UndoHistory()
 
         # images
         self.images         = []
@@ -313,6 +335,11 @@ class InkTextEdit(QTextEdit):
         self._resizing      = False
         self._resize_from   = None
         self._start_scale   = None
+        self._move_from     = None
+
+        # per-chunk buckets of the lists above (see canvas.py), rebuilt on demand
+        self._stroke_chunks = None
+        self._image_chunks  = None
 
         # image UI hit areas
         self._press_pos_view = None
@@ -321,7 +348,7 @@ class InkTextEdit(QTextEdit):
         self._btn_delete_rect    = None
 
         # cursors
-        self._cursor_pixmaps = {}
+        self._cursor_paths   = {}
         self._cursor_base    = 28
         self._apply_tool_cursor()
 
@@ -334,12 +361,12 @@ class InkTextEdit(QTextEdit):
 
     # ---- cursors
     def set_tool_pixmaps(self, mapping: dict, base_size: int = 28):
-        """Set custom cursors for drawing tools."""
-        self._cursor_pixmaps = {}
+        """Set custom cursors for drawing tools (pixmaps come from the shared asset cache)."""
+        self._cursor_paths = {}
         for k, path in mapping.items():
-            pm = QPixmap(path) if path else QPixmap()
+            pm = assets.pixmap(path) if path else QPixmap()
             if not pm.isNull():
-                self._cursor_pixmaps[k] = pm
+                self._cursor_paths[k] = path
         self._cursor_base = int(base_size)
         self._apply_tool_cursor()
 
@@ -347,7 +374,8 @@ class InkTextEdit(QTextEdit):
         """Apply the cursor that matches the current tool."""
         cur = QCursor(Qt.IBeamCursor)
         if self.tool in ("pencil", "pen", "marker", "eraser"):
-            pm = self._cursor_pixmaps.get(self.tool)
+            path = self._cursor_paths.get(self.tool)
+            pm = assets.pixmap(path) if path else None
             if pm and not pm.isNull():
                 sz = max(8, int(round(self._cursor_base)))
                 try: dpr = float(pm.devicePixelRatioF())
@@ -355,9 +383,7 @@ class InkTextEdit(QTextEdit):
                     try: dpr = float(pm.devicePixelRatio())
                     except Exception: dpr = 1.0
                 w = max(1, int(sz * dpr)); h = max(1, int(sz * dpr))
-                base = pm.scaled(w, h, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                base.setDevicePixelRatio(dpr)
-                cur = QCursor(base)
+                cur = QCursor(assets.pixmap(path, QSize(w, h), dpr=dpr))
             elif self.tool == "eraser":
                 cur = QCursor(Qt.CrossCursor)
         self.viewport().setCursor(cur)
@@ -402,6 +428,27 @@ class InkTextEdit(QTextEdit):
         self.eraser_mode = "lasso" if str(mode).lower().startswith("l") else "normal"
         self._apply_tool_cursor()
 
+    # ---- chunk index
+    def _strokes_changed(self): self._stroke_chunks = None
+    def _images_changed(self):  self._image_chunks = None
+
+    def _strokes_in(self, y0, y1) -> list:
+        """Indexes into self.strokes of the strokes touching document rows [y0, y1)."""
+        if self._stroke_chunks is None:
+            self._stroke_chunks = ChunkIndex(self.strokes, Stroke.y_bounds)
+        return self._stroke_chunks.positions(y0, y1)
+
+    def _images_in(self, y0, y1) -> list:
+        """Indexes into self.images of the images touching document rows [y0, y1)."""
+        if self._image_chunks is None:
+            self._image_chunks = ChunkIndex(
+                self.images, lambda im: (im["pos"].y(), im["pos"].y() + im["pm"].height()))
+        return self._image_chunks.positions(y0, y1)
+
+    def set_undo_limits(self, max_depth=None, max_bytes=None):
+        """Bound the undo history by number of steps and/or approximate bytes."""
+        self.history.set_limits(max_depth=max_depth, max_bytes=max_bytes)
+
     # ---- images
     def _compose_pm(self, im: dict):
         """Rebuild the pixmap when scale or angle changes."""
@@ -426,8 +473,8 @@ class InkTextEdit(QTextEdit):
         im = {"orig": pm.copy(),"source": pm.copy(),"pm": pm.copy(),
               "pos": pos_doc,"opacity": 1.0,"angle": 0.0,"scale": 1.0}
         self.images.append(im)
-        self.undo_stack.append(("add_image", len(self.images)-1))
-        self.redo_stack.clear()
+        self._images_changed()
+        self.history.push(AddImageCommand(im))
         self.selected_idx = len(self.images)-1
         self.imageCountChanged.emit(len(self.images))
         self.selectionChangedForImage.emit(True)
@@ -436,41 +483,48 @@ class InkTextEdit(QTextEdit):
 
     # ---- undo/redo
     def undo(self):
-        """Undo last stroke/image add/erase."""
-        changed = False
-        if self.undo_stack:
-            kind, payload = self.undo_stack.pop()
-            if kind == "stroke" and self.strokes:
-                self.redo_stack.append(("stroke", self.strokes.pop()))
-                changed = True
-            elif kind == "add_image" and self.images:
-                self.redo_stack.append(("add_image", self.images.pop()))
-                self.imageCountChanged.emit(len(self.images))
-                changed = True
-            elif kind == "erase":
-                self.redo_stack.append(("erase", self.strokes[:]))
-                self.strokes = payload
-                changed = True
-        self.viewport().update()
-        if changed:
-            self.overlayChanged.emit()  
+        """Undo the last overlay command (stroke, erase, image add/move/resize/crop/delete)."""
+        self._step_history(self.history.pop_undo(), undo=True)
 
     def redo(self):
         """Redo last undone action."""
-        if not self.redo_stack: return
-        kind, payload = self.redo_stack.pop()
-        changed = False
-        if kind == "stroke":
-            self.strokes.append(payload); self.undo_stack.append(("stroke", None)); changed = True
-        elif kind == "add_image":
-            self.images.append(payload);  self.undo_stack.append(("add_image", len(self.images)-1))
-            self.imageCountChanged.emit(len(self.images)); changed = True
-        elif kind == "erase":
-            self.undo_stack.append(("erase", self.strokes[:]))
-            self.strokes = payload; changed = True
+        self._step_history(self.history.pop_redo(), undo=False)
+
+    def _step_history(self, cmd, undo: bool):
+        """Apply one command in either direction and keep selection/signals in sync."""
+        if cmd is None:
+            self.viewport().update(); return
+        n_images = len(self.images)
+        selected = self.images[self.selected_idx] if self.selected_idx is not None \
+            and 0 <= self.selected_idx < n_images else None
+        if undo: cmd.undo(self)
+        else:    cmd.redo(self)
+        self._strokes_changed(); self._images_changed()
+        self._reselect_image(selected)
+        if len(self.images) != n_images:
+            self.imageCountChanged.emit(len(self.images))
         self.viewport().update()
-        if changed:
-            self.overlayChanged.emit()  
+        self.overlayChanged.emit()
+
+    def _remove_image(self, image) -> int:
+        """Remove an image dict by identity; return its old index (or -1)."""
+        for i, im in enumerate(self.images):
+            if im is image:
+                del self.images[i]
+                return i
+        return -1
+
+    def _reselect_image(self, image):
+        """Point selected_idx back at the same image dict after the list changed."""
+        idx = None
+        if image is not None:
+            for i, im in enumerate(self.images):
+                if im is image:
+                    idx = i; break
+        had = self.selected_idx is not None
+        self.selected_idx = idx
+        if had and idx is None:
+            self.selectionChangedForImage.emit(False)
 
     # ---- eraser helpers
     def _near_any(self, pt: QPoint, pts, radius: int) -> bool:
@@ -481,19 +535,43 @@ class InkTextEdit(QTextEdit):
         return False
 
     def _erase_with_radius(self, stroke, eraser_pts, radius):
-        """Return stroke segments after erasing around given points."""
-        segs, cur = [], []
+        """Return stroke segments after erasing around given points ([stroke] if untouched)."""
+        segs, cur, hit = [], [], False
         for p in stroke.points:
             if self._near_any(p, eraser_pts, radius):
+                hit = True
                 if len(cur) >= 2:
                     segs.append(Stroke(cur, stroke.color, stroke.width, stroke.alpha, stroke.mode))
                 cur = []
             else:
                 cur.append(p)
+        if not hit:
+            return [stroke]
         if len(cur) >= 2:
             segs.append(Stroke(cur, stroke.color, stroke.width, stroke.alpha, stroke.mode))
         return segs
 
+    def _apply_erase(self, new_strokes_for, y0, y1):
+        """
+        Replace each stroke touching rows [y0, y1) with new_strokes_for(stroke) and
+        record only the delta. Returns True if anything changed.
+        """
+        near = set(self._strokes_in(y0, y1))
+        removed, added, out = [], [], []
+        for i, s in enumerate(self.strokes):
+            repl = new_strokes_for(s) if i in near else (s,)
+            if len(repl) == 1 and repl[0] is s:
+                out.append(s); continue
+            removed.append((i, s))
+            for seg in repl:
+                added.append((len(out), seg)); out.append(seg)
+        if not removed:
+            return False
+        self.strokes = out
+        self._strokes_changed()
+        self.history.push(EraseCommand(removed, added))
+        return True
+
     def _point_in_poly(self, p: QPoint, poly: list) -> bool:
         """Point-in-polygon test for lasso eraser."""
         x, y = p.x(), p.y()
@@ -525,6 +603,7 @@ class InkTextEdit(QTextEdit):
                 self.selected_idx = hit
                 im = self.images[self.selected_idx]
                 self._drag_offset = self._to_doc(e.pos()) - im["pos"]
+                self._move_from   = QPoint(im["pos"])
                 self.selectionChangedForImage.emit(True)
                 self.viewport().setCursor(Qt.ClosedHandCursor)
                 self.viewport().update(); return
@@ -537,7 +616,7 @@ class InkTextEdit(QTextEdit):
             if self.tool in ("pencil", "pen", "marker", "eraser"):
                 self._current_pts = [self._to_doc(e.pos())]
                 self._press_pos_view = e.pos()
-                self.redo_stack.clear()
+                self.history.clear_redo()
                 return
         super().mousePressEvent(e)
 
@@ -552,11 +631,13 @@ class InkTextEdit(QTextEdit):
             factor = max(0.1, 1.0 + (delta.x() + delta.y()) / 240.0)
             im["scale"] = max(0.1, min(8.0, self._start_scale * factor))
             self._compose_pm(im)
+            self._images_changed()
             self.viewport().update(); return
 
         if self.selected_idx is not None and (e.buttons() & Qt.LeftButton):
             im = self.images[self.selected_idx]
             im["pos"] = self._to_doc(e.pos()) - self._drag_offset
+            self._images_changed()
             self.viewport().update(); return
 
         if self._current_pts and (e.buttons() & Qt.LeftButton):
@@ -586,36 +667,44 @@ class InkTextEdit(QTextEdit):
             # finish resizing
             if self._resizing:
                 self._resizing = False
+                if self.selected_idx is not None:
+                    im = self.images[self.selected_idx]
+                    if im["scale"] != self._start_scale:
+                        self.history.push(ImagePropsCommand(
+                            "resize_image", im, {"scale": self._start_scale}, {"scale": im["scale"]}))
                 self._apply_tool_cursor()
                 self._update_hover_cursor(e.pos())
                 self.viewport().update()
-                self.overlayChanged.emit()  # <-- NEW (size persisted via image file; pos unchanged)
+                self.overlayChanged.emit()  # size persisted via image file; pos unchanged
                 return
 
-            # if we were dragging an image (position changed), persist
+            # if we were dragging an image (position changed), record + persist
             if self.selected_idx is not None and not self._current_pts and (e.button() == Qt.LeftButton):
-                # We don't track a 'wasDragging' flag; emitting is harmless.
-                self.overlayChanged.emit()  # <-- NEW
+                im = self.images[self.selected_idx]
+                if self._move_from is not None and im["pos"] != self._move_from:
+                    self.history.push(ImagePropsCommand(
+                        "move_image", im, {"pos": self._move_from}, {"pos": QPoint(im["pos"])}))
+                    self.overlayChanged.emit()
+                self._move_from = None
 
             if not self._current_pts:
                 self._update_hover_cursor(e.pos())
                 super().mouseReleaseEvent(e); return
 
             if self.tool == "eraser":
-                before = self.strokes[:]
+                ys = [pt.y() for pt in self._current_pts]
                 if self.eraser_mode == "normal":
                     radius = max(4, self.widths["eraser"])
-                    new_strokes = []
-                    for s in self.strokes:
-                        new_strokes.extend(self._erase_with_radius(s, self._current_pts, radius))
-                    self.strokes = new_strokes
+                    pts = self._current_pts
+                    changed = self._apply_erase(lambda s: self._erase_with_radius(s, pts, radius),
+                                                min(ys) - radius, max(ys) + radius + 1)
                 else:
                     poly = self._current_pts[:]
-                    self.strokes = [s for s in self.strokes
-                                    if not any(self._point_in_poly(pt, poly) for pt in s.points)]
-                self.undo_stack.append(("erase", before))
-                self.redo_stack.clear()
-                self.overlayChanged.emit()  
+                    changed = self._apply_erase(
+                        lambda s: [] if any(self._point_in_poly(pt, poly) for pt in s.points) else [s],
+                        min(ys), max(ys) + 1)
+                if changed:
+                    self.overlayChanged.emit()
             else:
                 pts = self._smooth(self._current_pts)
                 if self.tool == "pencil":
@@ -624,9 +713,11 @@ class InkTextEdit(QTextEdit):
                     color, width, alpha = self.colors["marker"], self.widths["marker"], self.alphas["marker"]
                 else:
                     color, width, alpha = self.colors["pen"],    self.widths["pen"],    self.alphas["pen"]
-                self.strokes.append(Stroke(pts, color, width, alpha, self.tool))
-                self.undo_stack.append(("stroke", None))
-                self.overlayChanged.emit()  # <-- NEW
+                stroke = Stroke(pts, color, width, alpha, self.tool)
+                self.strokes.append(stroke)
+                self._strokes_changed()
+                self.history.push(AddStrokeCommand(stroke))
+                self.overlayChanged.emit()
 
             self._current_pts = []
             self._update_hover_cursor(e.pos())
@@ -644,11 +735,15 @@ class InkTextEdit(QTextEdit):
         if dlg.exec_() == QDialog.Accepted:
             out = dlg.result_pixmap()
             if out and not out.isNull():
+                keys = ("orig", "source", "pm", "scale", "angle")
+                before = {k: im.get(k) for k in keys}
                 im["orig"] = out.copy()
                 im["source"] = out.copy()
                 im["pm"] = out.copy()
                 im["scale"] = 1.0
                 im["angle"] = 0.0
+                self._images_changed()
+                self.history.push(ImagePropsCommand("crop_image", im, before, {k: im[k] for k in keys}))
                 self.viewport().update()
                 self.overlayChanged.emit() 
 
@@ -662,7 +757,10 @@ class InkTextEdit(QTextEdit):
         self._resize_handle_rect= None
         self._btn_delete_rect = None
 
-        for i, im in enumerate(self.images):
+        # only the chunks under the viewport are visited
+        vis0, vis1 = yoff, yoff + self.viewport().height()
+        for i in self._images_in(vis0, vis1):
+            im = self.images[i]
             p.save(); p.setOpacity(im["opacity"])
             pos_v = self._to_view(im["pos"])
             p.drawPixmap(pos_v, im["pm"])
@@ -703,7 +801,7 @@ class InkTextEdit(QTextEdit):
                 rr = self._resize_handle_rect.adjusted(4, 4, -4, -4)
                 p.drawLine(rr.bottomLeft(), rr.topRight())
 
-        for s in self.strokes: s.paint(p, yoff)
+        for i in self._strokes_in(vis0, vis1): self.strokes[i].paint(p, yoff)
 
         if self._current_pts and self.tool in ("pencil","pen","marker"):
             if self.tool == "pencil":
@@ -736,7 +834,7 @@ class InkTextEdit(QTextEdit):
         if getattr(self, "_btn_delete_rect", None) and self._btn_delete_rect.contains(p_view): return "btn_delete"
         if getattr(self, "_resize_handle_rect", None) and self._resize_handle_rect.contains(p_view): return "handle_resize"
         p_doc = self._to_doc(p_view)
-        for i in reversed(range(len(self.images))):
+        for i in reversed(self._images_in(p_doc.y(), p_doc.y() + 1)):
             im = self.images[i]; pm, pos = im["pm"], im["pos"]
             if QRect(pos, pm.size()).contains(p_doc): return i
         return None
@@ -746,7 +844,9 @@ class InkTextEdit(QTextEdit):
         if self.selected_idx is None: return
         if QMessageBox.question(self, "Delete Image", "Delete this image?",
                                 QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes:
-            self.images.pop(self.selected_idx)
+            idx = self.selected_idx
+            self.history.push(DeleteImageCommand(idx, self.images.pop(idx)))
+            self._images_changed()
             self.selected_idx = None
             self.imageCountChanged.emit(len(self.images))
             self.selectionChangedForImage.emit(False)
@@ -777,7 +877,7 @@ class InkTextEdit(QTextEdit):
                 "mode":   s.mode
             } for s in self.strokes],
             "images": [{
-                "abspath": None,  # replaced with saved path in NoteTabWidget.to_payload()
+                "abspath": None,  # replaced with saved path in NoteTabWidget.snapshot()
                 "pos": (im["pos"].x(), im["pos"].y()),
                 "opacity": im.get("opacity", 1.0),
                 "scale": im.get("scale", 1.0),
@@ -795,8 +895,13 @@ class InkTextEdit(QTextEdit):
 
         self.images = []
         for imd in d.get("images", []):
-            path = imd.get("abspath") or ""
-            pm = QPixmap(path) if path and os.path.exists(path) else QPixmap()
+            # "image" is a QImage pre-decoded off the UI thread (see decode_overlay)
+            pre = imd.get("image")
+            if isinstance(pre, QImage) and not pre.isNull():
+                pm = QPixmap.fromImage(pre)
+            else:
+                path = imd.get("abspath") or ""
+                pm = QPixmap(path) if path and os.path.exists(path) else QPixmap()
             if pm.isNull(): continue
             pos = imd.get("pos", (40, 40))
             scale = float(imd.get("scale", 1.0))
@@ -807,21 +912,50 @@ class InkTextEdit(QTextEdit):
             self._compose_pm(im)
             self.images.append(im)
 
+        self._strokes_changed(); self._images_changed()
+        # old commands point at objects that no longer exist
+        self.history.clear()
         self.imageCountChanged.emit(len(self.images))
         self.viewport().update()
 
+    def flattened_chunks(self, width_px=None, chunks=None):
+        """
+        Yield editor content + overlay as CHUNK_H-tall images, top to bottom
+        (all chunks, or the chunk numbers in `chunks`). Only one chunk is alive
+        at a time, however long the note is.
+        """
+        if width_px is None: width_px = max(640, self.viewport().width())
+        doc = self.document().clone(); doc.setTextWidth(width_px)
+        self._strokes_in(0, 1); self._images_in(0, 1)   # build both indexes
+        count = max(self._stroke_chunks.chunk_count(int(doc.size().height()) + 20),
+                    self._image_chunks.chunk_count())
+        images = [(im["pos"], im["pm"], im["opacity"]) for im in self.images]
+        for n in (range(count) if chunks is None else chunks):
+            if not 0 <= n < count:
+                continue
+            img = QImage(width_px, CHUNK_H, QImage.Format_RGB32); img.fill(Qt.white)
+            p = QPainter(img); p.setRenderHint(QPainter.Antialiasing)
+            _paint_chunk(p, doc, width_px, n * CHUNK_H, CHUNK_H,
+                         images, self._image_chunks, self.strokes, self._stroke_chunks)
+            p.end()
+            yield img
+
     def flattened_overlay_image(self, width_px=None) -> QImage:
-        """Render editor content + overlay into a single image."""
+        """
+        Render editor content + overlay into a single image (the whole note).
+        For long notes flattened_chunks keeps memory at one chunk.
+        """
         if width_px is None: width_px = max(640, self.viewport().width())
         doc = self.document().clone(); doc.setTextWidth(width_px)
-        height_px = int(doc.size().height()) + 20
-        img = QImage(width_px, max(200, height_px), QImage.Format_ARGB32); img.fill(Qt.white)
-        p = QPainter(img)
-        doc.drawContents(p, QRect(0, 0, width_px, height_px))
-        for im in self.images:
-            p.save(); p.setOpacity(im["opacity"]); p.drawPixmap(im["pos"], im["pm"]); p.restore()
-        for s in self.strokes: s.paint(p, 0)
-        p.end(); return img
+        height_px = max(200, int(doc.size().height()) + 20)
+        self._strokes_in(0, 1); self._images_in(0, 1)   # build both indexes
+        images = [(im["pos"], im["pm"], im["opacity"]) for im in self.images]
+        img = QImage(width_px, height_px, QImage.Format_ARGB32); img.fill(Qt.white)
+        p = QPainter(img); p.setRenderHint(QPainter.Antialiasing)
+        _paint_chunk(p, doc, width_px, 0, height_px,
+                     images, self._image_chunks, self.strokes, self._stroke_chunks)
+        p.end()
+        return img
 
 # ======================= Small popup for tool settings =======================
 class _ToolPopup(QWidget):
@@ -847,6 +981,8 @@ class _ToolPopup(QWidget):
 # ============================ Note tab UI ============================
 class NoteTabWidget(QWidget):
     """One note tab: title, toolbar, rich editor, overlay tools, autosave."""
+    edited = pyqtSignal(object)   # self; the AutosaveEngine decides whether anything changed
+
     def __init__(self, note_id, user_id, title="", content="", overlay=None):
         super().__init__()
         self.note_id = note_id
@@ -871,7 +1007,8 @@ class NoteTabWidget(QWidget):
 
         def tb_btn(name, tip):
             b = QToolButton()
-            b.setIcon(QIcon(PHOTO(name)))
+            b.setIcon(assets.icon(PHOTO(name)))
+            b.setProperty("assetKey", name)
             b.setToolTip(tip)
             b.setObjectName("notesTB")
             b.setProperty("toolbarControl", True)
@@ -957,11 +1094,10 @@ class NoteTabWidget(QWidget):
 
         wrap_lay.addWidget(self.editor, 1); root.addWidget(wrap, 1)
 
-        # autosave debounce
-        self._save_timer = QTimer(self); self._save_timer.setSingleShot(True); self._save_timer.setInterval(800)
-        self.title_input.textChanged.connect(self._debounce_save)
-        self.editor.textChanged.connect(self._debounce_save)
-        self.editor.overlayChanged.connect(self._debounce_save)  
+        # autosave: only report possible edits (see AutosaveEngine)
+        self.title_input.textChanged.connect(self._mark_edited)
+        self.editor.textChanged.connect(self._mark_edited)
+        self.editor.overlayChanged.connect(self._mark_edited)
 
         # actions
         self.btn_img.clicked.connect(self._insert_image)
@@ -1056,6 +1192,13 @@ class NoteTabWidget(QWidget):
         mode = prefs.get("eraser_mode")
         if mode in ("normal", "lasso"):
             self.editor.eraser_mode = mode
+        # undo bounds
+        undo = prefs.get("undo", {})
+        depth, mb = undo.get("max_depth"), undo.get("max_mb")
+        self.editor.set_undo_limits(
+            max_depth=depth if isinstance(depth, int) and depth > 0 else None,
+            max_bytes=int(mb * 1024 * 1024) if isinstance(mb, (int, float)) and mb >= 0 else None  # 0 = unbounded
+        )
 
     def _schedule_prefs_save(self):
         """Debounce saves to avoid disk spam."""
@@ -1066,7 +1209,9 @@ class NoteTabWidget(QWidget):
         prefs = {
             "colors": {k: self.editor.colors[k].name() for k in ("pencil", "pen", "marker")},
             "widths": {k: int(self.editor.widths[k]) for k in ("pencil", "pen", "marker", "eraser")},
-            "eraser_mode": self.editor.eraser_mode
+            "eraser_mode": self.editor.eraser_mode,
+            "undo": {"max_depth": self.editor.history.max_depth,
+                     "max_mb": -(-self.editor.history.max_bytes // (1024 * 1024))}  # MB rounded up, 0 stays 0
         }
         try:
             db.set_notes_tool_prefs(self.user_id, prefs)
@@ -1081,20 +1226,29 @@ class NoteTabWidget(QWidget):
         sz = btn.iconSize()
         if sz.width() <= 0 or sz.height() <= 0:
             sz = QSize(40, 40)
-        pm = base_icon.pixmap(sz)
-        if pm.isNull():
-            pm = QPixmap(sz)
-            pm.fill(Qt.transparent)
 
-        p = QPainter(pm)
-        p.setRenderHint(QPainter.Antialiasing)
-        r = max(6, sz.width() // 5)
-        rect = QRect(sz.width() - r - 2, sz.height() - r - 2, r, r)
-        p.setPen(QPen(QColor("#0b1f5e"), 1))
-        p.setBrush(QBrush(color))
-        p.drawEllipse(rect)
-        p.end()
-        btn.setIcon(QIcon(pm))
+        def paint():
+            pm = base_icon.pixmap(sz)
+            if pm.isNull():
+                pm = QPixmap(sz)
+                pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            p.setRenderHint(QPainter.Antialiasing)
+            r = max(6, sz.width() // 5)
+            rect = QRect(sz.width() - r - 2, sz.height() - r - 2, r, r)
+            p.setPen(QPen(QColor("#0b1f5e"), 1))
+            p.setBrush(QBrush(color))
+            p.drawEllipse(rect)
+            p.end()
+            return QIcon(pm)
+
+        # shared across tabs when the base icon is a known asset
+        key = btn.property("assetKey")
+        if key:
+            btn.setIcon(assets.rendered_icon(
+                ("badge", key, sz.width(), sz.height(), QColor(color).name(QColor.HexArgb)), paint))
+        else:
+            btn.setIcon(paint())
 
     def _set_eraser_mode_ui(self, mode: str):
         """Switch eraser mode and keep cursor consistent."""
@@ -1104,19 +1258,24 @@ class NoteTabWidget(QWidget):
     def _update_fontcolor_icon(self, store_base=False):
         """Draw a bold 'A' icon; the color dot shows selected font color."""
         size = getattr(self, "_BTN_SIZE", 56)
-        pm = QPixmap(size, size)
-        pm.fill(Qt.transparent)
-        p = QPainter(pm)
-        p.setRenderHint(QPainter.Antialiasing)
-        p.setRenderHint(QPainter.TextAntialiasing)
-        f = QFont()
-        f.setBold(True)
-        f.setPixelSize(int(size * 0.60))
-        p.setFont(f)
-        p.setPen(QColor("#0b1f5e"))
-        p.drawText(pm.rect(), Qt.AlignCenter, "A")
-        p.end()
-        icon = QIcon(pm)
+
+        def paint():
+            pm = QPixmap(size, size)
+            pm.fill(Qt.transparent)
+            p = QPainter(pm)
+            p.setRenderHint(QPainter.Antialiasing)
+            p.setRenderHint(QPainter.TextAntialiasing)
+            f = QFont()
+            f.setBold(True)
+            f.setPixelSize(int(size * 0.60))
+            p.setFont(f)
+            p.setPen(QColor("#0b1f5e"))
+            p.drawText(pm.rect(), Qt.AlignCenter, "A")
+            p.end()
+            return QIcon(pm)
+
+        icon = assets.rendered_icon(("fontcolor", size), paint)
+        self.btn_fontcolor.setProperty("assetKey", f"fontcolor:{size}")
         self.btn_fontcolor.setIcon(icon)
         self.btn_fontcolor.setIconSize(QSize(size - 16, size - 16))
         if store_base:
@@ -1211,15 +1370,17 @@ class NoteTabWidget(QWidget):
 
     def _dot_icon(self, dot_diam: int, box: int = 26, lift_px: float = 0.0) -> QIcon:
         """Make a circular dot icon used to choose sizes."""
-        pm = QPixmap(box, box); pm.fill(Qt.transparent)
-        p = QPainter(pm); p.setRenderHint(QPainter.Antialiasing)
-        p.setPen(Qt.NoPen); p.setBrush(QColor("#0b1f5e"))
-        from PyQt5.QtCore import QRectF
-        cx = box / 2.0
-        cy = box / 2.0 + float(lift_px)
-        p.drawEllipse(QRectF(cx - dot_diam/2.0, cy - dot_diam/2.0, dot_diam, dot_diam))
-        p.end()
-        return QIcon(pm)
+        def paint():
+            pm = QPixmap(box, box); pm.fill(Qt.transparent)
+            p = QPainter(pm); p.setRenderHint(QPainter.Antialiasing)
+            p.setPen(Qt.NoPen); p.setBrush(QColor("#0b1f5e"))
+            from PyQt5.QtCore import QRectF
+            cx = box / 2.0
+            cy = box / 2.0 + float(lift_px)
+            p.drawEllipse(QRectF(cx - dot_diam/2.0, cy - dot_diam/2.0, dot_diam, dot_diam))
+            p.end()
+            return QIcon(pm)
+        return assets.rendered_icon(("dot", dot_diam, box, float(lift_px)), paint)
 
     def _pick_font_color(self):
         """Open a color picker and apply selected text color."""
@@ -1308,15 +1469,24 @@ class NoteTabWidget(QWidget):
         pop.show()
 
     # ---- save payload / IO ----
-    def to_payload(self) -> dict:
-        """Build the content payload for saving to DB (and write image files)."""
+    def snapshot(self, collect_images=True) -> dict:
+        """
+        Current title/HTML/overlay plus a digest of all three. "images" lists
+        (QImage, path) for pictures whose pixels or file slot changed since the
+        last snapshot, so the PNGs can be written off the UI thread.
+        """
         overlay = self.editor.overlay_to_dict()
-        img_out = []
+        img_out, jobs, keys = [], [], []
         for i, im in enumerate(self.editor.images):
             pm, pos = im["pm"], im["pos"]
             # include user_id to avoid collisions across accounts
             abs_path = os.path.join(MEDIA_DIR, f"{self.user_id}-{self.note_id}-{i}.png")
-            pm.save(abs_path, "PNG")
+            key = (pm.cacheKey(), abs_path)
+            if im.get("saved_key") != key:
+                if collect_images:
+                    jobs.append((pm.toImage(), abs_path))
+                im["saved_key"] = key
+            keys.append(str(key[0]))
             img_out.append({
                 "abspath": abs_path,
                 "pos": (pos.x(), pos.y()),
@@ -1325,10 +1495,23 @@ class NoteTabWidget(QWidget):
                 "angle": im.get("angle", 0.0),
             })
         overlay["images"] = img_out
+        title = self.title_input.text().strip() or "Untitled"
+        content = self.editor.toHtml()
+        overlay_json = json.dumps(overlay)
+        digest = hashlib.sha1("\0".join((title, content, overlay_json, ",".join(keys)))
+                              .encode("utf-8", "ignore")).hexdigest()
+        return {"title": title, "content": content, "overlay": overlay,
+                "overlay_json": overlay_json, "digest": digest, "images": jobs}
+
+    def to_payload(self) -> dict:
+        """Build the content payload for saving to DB (and write changed image files)."""
+        snap = self.snapshot()
+        for img, path in snap["images"]:
+            img.save(path, "PNG")
         return {
-            "title": (self.title_input.text().strip() or "Untitled"),
-            "content": self.editor.toHtml(),
-            "overlay": overlay,
+            "title": snap["title"],
+            "content": snap["content"],
+            "overlay": snap["overlay"],
             "updated_at": datetime.now(timezone.utc).isoformat(),
             "user_id": self.user_id
         }
@@ -1338,7 +1521,133 @@ class NoteTabWidget(QWidget):
         path, _ = QFileDialog.getOpenFileName(self, "Insert Image", "", "Images (*.png *.jpg *.jpeg)")
         if path: self.editor.insert_image(path)
 
-    def _debounce_save(self): self._save_timer.start()
+    def _mark_edited(self): self.edited.emit(self)
+
+# ======================= Background note loading =======================
+def decode_overlay(raw_overlay):
+    """
+    Parse overlay JSON and decode its image files into QImages.
+    Safe to call from a worker thread (no QPixmap/QWidget use).
+    """
+    if not raw_overlay:
+        return None
+    try:
+        overlay = json.loads(raw_overlay) if isinstance(raw_overlay, str) else dict(raw_overlay)
+    except Exception:
+        return None
+    for imd in overlay.get("images", []) or []:
+        path = imd.get("abspath") or ""
+        if path and os.path.exists(path):
+            img = QImage(path)
+            if not img.isNull():
+                imd["image"] = img
+    return overlay
+
+def _paint_chunk(p, doc, width_px, y0, chunk_h, images, image_chunks, strokes, stroke_chunks):
+    """
+    Paint document rows [y0, y0 + chunk_h) at the painter's origin: text, then the
+    images [(pos, QImage or QPixmap, opacity)], then the strokes, each looked up
+    through its ChunkIndex so items of other chunks are never touched.
+    """
+    p.translate(0, -y0)
+    doc.drawContents(p, QRectF(0, y0, width_px, chunk_h))
+    for i in image_chunks.positions(y0, y0 + chunk_h):
+        pos, pic, opacity = images[i]
+        p.save(); p.setOpacity(opacity)
+        if isinstance(pic, QImage): p.drawImage(pos, pic)
+        else:                       p.drawPixmap(pos, pic)
+        p.restore()
+    for i in stroke_chunks.positions(y0, y0 + chunk_h):
+        strokes[i].paint(p, 0)
+
+def render_note_pages(content, overlay, width_px=RENDER_PAGE_W, page_h=RENDER_PAGE_H, max_pages=None):
+    """
+    Yield the note as page QImages (width_px x page_h): text, then images, then
+    ink, like InkTextEdit.flattened_chunks. overlay is the dict from
+    decode_overlay. Only QImage/QTextDocument are used, so this runs on worker
+    threads, and memory stays at one page however long the note is. Strokes
+    and images are bucketed per page (canvas.ChunkIndex), so each page only
+    paints its own.
+    """
+    doc = QTextDocument()
+    if content and "<" in content and "</" in content:
+        doc.setHtml(content)
+    else:
+        doc.setPlainText(content or "")
+    doc.setTextWidth(width_px)
+    overlay = overlay or {}
+
+    strokes = []
+    for s in overlay.get("strokes", []) or []:
+        pts = [QPoint(int(x), int(y)) for (x, y) in s.get("points", [])]
+        col = s.get("color", (0, 0, 0))
+        strokes.append(Stroke(pts, QColor(col[0], col[1], col[2]), s.get("width", 2),
+                              s.get("alpha", 255), s.get("mode", "pen")))
+    images = []
+    for imd in overlay.get("images", []) or []:
+        img = imd.get("image")
+        if not isinstance(img, QImage) or img.isNull():
+            continue
+        scale, angle = float(imd.get("scale", 1.0)), float(imd.get("angle", 0.0))
+        img = img.scaled(max(1, int(round(img.width() * scale))), max(1, int(round(img.height() * scale))),
+                         Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        if angle % 360 != 0:
+            t = QTransform(); t.rotate(angle)
+            img = img.transformed(t, Qt.SmoothTransformation)
+        pos = imd.get("pos", (40, 40))
+        images.append((QPoint(int(pos[0]), int(pos[1])), img, float(imd.get("opacity", 1.0))))
+
+    image_chunks  = ChunkIndex(images, lambda it: (it[0].y(), it[0].y() + it[1].height()), page_h)
+    stroke_chunks = ChunkIndex(strokes, Stroke.y_bounds, page_h)
+    pages = max(image_chunks.chunk_count(int(doc.size().height()) + 20), stroke_chunks.chunk_count())
+    if max_pages:
+        pages = min(pages, max_pages)
+
+    for n in range(pages):
+        # pages are opaque: RGB32 paints and encodes faster than ARGB32
+        page = QImage(width_px, page_h, QImage.Format_RGB32); page.fill(Qt.white)
+        p = QPainter(page)
+        p.setRenderHint(QPainter.Antialiasing)
+        _paint_chunk(p, doc, width_px, n * page_h, page_h, images, image_chunks, strokes, stroke_chunks)
+        p.end()
+        yield page
+
+class _LoaderSignals(QObject):
+    loaded = pyqtSignal(int, object)   # note_id, decoded overlay (dict or None)
+
+class _OverlayLoadTask(QRunnable):
+    """Decode one note's overlay on the global thread pool."""
+    def __init__(self, note_id, raw_overlay, signals: _LoaderSignals):
+        super().__init__()
+        self.note_id = note_id
+        self.raw_overlay = raw_overlay
+        self.signals = signals
+
+    def run(self):
+        try:
+            overlay = decode_overlay(self.raw_overlay)
+        except Exception as e:
+            print(f"Overlay decode failed for note {self.note_id}: {e}")
+            overlay = None
+        self.signals.loaded.emit(self.note_id, overlay)
+
+class _LazyNoteTab(QWidget):
+    """
+    Lightweight stand-in for a NoteTabWidget.
+    Holds the DB row until the tab is first activated and its overlay is decoded.
+    """
+    def __init__(self, row: dict, parent=None):
+        super().__init__(parent)
+        self.note_id = row.get("id")
+        self.row = row
+        self.overlay = None
+        self.ready = not row.get("overlay")   # nothing to decode -> ready now
+        lay = QVBoxLayout(self)
+        lbl = QLabel("Loading note…"); lbl.setAlignment(Qt.AlignCenter)
+        lay.addWidget(lbl)
+
+    def title(self) -> str:
+        return self.row.get("title") or "Untitled"
 
 # ============================ Organizer Shell ===============================
 class NoteOrganizerWidget(QWidget):
@@ -1349,14 +1658,14 @@ class NoteOrganizerWidget(QWidget):
         self.setWindowTitle("Notes Editor")
         self.setMinimumSize(780, 720)
         self.setObjectName("notesOrganizer")
-        self.setStyleSheet(get_notes_organizer_styles())
+        apply_scope(self, "notes")
 
         main = QVBoxLayout(self); main.setContentsMargins(10, 10, 10, 10); main.setSpacing(8)
 
         # header toolbar
         tb = QHBoxLayout(); tb.setSpacing(6)
         def tb_btn(name, tip):
-            b = QToolButton(); b.setIcon(QIcon(PHOTO("{}".format(name)))); b.setIconSize(QSize(26,26))
+            b = QToolButton(); b.setIcon(assets.icon(PHOTO("{}".format(name)))); b.setIconSize(QSize(26,26))
             b.setToolTip(tip); b.setObjectName("notesTB"); b.setProperty("toolbarControl", True)
             return b
         self.btn_back   = tb_btn("notes_back.png", "Back")
@@ -1403,7 +1712,7 @@ class NoteOrganizerWidget(QWidget):
         cl.addWidget(self.btn_prev); cl.addWidget(self.btn_next)
 
         self._corner_add_btn = QToolButton(corner)
-        self._corner_add_btn.setIcon(QIcon(PHOTO("new.png"))); self._corner_add_btn.setIconSize(QSize(22, 22))
+        self._corner_add_btn.setIcon(assets.icon(PHOTO("new.png"))); self._corner_add_btn.setIconSize(QSize(22, 22))
         self._corner_add_btn.setToolTip("New tab"); self._corner_add_btn.setObjectName("cornerNew")
         self._corner_add_btn.setFixedSize(24, 20); self._corner_add_btn.setAutoRaise(True)
         self._corner_add_btn.setFocusPolicy(Qt.NoFocus); self._corner_add_btn.clicked.connect(self._new_note)
@@ -1416,9 +1725,19 @@ class NoteOrganizerWidget(QWidget):
         self.btn_save.clicked.connect(lambda: self._save_active(show_popup=True))
         self.btn_prev.clicked.connect(self._go_prev)
         self.btn_next.clicked.connect(self._go_next)
-        self.tabs.currentChanged.connect(lambda _=None: self._update_stepper())
+        self.tabs.currentChanged.connect(self._on_current_changed)
+        notes_bus().changed.connect(self._on_notes_changed)
+
+        # background overlay decoding for lazily built tabs
+        self._loader_signals = _LoaderSignals(self)
+        self._loader_signals.loaded.connect(self._on_overlay_loaded)
 
-        # open recent or create first
+        # one autosave engine for every tab: one transaction per tick, off the UI thread
+        self._autosave = AutosaveEngine(self.user_id, self)
+        self._autosave.noteMissing.connect(self.close_tab_for_note)
+
+        # open recent or create first (tabs start as placeholders); drafts
+        # recovered at login are the most recently updated, so they open too
         rows = None
         try:
             rows = db.list_notes(user_id=self.user_id, order="updated_desc", limit=10)
@@ -1426,16 +1745,68 @@ class NoteOrganizerWidget(QWidget):
             rows = db.list_notes(self.user_id, order="updated_desc", limit=10)
         if rows:
             for r in rows:
-                self._open_by_id(r["id"])
+                self._add_lazy_tab(r)
+            self.tabs.setCurrentIndex(0)
+            self._on_current_changed(0)
         else:
             self._new_note()
         self._update_stepper()
 
+    # ---- lazy tabs
+    def _add_lazy_tab(self, row: dict) -> int:
+        """Add a placeholder tab for a DB row and start decoding its overlay."""
+        ph = _LazyNoteTab(row)
+        idx = self.tabs.addTab(ph, self._elided(ph.title()))
+        if not ph.ready:
+            QThreadPool.globalInstance().start(
+                _OverlayLoadTask(ph.note_id, row.get("overlay"), self._loader_signals))
+        return idx
+
+    def _on_current_changed(self, index: int):
+        w = self.tabs.widget(index)
+        if isinstance(w, _LazyNoteTab) and w.ready:
+            self._materialize(w)
+        self._update_stepper()
+
+    def _on_overlay_loaded(self, note_id: int, overlay):
+        """Worker finished: keep the result, build the tab now if it is showing."""
+        for i in range(self.tabs.count()):
+            w = self.tabs.widget(i)
+            if isinstance(w, _LazyNoteTab) and w.note_id == note_id and not w.ready:
+                w.overlay, w.ready = overlay, True
+                if i == self.tabs.currentIndex():
+                    self._materialize(w)
+                return
+
+    def _materialize(self, ph: "_LazyNoteTab") -> "NoteTabWidget":
+        """Replace a placeholder with the real editor tab at the same index."""
+        idx = self.tabs.indexOf(ph)
+        if idx == -1:
+            return None
+        row = ph.row
+        tab = NoteTabWidget(ph.note_id, self.user_id, row.get("title") or "Untitled",
+                            row.get("content") or "", overlay=ph.overlay)
+        was_current = (idx == self.tabs.currentIndex())
+        self.tabs.blockSignals(True)
+        try:
+            self.tabs.removeTab(idx)
+            self.tabs.insertTab(idx, tab, self._elided(row.get("title") or "Untitled"))
+            if was_current:
+                self.tabs.setCurrentIndex(idx)
+        finally:
+            self.tabs.blockSignals(False)
+        ph.deleteLater()
+        tab.title_input.textChanged.connect(lambda s, tw=tab: self._update_tab_text_for(tw, s))
+        self._autosave.track(tab)
+        return tab
+
     def close_tab_for_note(self, note_id: int) -> bool:
         """Close the tab for a note if it's open. Returns True if closed."""
         for i in range(self.tabs.count()):
             w = self.tabs.widget(i)
-            if isinstance(w, NoteTabWidget) and getattr(w, "note_id", None) == note_id:
+            if isinstance(w, (NoteTabWidget, _LazyNoteTab)) and getattr(w, "note_id", None) == note_id:
+                if isinstance(w, NoteTabWidget):
+                    self._autosave.untrack(w, flush=False)
                 self.tabs.removeTab(i)
                 if self.tabs.count() == 0:
                     self._new_note()
@@ -1445,16 +1816,15 @@ class NoteOrganizerWidget(QWidget):
 
     def _gc_deleted_tabs(self):
         removed_any = False
+        ids = [getattr(self.tabs.widget(i), "note_id", None) for i in range(self.tabs.count())]
+        alive = db.existing_note_ids([n for n in ids if n is not None], self.user_id)
         for i in reversed(range(self.tabs.count())):
             w = self.tabs.widget(i)
-            if isinstance(w, NoteTabWidget):
+            if isinstance(w, (NoteTabWidget, _LazyNoteTab)):
                 nid = getattr(w, "note_id", None)
-                ok = None
-                try:
-                    ok = db.get_note(nid, user_id=self.user_id)
-                except TypeError:
-                    ok = db.get_note(nid, self.user_id)
-                if nid is None or not ok:
+                if nid is None or nid not in alive:
+                    if isinstance(w, NoteTabWidget):
+                        self._autosave.untrack(w, flush=False)
                     self.tabs.removeTab(i)
                     removed_any = True
         if removed_any:
@@ -1462,11 +1832,27 @@ class NoteOrganizerWidget(QWidget):
                 self._new_note()
             self._update_stepper()
 
+    def _on_notes_changed(self, event):
+        """Close tabs of notes deleted elsewhere (e.g. from the dashboard)."""
+        if event.get("kind") == "note" and event.get("action") == "delete" \
+                and event.get("user_id") in (None, self.user_id):
+            for nid in event["ids"]:
+                self.close_tab_for_note(nid)
+
     def showEvent(self, e):
         """Prune dead tabs whenever this page is shown."""
         super().showEvent(e)
         self._gc_deleted_tabs()
 
+    def hideEvent(self, e):
+        """Leaving the editor: hand pending edits to the writer right away."""
+        self._autosave.flush()
+        super().hideEvent(e)
+
+    def end_session(self):
+        """Logout: save every pending edit and close the draft journal."""
+        self._autosave.close()
+
     # ---- stepper helpers
     def _go_prev(self):
         i = self.tabs.currentIndex()
@@ -1493,7 +1879,7 @@ class NoteOrganizerWidget(QWidget):
         """Open a note by id (reuse tab if already open)."""
         for i in range(self.tabs.count()):
             w = self.tabs.widget(i)
-            if isinstance(w, NoteTabWidget) and getattr(w, "note_id", None) == nid:
+            if isinstance(w, (NoteTabWidget, _LazyNoteTab)) and getattr(w, "note_id", None) == nid:
                 self.tabs.setCurrentIndex(i); self._update_stepper(); return
 
         row = None
@@ -1503,18 +1889,9 @@ class NoteOrganizerWidget(QWidget):
             row = db.get_note(nid, self.user_id)
         if not row: return
 
-        overlay = None
-        raw_overlay = row.get("overlay") if isinstance(row, dict) else None
-        if raw_overlay:
-            try: overlay = json.loads(raw_overlay)
-            except Exception: overlay = None
-
-        tab = NoteTabWidget(nid, self.user_id, row.get("title","Untitled"), row.get("content",""), overlay=overlay)
-        idx = self.tabs.addTab(tab, self._elided(row.get("title","Untitled")))
+        # placeholder first; overlay/images decode in the background
+        idx = self._add_lazy_tab(row)
         self.tabs.setCurrentIndex(idx)
-
-        tab.title_input.textChanged.connect(lambda s, tw=tab: self._update_tab_text_for(tw, s))
-        tab._save_timer.timeout.connect(self._save_active)
         self._update_stepper()
 
     def _update_tab_text_for(self, tab_widget: QWidget, title: str):
@@ -1539,17 +1916,7 @@ class NoteOrganizerWidget(QWidget):
         """Save the note in the tab being closed, then remove it."""
         w = self.tabs.widget(index)
         if isinstance(w, NoteTabWidget):
-            payload = w.to_payload()
-            try:
-                db.update_note(w.note_id, payload["title"], payload["content"],
-                               json.dumps(payload["overlay"]), user_id=self.user_id)
-            except TypeError:
-                try:
-                    db.update_note(w.note_id, payload["title"], payload["content"],
-                                   json.dumps(payload["overlay"]), self.user_id)
-                except TypeError:
-                    db.update_note(w.note_id, payload["title"], payload["content"],
-                                   json.dumps(payload["overlay"]), user_id=self.user_id)
+            self._autosave.untrack(w)   # queues its last changes for the writer
         self.tabs.removeTab(index)
         if self.tabs.count() > 0 and self.tabs.currentIndex() == -1:
             self.tabs.setCurrentIndex(max(0, index - 1))
@@ -1568,29 +1935,15 @@ class NoteOrganizerWidget(QWidget):
             ok = db.get_note(w.note_id, self.user_id)
 
         if not ok:
-            idx = self.tabs.indexOf(w)
-            if idx != -1:
-                self.tabs.removeTab(idx)
-            if self.tabs.count() == 0:
-                self._new_note()
-            self._update_stepper()
+            self.close_tab_for_note(w.note_id)
             if show_popup:
                 QMessageBox.warning(self, "Note deleted", "This note was deleted elsewhere. The tab has been closed.")
             return
 
-        payload = w.to_payload()
-        try:
-            db.update_note(w.note_id, payload["title"], payload["content"],
-                           json.dumps(payload["overlay"]), user_id=self.user_id)
-        except TypeError:
-            try:
-                db.update_note(w.note_id, payload["title"], payload["content"],
-                               json.dumps(payload["overlay"]), self.user_id)
-            except TypeError:
-                db.update_note(w.note_id, payload["title"], payload["content"],
-                               json.dumps(payload["overlay"]), user_id=self.user_id)
-        self._update_tab_text_for(w, payload["title"])
+        self._autosave.flush([w], wait=True)
+        self._update_tab_text_for(w, w.title_input.text().strip() or "Untitled")
         if show_popup:
+            db.snapshot_note_revision(w.note_id, self.user_id)
             QMessageBox.information(self, "Saved", "Your note has been saved.")
 
     def _export_txt(self):
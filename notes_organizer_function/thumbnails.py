@@ -0,0 +1,166 @@
+# thumbnails.py
+"""
+Note preview thumbnails for the dashboard grid.
+
+A thumbnail is the first rendered page of a note (text + images + ink, see
+render_note_pages), scaled down. Lookups go through three levels:
+  memory   LRU of QIcons keyed by (note id, updated_at)
+  disk     notes_media/thumbs/<user>/<id>-<updated_at digits>-<hash of content + overlay>.png
+  render   on a small worker pool, written to disk, then announced via ready
+A worker reads the note's current row and looks for the file of exactly that
+content, so an edited note is rendered again and unchanged notes never are.
+updated_at only has one-second resolution, so the memory cache also listens
+to the notes bus: an edited note keeps showing its old icon until the new
+one is ready. A rendered file replaces the files of older versions only (by updated_at,
+then file time), never a newer one written by a later task, and a deleted
+note's files go with its delete event.
+"""
+import glob
+import hashlib
+import os
+import re
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QIcon, QImage, QPixmap
+
+from database import db_manager as db
+from notes_organizer_function.notes_bus import notes_bus
+from notes_organizer_function.notes_organizer import MEDIA_DIR, decode_overlay, render_note_pages
+
+THUMB_SIZE   = 96     # bounding box (px) of a grid thumbnail
+MEMORY_ITEMS = 300
+THUMB_DIR    = os.path.join(MEDIA_DIR, "thumbs")
+RENDERED     = ("content", "overlay")   # note columns a thumbnail shows
+
+
+def _drop_deleted_thumbs(event):
+    """Notes listener: remove the thumbnails of deleted notes (any thread)."""
+    if event.get("kind") != "note" or event.get("action") != "delete":
+        return
+    for note_id in event.get("ids") or ():
+        for path in glob.glob(os.path.join(THUMB_DIR, "*", f"{note_id}-*.png")):
+            try: os.remove(path)
+            except OSError: pass
+
+db.add_notes_listener(_drop_deleted_thumbs)
+
+
+def _stamp(updated_at):
+    return re.sub(r"\D", "", str(updated_at or ""))
+
+def _stamp_of(path):
+    """updated_at digits in a thumbnail file name ('' for the older <id>-<hash>.png names)."""
+    parts = os.path.basename(path)[:-4].split("-")
+    return parts[1] if len(parts) == 3 else ""
+
+
+class _ThumbSignals(QObject):
+    done = pyqtSignal(int, object, object)   # note_id, request key, QImage (null on failure)
+
+
+class _ThumbTask(QRunnable):
+    """Load the PNG of the note's current content, or render + store it (worker thread: QImage only)."""
+    def __init__(self, user_id, note_id, key, directory, size, signals: _ThumbSignals):
+        super().__init__()
+        self.user_id, self.note_id, self.key = user_id, note_id, key
+        self.dir, self.size, self.signals = directory, size, signals
+
+    def run(self):
+        img = QImage()
+        row = db.get_note(self.note_id, self.user_id)
+        if row:
+            digest = hashlib.sha1()
+            for col in RENDERED:
+                digest.update((row.get(col) or "").encode("utf-8", "ignore")); digest.update(b"\0")
+            stamp = _stamp(row.get("updated_at"))
+            path = os.path.join(self.dir, f"{self.note_id}-{stamp}-{digest.hexdigest()[:12]}.png")
+            img = QImage(path) if os.path.exists(path) else QImage()
+            if img.isNull():
+                img = self._render(row, path, stamp)
+        try:
+            self.signals.done.emit(self.note_id, self.key, img)
+        except RuntimeError:
+            pass  # service went away
+
+    def _render(self, row, path, stamp):
+        page = next(render_note_pages(row.get("content") or "", decode_overlay(row.get("overlay")), max_pages=1))
+        img = page.scaled(self.size, self.size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        os.makedirs(self.dir, exist_ok=True)
+        img.save(path, "PNG")
+        # drop thumbnails of older versions of this note (a later task may have written a newer one)
+        written = os.path.getmtime(path)
+        for old in glob.glob(os.path.join(self.dir, f"{self.note_id}-*.png")):
+            try:
+                if old != path and (_stamp_of(old), os.path.getmtime(old)) <= (stamp, written):
+                    os.remove(old)
+            except OSError:
+                pass
+        return img
+
+
+class ThumbnailService(QObject):
+    """Per-user thumbnail cache. icon() never blocks; ready(note_id) follows a miss."""
+    ready = pyqtSignal(int)
+
+    def __init__(self, user_id, parent=None, size=THUMB_SIZE):
+        super().__init__(parent)
+        self.user_id = user_id
+        self.size = size
+        self._icons = OrderedDict()   # (note_id, updated_at) -> QIcon
+        self._pending = set()         # (note_id, updated_at, generation) being loaded
+        self._gen = {}                # note_id -> edits seen on the notes bus
+        self._stale = set()           # note ids whose cached icon predates an edit
+        self._dir = os.path.join(THUMB_DIR, str(user_id))
+        self._pool = QThreadPool(self); self._pool.setMaxThreadCount(2)
+        self._signals = _ThumbSignals(self)
+        self._signals.done.connect(self._on_done)
+        notes_bus().changed.connect(self._on_notes_changed)
+
+    def icon(self, note_id, updated_at):
+        """
+        Cached icon for this version of the note, or None (a load/render is
+        queued). A note edited since its icon was made keeps it until the new one is ready.
+        """
+        key = (note_id, str(updated_at), self._gen.get(note_id, 0))
+        ic = self._icons.get(key[:2])
+        if ic is not None:
+            self._icons.move_to_end(key[:2])
+            if note_id not in self._stale:
+                return ic
+        if key not in self._pending:
+            self._pending.add(key)
+            self._pool.start(_ThumbTask(self.user_id, note_id, key, self._dir, self.size, self._signals))
+        return ic
+
+    def _on_done(self, note_id, key, img):
+        self._pending.discard(key)
+        if img.isNull() or key[2] != self._gen.get(note_id, 0):
+            return  # failed, or the note changed again and a newer task is due
+        # older versions of this note are unreachable now
+        for k in [k for k in self._icons if k[0] == note_id]:
+            del self._icons[k]
+        self._icons[key[:2]] = QIcon(QPixmap.fromImage(img))
+        self._stale.discard(note_id)
+        while len(self._icons) > MEMORY_ITEMS:
+            self._icons.popitem(last=False)
+        self.ready.emit(note_id)
+
+    def _on_notes_changed(self, event):
+        """Invalidate icons of edited / deleted notes, even within the same second."""
+        if event.get("kind") != "note" or event.get("user_id") not in (None, self.user_id):
+            return
+        action, fields = event.get("action"), event.get("fields")
+        if action == "delete":
+            for note_id in event.get("ids") or ():
+                for k in [k for k in self._icons if k[0] == note_id]:
+                    del self._icons[k]
+                self._stale.discard(note_id)
+        elif action == "update" and (fields is None or set(fields) & set(RENDERED)):
+            for note_id in event.get("ids") or ():
+                self._gen[note_id] = self._gen.get(note_id, 0) + 1
+                self._stale.add(note_id)
+                self.ready.emit(note_id)   # the view asks again and gets a fresh render
+
+    def clear(self):
+        self._icons.clear()
@@ -0,0 +1,234 @@
+# undo.py
+"""
+Command-based undo/redo for the ink overlay of InkTextEdit.
+
+Each command records only what its operation changed (the strokes that were
+removed/added, the image that moved, ...) instead of snapshotting the whole
+overlay, so an erase on a long note costs memory proportional to the strokes
+it touched.
+"""
+from abc import ABC, abstractmethod
+from collections import deque
+
+# Defaults used when no per-user "undo" prefs exist yet
+DEFAULT_MAX_DEPTH = 100
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# rough per-object costs used for the memory budget
+_POINT_BYTES  = 32
+_STROKE_BYTES = 96
+_IMAGE_BYTES  = 256
+
+
+def _stroke_cost(s) -> int:
+    return _STROKE_BYTES + _POINT_BYTES * len(s.points)
+
+
+def _pixmap_cost(pm) -> int:
+    if pm is None or pm.isNull():
+        return 0
+    return pm.width() * pm.height() * 4
+
+
+class OverlayCommand(ABC):
+    """Base command. Subclasses implement undo()/redo() against the editor."""
+    kind  = "command"
+    _cost = None
+
+    @abstractmethod
+    def undo(self, editor): ...
+
+    @abstractmethod
+    def redo(self, editor): ...
+
+    def cost(self) -> int:
+        """Approximate bytes kept alive by this command (computed once)."""
+        if self._cost is None:
+            self._cost = self._estimate()
+        return self._cost
+
+    def _estimate(self) -> int:
+        return 64
+
+
+# ---- strokes
+class AddStrokeCommand(OverlayCommand):
+    """A new stroke was appended to editor.strokes."""
+    kind = "stroke"
+
+    def __init__(self, stroke):
+        self.stroke = stroke
+
+    def undo(self, editor):
+        strokes = editor.strokes
+        if strokes and strokes[-1] is self.stroke:
+            strokes.pop()
+        else:
+            strokes.remove(self.stroke)
+
+    def redo(self, editor):
+        editor.strokes.append(self.stroke)
+
+    def _estimate(self):
+        return _stroke_cost(self.stroke)
+
+
+class EraseCommand(OverlayCommand):
+    """
+    An erase pass replaced some strokes with (possibly zero) segments.
+    removed: [(index_before, stroke)], added: [(index_after, stroke)], both ascending.
+    """
+    kind = "erase"
+
+    def __init__(self, removed, added):
+        self.removed = list(removed)
+        self.added   = list(added)
+
+    @staticmethod
+    def _swap(strokes, take_out, put_in):
+        for i, _s in reversed(take_out):
+            del strokes[i]
+        for i, s in put_in:
+            strokes.insert(i, s)
+
+    def undo(self, editor):
+        self._swap(editor.strokes, self.added, self.removed)
+
+    def redo(self, editor):
+        self._swap(editor.strokes, self.removed, self.added)
+
+    def _estimate(self):
+        return sum(_stroke_cost(s) for _i, s in self.removed) + \
+               sum(_stroke_cost(s) for _i, s in self.added)
+
+
+# ---- images
+class AddImageCommand(OverlayCommand):
+    """An image dict was appended to editor.images."""
+    kind = "add_image"
+
+    def __init__(self, image):
+        self.image = image
+
+    def undo(self, editor):
+        editor._remove_image(self.image)
+
+    def redo(self, editor):
+        editor.images.append(self.image)
+
+    def _estimate(self):
+        # the pixmaps stay alive while the command can redo them
+        return _IMAGE_BYTES + _pixmap_cost(self.image.get("orig"))
+
+
+class DeleteImageCommand(OverlayCommand):
+    """An image dict was removed from editor.images at index."""
+    kind = "delete_image"
+
+    def __init__(self, index, image):
+        self.index = int(index)
+        self.image = image
+
+    def undo(self, editor):
+        editor.images.insert(min(self.index, len(editor.images)), self.image)
+
+    def redo(self, editor):
+        editor._remove_image(self.image)
+
+    def _estimate(self):
+        return _IMAGE_BYTES + _pixmap_cost(self.image.get("orig"))
+
+
+class ImagePropsCommand(OverlayCommand):
+    """
+    Some keys of one image dict changed (move: pos, resize: scale, crop: pixmaps).
+    Only the changed keys are stored; pixmaps are implicitly shared, not copied.
+    """
+
+    def __init__(self, kind, image, before: dict, after: dict):
+        self.kind   = kind
+        self.image  = image
+        self.before = dict(before)
+        self.after  = dict(after)
+
+    def _apply(self, editor, values):
+        self.image.update(values)
+        if "pm" not in values and ("scale" in values or "angle" in values):
+            editor._compose_pm(self.image)
+
+    def undo(self, editor): self._apply(editor, self.before)
+    def redo(self, editor): self._apply(editor, self.after)
+
+    def _estimate(self):
+        total = _IMAGE_BYTES
+        for values in (self.before, self.after):
+            for v in values.values():
+                if hasattr(v, "isNull") and hasattr(v, "width"):
+                    total += _pixmap_cost(v)
+        return total
+
+
+# ---- history
+class UndoHistory:
+    """
+    Bounded undo/redo stacks of OverlayCommand objects.
+    Oldest undo entries are dropped once max_depth or max_bytes is exceeded.
+    """
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, max_bytes=DEFAULT_MAX_BYTES):
+        self._undo = deque()
+        self._redo = []
+        self._bytes = 0
+        self.max_depth = max(1, int(max_depth))
+        self.max_bytes = max(0, int(max_bytes))
+
+    def __len__(self): return len(self._undo)
+
+    @property
+    def bytes_used(self) -> int: return self._bytes
+
+    def can_undo(self) -> bool: return bool(self._undo)
+    def can_redo(self) -> bool: return bool(self._redo)
+
+    def set_limits(self, max_depth=None, max_bytes=None):
+        """Change the bounds and trim right away."""
+        if max_depth is not None: self.max_depth = max(1, int(max_depth))
+        if max_bytes is not None: self.max_bytes = max(0, int(max_bytes))
+        self._trim()
+
+    def push(self, cmd: OverlayCommand):
+        """Record an already-applied command; clears the redo stack."""
+        self.clear_redo()
+        self._undo.append(cmd)
+        self._bytes += cmd.cost()
+        self._trim()
+
+    def pop_undo(self):
+        """Take the newest command for undo (moved to the redo stack)."""
+        if not self._undo: return None
+        cmd = self._undo.pop()
+        self._redo.append(cmd)
+        return cmd
+
+    def pop_redo(self):
+        """Take the newest undone command for redo (moved back to the undo stack)."""
+        if not self._redo: return None
+        cmd = self._redo.pop()
+        self._undo.append(cmd)
+        self._trim()
+        return cmd
+
+    def clear_redo(self):
+        for cmd in self._redo:
+            self._bytes -= cmd.cost()
+        self._redo.clear()
+
+    def clear(self):
+        self._undo.clear(); self._redo.clear(); self._bytes = 0
+
+    def _trim(self):
+        """Drop oldest undo entries until within bounds (newest entry is always kept)."""
+        while len(self._undo) > 1 and (
+            len(self._undo) > self.max_depth or
+            (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            self._bytes -= self._undo.popleft().cost()
@@ -0,0 +1,125 @@
+# page_registry.py
+"""
+Feature pages of the main window, imported and constructed on first use.
+
+main.py registers each page by module, class name and a build function.
+Nothing of a feature is imported until its page is first asked for, so the
+login screen only pays for itself. After login, warm_up() imports the
+registered modules on a worker thread, then builds the chosen pages one per
+event-loop turn, so the first click on a feature does not wait either.
+
+Every import and construction is timed. startup_report() lists the timings,
+and `python main.py --startup-report` prints them on exit.
+"""
+import importlib
+import sys
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+_TIMINGS = []   # (label, milliseconds), in the order they happened
+
+
+def record_timing(label, ms):
+    _TIMINGS.append((label, ms))
+
+
+def startup_report():
+    if not _TIMINGS:
+        return "No startup timings recorded."
+    width = max(len(label) for label, _ms in _TIMINGS)
+    return "\n".join(f"{label:<{width}}  {ms:8.1f} ms" for label, ms in _TIMINGS)
+
+
+def _import(module):
+    """
+    Import module; the first import of it is timed. Always goes through
+    import_module, which waits while another thread is still importing it.
+    """
+    fresh = module not in sys.modules
+    start = time.perf_counter()
+    mod = importlib.import_module(module)
+    if fresh:
+        record_timing(f"import {module}", (time.perf_counter() - start) * 1000)
+    return mod
+
+
+class PageRegistry(QObject):
+    """Named pages of a QStackedWidget, created by get() on first use."""
+    # warm-up thread finished importing (generation it was started for)
+    _imports_done = pyqtSignal(int)
+
+    def __init__(self, stack, parent=None):
+        super().__init__(parent)
+        self.stack = stack
+        self._specs = {}        # name -> (module, class name, build(cls) -> widget, per_user)
+        self._pages = {}        # name -> widget
+        self._warm_queue = []   # page names still to build after the warm-up imports
+        self._generation = 0    # bumped by drop_user_pages: stale warm-ups do nothing
+        self._imports_done.connect(self._start_building)
+
+    def register(self, name, module, class_name, build, per_user=True):
+        """build(cls) returns the page. per_user pages are dropped at logout."""
+        self._specs[name] = (module, class_name, build, per_user)
+
+    def get(self, name):
+        """The page, imported / constructed and added to the stack the first time."""
+        page = self._pages.get(name)
+        if page is None:
+            module, class_name, build, _per_user = self._specs[name]
+            cls = getattr(_import(module), class_name)
+            start = time.perf_counter()
+            page = build(cls)
+            record_timing(f"build {name}", (time.perf_counter() - start) * 1000)
+            self.stack.addWidget(page)
+            self._pages[name] = page
+        return page
+
+    def peek(self, name):
+        """The page if it was built already, else None (never builds)."""
+        return self._pages.get(name)
+
+    def drop_user_pages(self):
+        """Remove and delete the per-user pages (logout); they are rebuilt for the next user."""
+        self._generation += 1
+        self._warm_queue.clear()
+        for name in [n for n in self._pages if self._specs[n][3]]:
+            page = self._pages.pop(name)
+            if self.stack.indexOf(page) != -1:
+                self.stack.removeWidget(page)
+            page.deleteLater()
+
+    def warm_up(self, build=()):
+        """
+        Import every registered module on a worker thread, then build the
+        pages named in build one at a time on the GUI thread.
+        """
+        modules = list(dict.fromkeys(spec[0] for spec in self._specs.values()))
+        self._warm_queue = [n for n in build if n not in self._pages]
+        generation = self._generation
+
+        def run():
+            start = time.perf_counter()
+            for module in modules:
+                try:
+                    _import(module)
+                except Exception as e:   # the page's own get() will raise it properly
+                    print(f"Warm-up import of {module} failed: {e}")
+            record_timing("warm-up imports (background)", (time.perf_counter() - start) * 1000)
+            try:
+                self._imports_done.emit(generation)
+            except RuntimeError:
+                pass  # registry went away
+
+        threading.Thread(target=run, name="page-warmup", daemon=True).start()
+
+    def _start_building(self, generation):
+        if generation == self._generation:
+            QTimer.singleShot(0, self._build_next)
+
+    def _build_next(self):
+        if self._warm_queue:
+            self.get(self._warm_queue.pop(0))
+        if self._warm_queue:
+            QTimer.singleShot(0, self._build_next)
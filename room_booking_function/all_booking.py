@@ -63,7 +63,7 @@ class AllBookingsPage(QWidget):
         if not bookings:
             no_bookings_label = QLabel("You don't have any bookings yet.")
             no_bookings_label.setAlignment(Qt.AlignCenter)
-            no_bookings_label.setStyleSheet("font-size: 16px; color: #666; padding: 50px;")
+            no_bookings_label.setObjectName("noBookingsLabel")
             self.bookings_layout.addWidget(no_bookings_label)
             return
         
@@ -76,30 +76,6 @@ class AllBookingsPage(QWidget):
             # Create booking card
             booking_card = QFrame()
             booking_card.setObjectName("bookingCard")
-            booking_card.setStyleSheet("""
-                QFrame#bookingCard {
-                    background: #ffffff;
-                    border: 1px solid #e0e0e0;
-                    border-radius: 8px;
-                    padding: 15px;
-                }
-                QLabel {
-                    font-size: 14px;
-                    color: #333333;
-                }
-                QLabel#statusBooked {
-                    color: #28a745;
-                    font-weight: bold;
-                }
-                QLabel#statusCancelled {
-                    color: #dc3545;
-                    font-weight: bold;
-                }
-                QLabel#statusCompleted {
-                    color: #6c757d;
-                    font-weight: bold;
-                }
-            """)
             
             card_layout = QVBoxLayout(booking_card)
             
@@ -110,10 +86,10 @@ class AllBookingsPage(QWidget):
             info_layout = QVBoxLayout()
             
             room_label = QLabel(f"Room: {room_name}")
-            room_label.setStyleSheet("font-weight: bold; font-size: 16px;")
+            room_label.setObjectName("cardRoom")
             
             location_label = QLabel(f"Location: {location_name}")
-            location_label.setStyleSheet("font-size: 14px; color: #555;")
+            location_label.setObjectName("cardLocation")
             
             date_label = QLabel(f"Date: {date}")
             time_label = QLabel(f"Time: {start_time} - {end_time}")
@@ -142,29 +118,12 @@ class AllBookingsPage(QWidget):
             if status == "booked" and is_creator:
                 cancel_btn = QPushButton("Cancel Booking")
                 cancel_btn.setObjectName("cancelButton")
-                cancel_btn.setStyleSheet("""
-                    QPushButton#cancelButton {
-                        background-color: #dc3545;
-                        color: white;
-                        border: none;
-                        border-radius: 6px;
-                        padding: 8px 16px;
-                        font-weight: bold;
-                        min-width: 100px;
-                    }
-                    QPushButton#cancelButton:hover {
-                        background-color: #c82333;
-                    }
-                    QPushButton#cancelButton:pressed {
-                        background-color: #bd2130;
-                    }
-                """)
                 cancel_btn.clicked.connect(lambda checked, bid=booking_id: self.cancel_booking(bid))
                 button_layout.addWidget(cancel_btn)
             elif status == "booked":
                 # User is participant but not creator - show info text
                 participant_label = QLabel("(Participant)")
-                participant_label.setStyleSheet("color: #6c757d; font-style: italic;")
+                participant_label.setObjectName("cardParticipant")
                 button_layout.addWidget(participant_label)
             
             details_layout.addLayout(info_layout, 3)
@@ -176,11 +135,11 @@ class AllBookingsPage(QWidget):
             separator = QFrame()
             separator.setFrameShape(QFrame.HLine)
             separator.setFrameShadow(QFrame.Sunken)
-            separator.setStyleSheet("background-color: #e0e0e0; margin: 8px 0;")
+            separator.setObjectName("cardSeparator")
             card_layout.addWidget(separator)
             
             students_label = QLabel("Students in this booking:")
-            students_label.setStyleSheet("font-weight: bold; font-size: 14px; color: #555;")
+            students_label.setObjectName("cardStudentsTitle")
             card_layout.addWidget(students_label)
             
             # List all students
@@ -188,10 +147,11 @@ class AllBookingsPage(QWidget):
                 # Highlight current user
                 if student_id == current_user_id:
                     student_info = QLabel(f"• {student_name} ({student_id}) - You")
-                    student_info.setStyleSheet("font-size: 13px; color: #283593; font-weight: bold; margin-left: 10px;")
+                    student_info.setObjectName("cardStudent")
+                    student_info.setProperty("currentUser", True)
                 else:
                     student_info = QLabel(f"• {student_name} ({student_id})")
-                    student_info.setStyleSheet("font-size: 13px; color: #666; margin-left: 10px;")
+                    student_info.setObjectName("cardStudent")
                 card_layout.addWidget(student_info)
             
             self.bookings_layout.addWidget(booking_card)
@@ -1,6 +1,6 @@
 from PyQt5.QtWidgets import QPushButton, QWidget, QVBoxLayout, QLabel
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
+from styles import asset_cache as assets
 
 class FeatureButton(QPushButton): 
     def __init__(self, icon_path, text, parent=None, size_type="main"):
@@ -31,7 +31,7 @@ class FeatureButton(QPushButton):
         # Icon setup
         icon_label = QLabel()
         icon_label.setObjectName("iconLabel")
-        icon_pixmap = QPixmap(icon_path).scaled(icon_size, icon_size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        icon_pixmap = assets.pixmap(icon_path, icon_size)
         icon_label.setPixmap(icon_pixmap)
         icon_label.setAlignment(Qt.AlignCenter)
 
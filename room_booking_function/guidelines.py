@@ -92,14 +92,6 @@ class GuidelinesPage(QWidget):
         for section in guidelines:
             section_frame = QFrame()
             section_frame.setObjectName("guidelineSection")
-            section_frame.setStyleSheet("""
-                QFrame#guidelineSection {
-                    background-color: #f8f9fa;
-                    border: 1px solid #e9ecef;
-                    border-radius: 10px;
-                    padding: 15px;
-                }
-            """)
             
             section_layout = QVBoxLayout(section_frame)
             section_layout.setSpacing(10)
@@ -107,28 +99,12 @@ class GuidelinesPage(QWidget):
             # Section title
             title_label = QLabel(section["title"])
             title_label.setObjectName("guidelineTitle")
-            title_label.setStyleSheet("""
-                QLabel#guidelineTitle {
-                    font-size: 16px;
-                    font-weight: bold;
-                    color: #283593;
-                    padding-bottom: 5px;
-                }
-            """)
             section_layout.addWidget(title_label)
             
             # Section content
             for point in section["content"]:
                 point_label = QLabel(point)
                 point_label.setObjectName("guidelinePoint")
-                point_label.setStyleSheet("""
-                    QLabel#guidelinePoint {
-                        font-size: 14px;
-                        color: #495057;
-                        padding-left: 10px;
-                        margin: 2px;
-                    }
-                """)
                 point_label.setWordWrap(True)
                 section_layout.addWidget(point_label)
             
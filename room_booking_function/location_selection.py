@@ -1,9 +1,9 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton, 
                             QScrollArea, QFrame)
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon
 import sqlite3
-from styles.booking_styles import get_booking_styles
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
 from database.db_manager import get_locations
 
 class LocationSelectionWidget(QWidget):
@@ -12,7 +12,7 @@ class LocationSelectionWidget(QWidget):
         self.main_window = main_window
         
         # Apply the booking styles to this widget
-        self.setStyleSheet(get_booking_styles())
+        apply_scope(self, "booking")
         
         # Main layout with proper spacing
         main_layout = QVBoxLayout(self)
@@ -41,7 +41,7 @@ class LocationSelectionWidget(QWidget):
         # Container for location buttons
         locations_container = QWidget()
         locations_layout = QVBoxLayout(locations_container)
-        locations_container.setStyleSheet("background-color: #f5f7fa;")
+        locations_container.setObjectName("locationsContainer")
         locations_layout.setSpacing(15)
         locations_layout.setContentsMargins(10, 10, 10, 10)
         
@@ -57,7 +57,7 @@ class LocationSelectionWidget(QWidget):
         
         # Back button with enhanced styling
         back_btn = QPushButton()
-        back_btn.setIcon(QIcon("Photo/back.png"))
+        back_btn.setIcon(assets.icon("Photo/back.png"))
         back_btn.setText(" Back to Home")
         back_btn.setFixedSize(750, 40)
         back_btn.setCursor(Qt.PointingHandCursor)
@@ -77,23 +77,7 @@ class LocationSelectionWidget(QWidget):
     def create_location_button(self, loc_id, loc_name):
         """Create a location button with consistent styling"""
         btn = QPushButton(loc_name)
-        btn.setStyleSheet("""
-        QPushButton {
-            background-color: white;
-            color: #283593;
-            border: 2px solid #283593;
-            border-radius: 8px;
-            padding: 15px;
-            font-size: 20px;
-            font-weight: 500;
-            min-width: 250px;
-            margin: 5px;
-        }
-        QPushButton:hover {
-            background-color: #E8EAF6;
-            border: 2px solid #1A237E;
-        }
-        """)
+        btn.setObjectName("locationButton")
         btn.setCursor(Qt.PointingHandCursor)
         btn.clicked.connect(lambda: self.go_to_booking(loc_id))
         return btn
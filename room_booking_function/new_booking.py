@@ -8,12 +8,13 @@ import sqlite3
 from database.db_manager import (get_features, find_best_available_room, 
                                 check_student_exists, create_booking_with_students,
                                 get_student_name)
-from styles.booking_styles import get_booking_styles
+from styles.style_registry import apply_scope
 from room_booking_function.studentInfo import StudentInfoPage
 
 class NewBookingPage(QWidget):
     def __init__(self, main_window, location_id, location_name, user_id):
         super().__init__()
+        apply_scope(self, "booking")
         self.main_window = main_window
         self.location_id = location_id
         self.location_name = location_name
@@ -87,13 +88,6 @@ class NewBookingPage(QWidget):
         # Store student input fields
         self.student_inputs = []
         
-        # Apply styles
-        self.apply_styles()
-        
-    def apply_styles(self):
-        """Apply the CSS styles to all widgets"""
-        self.setStyleSheet(get_booking_styles())
-        
     def setup_time_constraints(self):
         """Set time constraints for booking"""
         # Set time limits (8 AM to 6 PM)
@@ -1,8 +1,9 @@
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QGridLayout, QPushButton,
                             QStackedWidget, QLabel)
 from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QPixmap
-from styles.booking_styles import get_booking_styles
+from PyQt5.QtGui import QPixmap
+from styles.style_registry import apply_scope
+from styles import asset_cache as assets
 from database.db_manager import get_location_name
 from .feature_button import FeatureButton
 from .new_booking import NewBookingPage
@@ -24,7 +25,7 @@ class RoomBookingWidget(QWidget):
         self.current_user_id = user_id
         
         # Apply styles
-        self.setStyleSheet(get_booking_styles())
+        apply_scope(self, "booking")
         
         # Main layout and stacked widget for different views
         self.main_layout = QVBoxLayout(self)
@@ -91,7 +92,7 @@ class RoomBookingWidget(QWidget):
     def setup_back_button(self):
         """Back button shown on all pages"""
         self.back_btn = QPushButton()
-        self.back_btn.setIcon(QIcon("Photo/back.png"))
+        self.back_btn.setIcon(assets.icon("Photo/back.png"))
         self.back_btn.setText(" Back")
         self.back_btn.setFixedSize(750, 40)
         self.back_btn.setCursor(Qt.PointingHandCursor)
@@ -2,6 +2,7 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QLineEdit, QPushButton, QFrame, QSizePolicy, QScrollArea)
 from PyQt5.QtCore import Qt
 from database.db_manager import get_student_name
+from styles.style_registry import apply_scope
 
 class StudentInfoPage(QWidget):
     def __init__(self, main_window, student_inputs):
@@ -10,12 +11,12 @@ class StudentInfoPage(QWidget):
         student_inputs: list of tuples (id_input, name_input) from booking page
         """
         super().__init__()
+        apply_scope(self, "booking")
         self.main_window = main_window
         self.original_student_inputs = student_inputs
         self.student_widgets = []
 
         self.studentInfo()
-        self.apply_styles()
 
     def studentInfo(self):
         layout = QVBoxLayout(self)
@@ -134,9 +135,4 @@ class StudentInfoPage(QWidget):
     def go_back(self):
         """Return to the new booking page"""
         # Navigate back to the booking page in the RoomBookingWidget
-        self.main_window.pages.setCurrentWidget(self.main_window.new_booking_page)
-
-    def apply_styles(self):
-        """Apply the same CSS style as booking page"""
-        from styles.booking_styles import get_booking_styles
-        self.setStyleSheet(get_booking_styles())
\ No newline at end of file
+        self.main_window.pages.setCurrentWidget(self.main_window.new_booking_page)
\ No newline at end of file
@@ -6,11 +6,12 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtGui import QColor
 from database.db_manager import get_rooms_by_location, get_bookings_for_timetable, get_features
-from styles.timetable_styles import get_timetable_styles
+from styles.style_registry import apply_scope
 
 class TimetablePage(QWidget):
     def __init__(self, main_window):
         super().__init__()
+        apply_scope(self, "timetable")
         self.main_window = main_window
         self.location_id = main_window.location_id
         self.location_name = main_window.location_name
@@ -19,7 +20,6 @@ class TimetablePage(QWidget):
 
         # Setup UI
         self.timetable()
-        self.setStyleSheet(get_timetable_styles())
         QToolTip.setFont(self.font())
 
     def timetable(self):
@@ -0,0 +1,161 @@
+# asset_cache.py
+"""
+Process-wide cache for decoded icons and pixmaps.
+
+Entries are keyed by (path, size, tint, dpr) so every page and every note tab
+shares a single disk decode and a single scale per distinct request. Painted
+helper icons (color badges, size dots, ...) go through rendered_pixmap /
+rendered_icon with a caller-chosen key.
+
+QPixmap/QIcon are GUI-thread objects: only call this from the GUI thread.
+"""
+import os
+from collections import OrderedDict
+
+from PyQt5.QtCore import Qt, QSize
+from PyQt5.QtGui import QPixmap, QIcon, QPainter, QColor
+
+# every cache is an LRU: sizes, tints and painted entries depend on user
+# settings and DPI, so the number of distinct keys is open-ended
+MAX_PIXMAPS  = 512
+MAX_ICONS    = 512
+MAX_RENDERED = 256
+
+_pixmaps  = OrderedDict()   # (path, w, h, tint, dpr, mode) -> QPixmap (LRU)
+_icons    = OrderedDict()   # (path, w, h, tint) -> QIcon (LRU)
+_rendered = OrderedDict()   # caller key -> QPixmap / QIcon (LRU)
+_stats    = {"hits": 0, "misses": 0}
+
+
+def _lru_get(cache, key):
+    val = cache.get(key)
+    if val is not None:
+        cache.move_to_end(key)
+        _stats["hits"] += 1
+    else:
+        _stats["misses"] += 1
+    return val
+
+
+def _lru_put(cache, key, val, limit):
+    cache[key] = val
+    while len(cache) > limit:
+        cache.popitem(last=False)
+    return val
+
+
+def _norm_path(path) -> str:
+    return os.path.abspath(path) if path else ""
+
+
+def _norm_size(size):
+    if size is None:
+        return (0, 0)
+    if isinstance(size, QSize):
+        return (max(0, size.width()), max(0, size.height()))
+    if isinstance(size, (tuple, list)):
+        return (max(0, int(size[0])), max(0, int(size[1])))
+    n = max(0, int(size))
+    return (n, n)
+
+
+def _norm_tint(tint):
+    if tint is None:
+        return None
+    c = QColor(tint)
+    return c.name(QColor.HexArgb) if c.isValid() else None
+
+
+def _tinted(pm: QPixmap, color: str) -> QPixmap:
+    """Recolor the opaque pixels of pm with color (keeps alpha)."""
+    out = QPixmap(pm.size())
+    out.setDevicePixelRatio(pm.devicePixelRatio())
+    out.fill(Qt.transparent)
+    p = QPainter(out)
+    p.drawPixmap(0, 0, pm)
+    p.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    p.fillRect(out.rect(), QColor(color))
+    p.end()
+    return out
+
+
+# ---- file assets
+def pixmap(path, size=None, tint=None, dpr=1.0, mode=Qt.KeepAspectRatio) -> QPixmap:
+    """
+    Return the asset at path, optionally scaled to size (int or QSize, in
+    device pixels), tinted and tagged with a device pixel ratio.
+    Missing files give a null QPixmap (also cached).
+    """
+    path = _norm_path(path)
+    w, h = _norm_size(size)
+    tint = _norm_tint(tint)
+    dpr = float(dpr or 1.0)
+    key = (path, w, h, tint, dpr, int(mode))
+    pm = _lru_get(_pixmaps, key)
+    if pm is not None:
+        return pm
+
+    if w or h or tint or dpr != 1.0:
+        # build from the cached full-size decode
+        pm = pixmap(path)
+        if not pm.isNull():
+            if w and h:
+                pm = pm.scaled(w, h, mode, Qt.SmoothTransformation)
+            if tint:
+                pm = _tinted(pm, tint)
+            if dpr != 1.0:
+                pm = QPixmap(pm)
+                pm.setDevicePixelRatio(dpr)
+    else:
+        pm = QPixmap(path) if path and os.path.exists(path) else QPixmap()
+    return _lru_put(_pixmaps, key, pm, MAX_PIXMAPS)
+
+
+def icon(path, size=None, tint=None) -> QIcon:
+    """QIcon for path; with size/tint the icon wraps the cached scaled pixmap."""
+    path = _norm_path(path)
+    w, h = _norm_size(size)
+    tint = _norm_tint(tint)
+    key = (path, w, h, tint)
+    ic = _lru_get(_icons, key)
+    if ic is not None:
+        return ic
+    if not w and not h and not tint:
+        ic = QIcon(pixmap(path)) if path and os.path.exists(path) else QIcon()
+    else:
+        pm = pixmap(path, (w, h) if (w and h) else None, tint)
+        ic = QIcon(pm) if not pm.isNull() else QIcon()
+    return _lru_put(_icons, key, ic, MAX_ICONS)
+
+
+# ---- painted assets
+def _cached_render(key, factory):
+    val = _lru_get(_rendered, key)
+    if val is not None:
+        return val
+    return _lru_put(_rendered, key, factory(), MAX_RENDERED)
+
+
+def rendered_pixmap(key, factory) -> QPixmap:
+    """Return the pixmap cached under key, calling factory() once to paint it."""
+    return _cached_render(("pm",) + tuple(key), factory)
+
+
+def rendered_icon(key, factory) -> QIcon:
+    """Return the icon cached under key, calling factory() once to build it."""
+    return _cached_render(("icon",) + tuple(key), factory)
+
+
+# ---- housekeeping
+def clear():
+    """Drop every cached entry (e.g. after assets change on disk)."""
+    _pixmaps.clear(); _icons.clear(); _rendered.clear()
+    _stats["hits"] = _stats["misses"] = 0
+
+
+def stats() -> dict:
+    """Counters for debugging/benchmarks."""
+    return {
+        "pixmaps": len(_pixmaps), "icons": len(_icons), "rendered": len(_rendered),
+        "hits": _stats["hits"], "misses": _stats["misses"],
+    }
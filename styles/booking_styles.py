@@ -372,4 +372,147 @@ def get_booking_styles():
     QPushButton#cancelButton:pressed {
         background-color: #495057;
     }
+
+    /* ===========================
+       Location Selection
+       =========================== */
+
+    QWidget#locationsContainer {
+        background-color: #f5f7fa;
+    }
+
+    QPushButton#locationButton {
+        background-color: white;
+        color: #283593;
+        border: 2px solid #283593;
+        border-radius: 8px;
+        padding: 15px;
+        font-size: 20px;
+        font-weight: 500;
+        min-width: 250px;
+        margin: 5px;
+    }
+
+    QPushButton#locationButton:hover {
+        background-color: #E8EAF6;
+        border: 2px solid #1A237E;
+    }
+    """
+
+
+def get_booking_card_styles():
+    # Booking cards of My Bookings and All Bookings (not scoped: both pages use them)
+    return """
+    QFrame#bookingCard {
+        background: #ffffff;
+        border: 1px solid #e0e0e0;
+        border-radius: 8px;
+        padding: 15px;
+    }
+
+    QFrame#bookingCard QLabel {
+        font-size: 14px;
+        color: #333333;
+    }
+
+    QFrame#bookingCard QLabel#statusBooked {
+        color: #28a745;
+        font-weight: bold;
+    }
+
+    QFrame#bookingCard QLabel#statusCancelled {
+        color: #dc3545;
+        font-weight: bold;
+    }
+
+    QFrame#bookingCard QLabel#statusCompleted {
+        color: #6c757d;
+        font-weight: bold;
+    }
+
+    QFrame#bookingCard QLabel#cardRoom {
+        font-weight: bold;
+        font-size: 16px;
+    }
+
+    QFrame#bookingCard QLabel#cardLocation {
+        font-size: 14px;
+        color: #555;
+    }
+
+    QFrame#bookingCard QLabel#cardParticipant {
+        color: #6c757d;
+        font-style: italic;
+    }
+
+    QFrame#bookingCard QFrame#cardSeparator {
+        background-color: #e0e0e0;
+        margin: 8px 0;
+    }
+
+    QFrame#bookingCard QLabel#cardStudentsTitle {
+        font-weight: bold;
+        font-size: 14px;
+        color: #555;
+    }
+
+    QFrame#bookingCard QLabel#cardStudent {
+        font-size: 13px;
+        color: #666;
+        margin-left: 10px;
+    }
+
+    QFrame#bookingCard QLabel#cardStudent[currentUser="true"] {
+        color: #283593;
+        font-weight: bold;
+    }
+
+    QFrame#bookingCard QPushButton#cancelButton {
+        background-color: #dc3545;
+        color: white;
+        border: none;
+        border-radius: 6px;
+        padding: 8px 16px;
+        font-weight: bold;
+        min-width: 100px;
+    }
+
+    QFrame#bookingCard QPushButton#cancelButton:hover {
+        background-color: #c82333;
+    }
+
+    QFrame#bookingCard QPushButton#cancelButton:pressed {
+        background-color: #bd2130;
+    }
+
+    QLabel#noBookingsLabel {
+        font-size: 16px;
+        color: #666;
+        padding: 50px;
+    }
+    """
+
+
+def get_guidelines_styles():
+    return """
+    QFrame#guidelineSection {
+        background-color: #f8f9fa;
+        border: 1px solid #e9ecef;
+        border-radius: 10px;
+        padding: 15px;
+    }
+
+    QLabel#guidelineTitle {
+        font-size: 16px;
+        font-weight: bold;
+        color: #283593;
+        padding-bottom: 5px;
+    }
+
+    QLabel#guidelinePoint {
+        font-size: 14px;
+        color: #495057;
+        padding-left: 10px;
+        margin: 2px;
+    }
     """
\ No newline at end of file
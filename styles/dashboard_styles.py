@@ -131,15 +131,15 @@ def get_dashboard_styles():
         color:#0b1f5e;
     }
 
-    QTableWidget#notesTable {
+    QTableView#notesTable {
         background:#fff;
         border:2px solid #1e3a8a;
         border-radius:10px;
         gridline-color:#e2e8f0;
         alternate-background-color:#f7fafc;
     }
-    QTableWidget#notesTable QHeaderView { background: transparent; }
-    QTableWidget#notesTable QHeaderView::section {
+    QTableView#notesTable QHeaderView { background: transparent; }
+    QTableView#notesTable QHeaderView::section {
         background:#eef2ff;
         padding:6px 8px;
         margin-top: 2px;
@@ -150,9 +150,9 @@ def get_dashboard_styles():
         color:#0b1f5e;
         min-height:28px;
     }
-    QTableWidget#notesTable QHeaderView::section:horizontal:first { margin-left:2px; }
-    QTableWidget#notesTable QHeaderView::section:horizontal:last  { margin-right:2px; border-right:none; }
-    QTableWidget#notesTable QTableCornerButton::section {
+    QTableView#notesTable QHeaderView::section:horizontal:first { margin-left:2px; }
+    QTableView#notesTable QHeaderView::section:horizontal:last  { margin-right:2px; border-right:none; }
+    QTableView#notesTable QTableCornerButton::section {
         background:#eef2ff;
         border:none;
         border-top-left-radius:10px;
@@ -162,25 +162,15 @@ def get_dashboard_styles():
     QTableView::item:hover { background:#e9eef7; }
     QTableView::item:selected { background:#e9eef7; color:#0b1f5e; }
 
-    QToolButton#rowActionsBtn {
-        border:none;
-        background:transparent;
-        min-width:20px;
-        min-height:20px;
-        padding:0;
-        margin:0;
-    }
-    QToolButton#rowActionsBtn:hover { background:#eef2ff; border-radius:4px; }
-
-    QListWidget#gridView {
+    QListView#gridView {
         border:2px solid #1e3a8a;
         border-radius:10px;
         background:#ffffff;
         padding:8px;
     }
-    QListWidget#gridView::item { margin:8px; padding:8px; border-radius:10px; }
-    QListWidget#gridView::item:hover   { background:#f6f8ff; }
-    QListWidget#gridView::item:selected{ background:#e9eef7; color:#0b1f5e; }
+    QListView#gridView::item { margin:8px; padding:8px; border-radius:10px; }
+    QListView#gridView::item:hover   { background:#f6f8ff; }
+    QListView#gridView::item:selected{ background:#e9eef7; color:#0b1f5e; }
 
     QLabel#emptyLabel { color:#64748b; padding:10px; }
 
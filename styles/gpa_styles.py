@@ -271,6 +271,10 @@ def gpa_styles():
             margin: 5px 0;
         }
 
+        QFrame#resultItemSeparator {
+            background-color: #eee;
+        }
+
         /* Scroll Area */
         QScrollArea {
             background-color: transparent;
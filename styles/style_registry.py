@@ -0,0 +1,262 @@
+# style_registry.py
+"""
+One application-wide style sheet, built once and set on the QApplication.
+
+Each feature used to call setStyleSheet(get_*_styles()) on every page it
+built, so Qt parsed a fresh copy of the feature sheet per page and polished
+the page against it. Here every feature sheet is registered under a scope
+and its selectors are rewritten to match only inside a widget that carries
+the dynamic property styleScope=<scope>:
+
+    QLabel#resultValue   ->  QLabel#resultValue[styleScope="gpa"],
+                             *[styleScope="gpa"] QLabel#resultValue
+
+The first form is the scoped widget itself (for a selector of several parts
+its first part), the second anything inside it. Pages call
+apply_scope(self, "gpa") right after super().__init__() instead of setting a
+sheet. app_stylesheet() joins the global sheet, the unscoped component
+sheets (booking cards, guideline sections, matched by objectName) and the
+scoped sheets, outer pages before the pages nested in them, so on equal
+specificity the inner page wins as its own sheet used to. The result is
+cached; main.py sets it once.
+
+    python -m styles.style_registry --benchmark [--rounds N] [--runs N] [--db path]
+
+builds the main window and its pages with per-page sheets (the old way) and
+with the application sheet, and prints the construction times. Logging in
+writes to the database, so without --db it works on a temporary copy of the
+app's database.
+"""
+import argparse
+import contextlib
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from styles.styles import load_stylesheet
+from styles.login_styles import get_login_styles
+from styles.booking_styles import get_booking_styles, get_booking_card_styles, get_guidelines_styles
+from styles.timetable_styles import get_timetable_styles
+from styles.gpa_styles import gpa_styles
+from styles.dashboard_styles import get_dashboard_styles
+from styles.notes_organizer_styles import get_notes_organizer_styles
+from page_registry import record_timing
+
+SCOPE_PROPERTY = "styleScope"
+
+# unscoped sheets, in order
+COMPONENTS = (load_stylesheet, get_booking_card_styles, get_guidelines_styles)
+
+# scope -> feature sheet; the timetable sits inside the booking pages, so it comes after them
+SCOPES = {
+    "login":     get_login_styles,
+    "booking":   get_booking_styles,
+    "timetable": get_timetable_styles,
+    "gpa":       gpa_styles,
+    "dashboard": get_dashboard_styles,
+    "notes":     get_notes_organizer_styles,
+}
+
+_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+_RULE    = re.compile(r"([^{}]+)\{([^{}]*)\}")
+
+_cache = {}           # "app" / "legacy" -> built application sheet
+_per_widget = False   # benchmark only: set the scope sheets on the pages as before
+
+
+def _scope_selector(selector, scope):
+    """The two scoped forms of one selector (see the module docstring)."""
+    attr = f'[{SCOPE_PROPERTY}="{scope}"]'
+    # end of the first compound selector, or its first pseudo state / sub-control
+    depth, cut = 0, len(selector)
+    for i, ch in enumerate(selector):
+        if ch == "[":
+            depth += 1
+        elif ch == "]":
+            depth -= 1
+        elif depth == 0 and ch in " >:":
+            cut = i
+            break
+    return f"{selector[:cut]}{attr}{selector[cut:]}", f"*{attr} {selector}"
+
+
+def scoped_sheet(sheet, scope):
+    """sheet with every selector limited to widgets with styleScope=scope and their children."""
+    rules = []
+    for match in _RULE.finditer(_COMMENT.sub("", sheet)):
+        selectors = [" ".join(s.split()) for s in match.group(1).split(",") if s.strip()]
+        scoped = [form for s in selectors for form in _scope_selector(s, scope)]
+        body = " ".join(line.strip() for line in match.group(2).strip().splitlines())
+        rules.append(f"{', '.join(scoped)} {{ {body} }}")
+    return "\n".join(rules)
+
+
+def app_stylesheet():
+    """The application sheet: global, component and scoped feature sheets (built once)."""
+    key = "legacy" if _per_widget else "app"
+    if key not in _cache:
+        start = time.perf_counter()
+        parts = [sheet() for sheet in COMPONENTS]
+        if not _per_widget:
+            parts += [scoped_sheet(sheet(), scope) for scope, sheet in SCOPES.items()]
+        _cache[key] = "\n".join(parts)
+        record_timing(f"build stylesheet ({key})", (time.perf_counter() - start) * 1000)
+    return _cache[key]
+
+
+def apply_scope(widget, scope):
+    """
+    Style widget and its children with the feature sheet of scope. Call it
+    before the widget's children are created or shown.
+    """
+    if scope not in SCOPES:
+        raise KeyError(f"Unknown style scope: {scope}")
+    widget.setProperty(SCOPE_PROPERTY, scope)
+    if _per_widget:
+        widget.setStyleSheet(SCOPES[scope]())
+
+
+def use_per_widget_sheets(app, enabled):
+    """Benchmark switch: per-page sheets (the old way) or the application sheet."""
+    global _per_widget
+    _per_widget = enabled
+    app.setStyleSheet(app_stylesheet())
+
+
+# ----- benchmark -----
+def _sample_user():
+    """(student_id, name, location_id) to build the pages for: the user with the most bookings"""
+    from database import db_manager as db
+    conn = db.get_connection()
+    try:
+        student = conn.execute("""
+            SELECT u.student_id, u.name FROM users u
+            LEFT JOIN booking_students bs ON bs.student_id = u.student_id
+            GROUP BY u.student_id ORDER BY COUNT(bs.student_id) DESC, u.student_id LIMIT 1
+        """).fetchone()
+        location = conn.execute("SELECT id FROM locations ORDER BY id LIMIT 1").fetchone()
+    finally:
+        conn.close()
+    if student is None or location is None:
+        raise SystemExit("The database needs at least one user and one location.")
+    return student[0], student[1], location[0]
+
+
+def _build_and_show(app, student_id, name, location_id):
+    """Build the main window, log in and show every page once; returns the CPU ms taken."""
+    import main
+    from PyQt5.QtWidgets import QStackedWidget
+    from room_booking_function.room_booking_widget import RoomBookingWidget
+    from gpa_calculator_function.gpaCalculator import GPACalculatorPage
+
+    start = time.process_time()   # CPU time: steadier than wall time on a busy machine
+    w = main.MainWindow()
+    w.show()
+    w.handle_login_success(student_id, name)
+    for page in ("guidelines", "all_bookings", "location_selection", "gpa", "dashboard", "notes"):
+        w.registry.get(page)
+    w.pages.addWidget(RoomBookingWidget(w, location_id, student_id))
+    gpa = w.registry.get("gpa")
+    gpa.pages.addWidget(GPACalculatorPage(gpa))
+    # every page of every stack on screen once (that is when Qt polishes it)
+    for stack in [w.pages] + w.pages.findChildren(QStackedWidget):
+        for i in range(stack.count()):
+            stack.setCurrentIndex(i)
+            stack.widget(i).grab()
+    app.processEvents()
+    ms = (time.process_time() - start) * 1000
+    w.registry.drop_user_pages()
+    w.close()
+    w.deleteLater()
+    app.processEvents()
+    return ms
+
+
+@contextlib.contextmanager
+def _scratch_db():
+    """Point db_manager at a temporary copy of its database for the duration."""
+    from database import db_manager as db
+    original = db.DB_PATH
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        shutil.copyfile(original, path)
+        db.DB_PATH = path
+        yield path
+    finally:
+        db.DB_PATH = original
+        os.remove(path)
+
+
+def _time_pages(per_widget, runs):
+    """Build and show the pages runs times in this process; returns the times in ms."""
+    import io
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    use_per_widget_sheets(app, per_widget)
+    user = _sample_user()
+    times = []
+    with contextlib.redirect_stdout(io.StringIO()):   # the pages print their queries
+        for run in range(runs + 2):                   # two rounds to warm up imports and caches
+            ms = _build_and_show(app, *user)
+            if run >= 2:
+                times.append(ms)
+    return times
+
+
+def benchmark(rounds=5, runs=3, db_path=None):
+    """
+    Time page construction both ways. Each measurement runs in a fresh
+    process (Qt keeps style caches per process), alternating between the two
+    ways so both see the same machine load. Prints and returns {label: sorted times}.
+    """
+    modes = (("per-page", "per-page style sheets"), ("app", "application style sheet"))
+    results = {label: [] for _mode, label in modes}
+    for _round in range(rounds):
+        for mode, label in modes:
+            cmd = [sys.executable, "-m", "styles.style_registry", "--time", mode, "--runs", str(runs)]
+            if db_path:
+                cmd += ["--db", db_path]
+            out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+            results[label] += [float(v) for v in out.split()]
+    for label, t in results.items():
+        t.sort()
+        print(f"{label:<24} min {t[0]:7.1f} ms   median {t[len(t) // 2]:7.1f} ms   ({len(t)} builds)")
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Application style sheet tools.")
+    ap.add_argument("--dump", action="store_true", help="print the application style sheet")
+    ap.add_argument("--benchmark", action="store_true", help="time page construction with both ways of styling")
+    ap.add_argument("--time", choices=("per-page", "app"), help=argparse.SUPPRESS)   # one benchmark process
+    ap.add_argument("--rounds", type=int, default=5, help="benchmark processes per way of styling")
+    ap.add_argument("--runs", type=int, default=3, help="builds per benchmark process")
+    ap.add_argument("--db", default=None,
+                    help="SQLite file to build the pages from (default: a temporary copy of the app's)")
+    args = ap.parse_args(argv)
+    if args.dump:
+        print(app_stylesheet())
+    if not (args.time or args.benchmark):
+        return 0
+    with contextlib.ExitStack() as stack:
+        if args.db:
+            from database import db_manager as db
+            db.DB_PATH = args.db
+        else:
+            args.db = stack.enter_context(_scratch_db())   # never log in on the real database
+        if args.time:
+            print(" ".join(f"{ms:.2f}" for ms in _time_pages(args.time == "per-page", max(1, args.runs))))
+        else:
+            benchmark(max(1, args.rounds), max(1, args.runs), args.db)
+    return 0
+
+
+if __name__ == "__main__":
+    # run main() of the imported module: the pages import styles.style_registry, not __main__
+    from styles.style_registry import main as _main
+    raise SystemExit(_main())